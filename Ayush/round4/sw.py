@@ -11,6 +11,18 @@ import math
 import copy
 import numpy as np
 import statistics 
+try:
+    from pricing import call_price
+except ImportError:
+    # Uploaded on its own, without pricing.py: the same scalar Black-Scholes call price, inline
+    def norm_cdf(x: float) -> float:
+        return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+    def call_price(S: float, T: float, r: float, sigma: float, K: float = 10000) -> float:
+        sigma_t = sigma * math.sqrt(T)
+        d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_t
+        d2 = d1 - sigma_t
+        return S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
 
 class Logger:
     def __init__(self) -> None:
@@ -137,16 +149,14 @@ class Trader:
 
     cpnl = defaultdict(lambda : 0)
     
+    # Fixed on purpose: co_coco_coupon prices with spot and strike swapped (S=10000, K=COCONUT mid),
+    # which VolTracker's implied vol does not describe, and its -65/+45 thresholds were tuned to this value
     volatility = 0.16276186774619497
     std = 25
     basket_std = 76
     
     def black_scholes_price(self, K, T, r, sigma, S = 10000):
-        
-        d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-        d2 = d1 - sigma * math.sqrt(T)
-        option_price = S * statistics.NormalDist().cdf(d1) - K * math.exp(-r * T) * statistics.NormalDist().cdf(d2)
-        return option_price
+        return call_price(S, T, r, sigma, K)
     
     def co_coco_coupon(self, order_depth):
 
@@ -0,0 +1,654 @@
+"""Local replay of the island-data-bottle CSVs through any Trader.
+
+Usage:
+    python backtester.py trader_final_r4.py 3          # every day of round 3
+    python backtester.py trader_final_r4.py 3 0 1      # days 0 and 1 only
+    python backtester.py trader_final_r4.py 1+3+4      # rounds overlaid day by day
+    python backtester.py stan_basket3.py synthetic-round-3-island-data-bottle
+
+Orders are filled by matching.py: against the book snapshot first, then
+against the tick's market trades, with every order of a product rejected
+when they could breach its position limit. A trader with a run_batch(batch)
+hook is first handed the whole day as arrays (batch.TradingStateBatch),
+unless the Backtester is made with batch=False (as the profiler and the
+growth detector do, to time run() the way the platform calls it) or the
+day is a ChainedDay, whose ticks are never all held at once.
+
+Each day is found through the catalog (catalog.py), read through the
+columnar cache (data_cache.py) and turned once
+into per-tick books (plain sorted dicts), so the replay loop only copies a
+few small dicts per product per tick instead of going through pandas row
+access. The command line streams each day (StreamedDay): ticks are replayed
+as soon as their chunk of the prices file is decoded.
+
+Round 2's bottle has ORCHIDS only as an observation table, with no book;
+the replay quotes a one-level stand-in book around the observed price
+(observation_book), so ORCHIDS fills there are only indicative. Products a
+day does not have are left out of state.order_depths, as on the platform
+when a product is not listed yet.
+"""
+import bisect
+import contextlib
+import importlib.util
+import itertools
+import math
+import os
+import sys
+import time
+import traceback
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import catalog
+import data_cache
+import logger
+import matching
+from batch import TradingStateBatch
+from datamodel import ConversionObservation, Observation, OrderDepth, Symbol, Trade, TradingState
+
+DATA_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+POSITION_LIMITS = {
+    "AMETHYSTS": 20,
+    "STARFRUIT": 20,
+    "ORCHIDS": 100,
+    "CHOCOLATE": 250,
+    "STRAWBERRIES": 350,
+    "ROSES": 60,
+    "GIFT_BASKET": 60,
+    "COCONUT": 300,
+    "COCONUT_COUPON": 600,
+}
+
+SUBMISSION = "SUBMISSION"
+TICK = 100
+
+# Round 2 has no ORCHIDS book, only the observed price; observation_book quotes
+# this far either side of it, with this much on each side, so ORCHIDS traders
+# have a market to read and trade against
+OBSERVATION_HALF_SPREAD = 2
+OBSERVATION_VOLUME = 10
+
+# (buy_orders, sell_orders) for one product at one tick, already sorted best first
+Book = Tuple[Dict[int, int], Dict[int, int]]
+# The same book as int lists for the matcher: (bid_prices, bid_volumes, ask_prices, ask_volumes)
+Levels = Tuple[List[int], List[int], List[int], List[int]]
+# (symbol, price, quantity, buyer, seller)
+TradeRow = Tuple[str, int, int, str, str]
+
+
+class DayData:
+
+    def __init__(self, round_num: int, day: int) -> None:
+        self.round = round_num
+        self.day = day
+        self.timestamps: List[int] = []
+        self.books: List[Dict[Symbol, Book]] = []
+        self.levels: List[Dict[Symbol, Levels]] = []
+        self.mids: List[Dict[Symbol, float]] = []
+        self.trades: Dict[int, List[TradeRow]] = {}
+        self.observations: Dict[int, Dict[Symbol, ConversionObservation]] = {}
+        self.products: List[Symbol] = []
+        # The column tables the books were built from (batch.TradingStateBatch reads them directly)
+        self.price_tables: List[data_cache.PriceTable] = []
+        self.name = "round %d day %d" % (round_num, day)
+
+    def __repr__(self) -> str:
+        return "DayData(%s, ticks=%d)" % (self.name, len(self.timestamps))
+
+
+def find_days(round_num: int) -> List[int]:
+    """Days available for a round, wherever in the repo their files are."""
+    return catalog.default().days(round_num)
+
+
+def _fill_books(table: data_cache.PriceTable, data: DayData) -> None:
+    index_of = {}
+    products = table.products
+    bid_levels, ask_levels = table.levels()
+    # Levels are stored best first and filled from level 1, so slicing the
+    # first n columns gives the already sorted dict the platform would send
+    columns = zip(
+        np.asarray(table.timestamp).tolist(),
+        np.asarray(table.product).tolist(),
+        np.asarray(table.bid_price).tolist(),
+        np.asarray(table.bid_volume).tolist(),
+        bid_levels.tolist(),
+        np.asarray(table.ask_price).tolist(),
+        np.asarray(table.ask_volume).tolist(),
+        ask_levels.tolist(),
+        np.asarray(table.mid_price).tolist(),
+    )
+    for timestamp, product, bid_prices, bid_volumes, n_bids, ask_prices, ask_volumes, n_asks, mid in columns:
+        i = index_of.get(timestamp)
+        if i is None:
+            i = index_of[timestamp] = len(data.timestamps)
+            data.timestamps.append(timestamp)
+            data.books.append({})
+            data.levels.append({})
+            data.mids.append({})
+        symbol = products[product]
+        levels = (bid_prices[:n_bids], bid_volumes[:n_bids], ask_prices[:n_asks], ask_volumes[:n_asks])
+        data.levels[i][symbol] = levels
+        data.books[i][symbol] = (dict(zip(levels[0], levels[1])), {p: -v for p, v in zip(levels[2], levels[3])})
+        data.mids[i][symbol] = mid
+    data.products = list(products)
+    data.price_tables.append(table)
+
+
+def _fill_observations(table: data_cache.ObservationTable, data: DayData) -> None:
+    # Round 2 ships ORCHIDS as an observation table rather than an order book;
+    # its single ORCHIDS price stands in for both sides of the conversion quote,
+    # and a one-level book around it (observation_book) for the local market
+    columns = zip(*(np.asarray(c).tolist() for c in (
+        table.timestamp, table.orchids, table.transport_fees, table.export_tariff, table.import_tariff, table.sunlight, table.humidity)))
+    for timestamp, price, transport, export, tariff, sunlight, humidity in columns:
+        if timestamp not in data.observations:
+            data.timestamps.append(timestamp)
+            data.books.append({})
+            data.levels.append({})
+            data.mids.append({})
+        i = len(data.timestamps) - 1 if data.timestamps[-1] == timestamp else data.timestamps.index(timestamp)
+        levels = observation_book(price)
+        data.levels[i]["ORCHIDS"] = levels
+        data.books[i]["ORCHIDS"] = ({levels[0][0]: levels[1][0]}, {levels[2][0]: -levels[3][0]})
+        data.mids[i]["ORCHIDS"] = (levels[0][0] + levels[2][0]) / 2
+        data.observations[timestamp] = {"ORCHIDS": ConversionObservation(price, price, transport, export, tariff, sunlight, humidity)}
+    if "ORCHIDS" not in data.products:
+        data.products.append("ORCHIDS")
+
+
+def observation_book(price: float) -> Levels:
+    """The stand-in book of an observation-only day: one level OBSERVATION_HALF_SPREAD either side of price."""
+    bid = math.floor(price - OBSERVATION_HALF_SPREAD)
+    ask = math.ceil(price + OBSERVATION_HALF_SPREAD)
+    return [bid], [OBSERVATION_VOLUME], [ask], [OBSERVATION_VOLUME]
+
+
+def _fill_trades(table: data_cache.TradeTable, data: DayData) -> None:
+    symbols, names = table.symbols, table.names
+    columns = zip(*(np.asarray(c).tolist() for c in (table.timestamp, table.symbol, table.price, table.quantity, table.buyer, table.seller)))
+    for timestamp, symbol, price, quantity, buyer, seller in columns:
+        data.trades.setdefault(timestamp, []).append((symbols[symbol], int(price), quantity, names[buyer], names[seller]))
+
+
+def _fill(data: DayData, prices: data_cache.Table, trades: Optional[data_cache.TradeTable]) -> DayData:
+    if isinstance(prices, data_cache.ObservationTable):
+        _fill_observations(prices, data)
+    else:
+        _fill_books(prices, data)
+    if trades is not None:
+        _fill_trades(trades, data)
+    return data
+
+
+def load_day(round_num: int, day: int) -> DayData:
+    """One day of a round, with the joined named/anonymised trade tape (see catalog.py)."""
+    cat = catalog.default()
+    return _fill(DayData(round_num, day), cat.prices(round_num, day), cat.trades(round_num, day))
+
+
+class StreamedDay(DayData):
+    """A day decoded chunk by chunk while it is being replayed.
+
+    Iterating over timestamps pulls the next chunk of the prices file (see
+    data_cache.stream) whenever the replay runs out of decoded ticks, so the
+    first tick runs before the rest of the day, possibly still inside a zip,
+    has been read. products comes from the first chunk. Once iterated to the
+    end it is an ordinary DayData.
+    """
+
+    def __init__(self, round_num: int, day: int, chunks, trades: Optional[data_cache.TradeTable]) -> None:
+        super().__init__(round_num, day)
+        self.timestamps = _StreamedTimestamps(self)
+        self._chunks = iter(chunks)
+        if trades is not None:
+            _fill_trades(trades, self)
+        self.pull()
+
+    def pull(self) -> bool:
+        """Decode the next chunk; False once the file is exhausted."""
+        table = next(self._chunks, None)
+        if table is None:
+            return False
+        if isinstance(table, data_cache.ObservationTable):
+            _fill_observations(table, self)
+        else:
+            _fill_books(table, self)
+        return True
+
+
+class _StreamedTimestamps(list):
+
+    def __init__(self, day: StreamedDay) -> None:
+        super().__init__()
+        self.day = day
+
+    def __iter__(self):
+        i = 0
+        while i < len(self) or self.day.pull():
+            if i < len(self):
+                yield self[i]
+                i += 1
+
+
+def stream_day(round_num: int, day: int, chunk_rows: int = data_cache.CHUNK_ROWS) -> StreamedDay:
+    cat = catalog.default()
+    return StreamedDay(round_num, day, cat.stream_prices(round_num, day, chunk_rows), cat.trades(round_num, day))
+
+
+def load_files(prices: str, trades: Optional[str], round_num: int, day: int) -> DayData:
+    return _fill(DayData(round_num, day), data_cache.load(prices), data_cache.load(trades) if trades is not None else None)
+
+
+def load_bottle(folder: str) -> List[DayData]:
+    """Every day in a folder of prices_round_R_day_D.csv files, e.g. synthetic ones."""
+    days = []
+    for name in os.listdir(folder):
+        if name.startswith("prices_round_") and name.endswith(".csv"):
+            round_num, day = (int(x) for x in name[len("prices_round_"):-len(".csv")].split("_day_"))
+            days.append((round_num, day))
+    result = []
+    for round_num, day in sorted(days):
+        trades = None
+        for suffix in ("nn", "wn"):
+            path = os.path.join(folder, "trades_round_%d_day_%d_%s.csv" % (round_num, day, suffix))
+            if trades is None and os.path.exists(path):
+                trades = path
+        result.append(load_files(os.path.join(folder, "prices_round_%d_day_%d.csv" % (round_num, day)), trades, round_num, day))
+    return result
+
+
+def combine_days(datas: List[DayData]) -> DayData:
+    """Overlay days from several rounds tick by tick.
+
+    No single bottle carries every product, so a final-round trader is
+    replayed against e.g. round 1, 3 and 4 days stacked on one clock.
+    """
+    combined = DayData(datas[0].round, datas[0].day)
+    combined.name = "rounds %s day %s" % ("+".join(str(d.round) for d in datas), "+".join(str(d.day) for d in datas))
+    index_of = {}
+    for data in datas:
+        for i, timestamp in enumerate(data.timestamps):
+            j = index_of.get(timestamp)
+            if j is None:
+                j = index_of[timestamp] = len(combined.timestamps)
+                combined.timestamps.append(timestamp)
+                combined.books.append({})
+                combined.levels.append({})
+                combined.mids.append({})
+            combined.books[j].update(data.books[i])
+            combined.levels[j].update(data.levels[i])
+            combined.mids[j].update(data.mids[i])
+        for timestamp, trades in data.trades.items():
+            combined.trades.setdefault(timestamp, []).extend(trades)
+        for timestamp, observations in data.observations.items():
+            combined.observations.setdefault(timestamp, {}).update(observations)
+        combined.products += [p for p in data.products if p not in combined.products]
+        combined.price_tables += data.price_tables
+
+    order = sorted(range(len(combined.timestamps)), key=combined.timestamps.__getitem__)
+    combined.timestamps = [combined.timestamps[j] for j in order]
+    combined.books = [combined.books[j] for j in order]
+    combined.levels = [combined.levels[j] for j in order]
+    combined.mids = [combined.mids[j] for j in order]
+    return combined
+
+
+class ChainedDay:
+    """Days replayed back to back on one continuous clock, without copying them.
+
+    Cycles through the given days until ticks ticks have been produced, with
+    each repetition's timestamps shifted by a whole day, so a trader can be
+    run for a million ticks in constant memory.
+    """
+
+    def __init__(self, datas: List[DayData], ticks: Optional[int] = None) -> None:
+        self.parts = datas
+        self.span = max(d.timestamps[-1] for d in datas) + TICK
+        self.products = []
+        for data in datas:
+            self.products += [p for p in data.products if p not in self.products]
+        total = ticks if ticks is not None else sum(len(d.timestamps) for d in datas)
+        self.name = "%s x%d ticks" % ("+".join(d.name for d in datas), total)
+
+        # starts[s] is the first global tick index of segment s
+        self.starts = [0]
+        while self.starts[-1] < total:
+            self.starts.append(self.starts[-1] + len(datas[(len(self.starts) - 1) % len(datas)].timestamps))
+        self.total = total
+        self.timestamps = _ChainedTimestamps(self)
+        self.books = _ChainedSequence(self, "books")
+        self.levels = _ChainedSequence(self, "levels")
+        self.mids = _ChainedSequence(self, "mids")
+        self.trades = _ChainedMapping(self, "trades")
+        self.observations = _ChainedMapping(self, "observations")
+
+    def locate(self, i: int) -> Tuple[int, DayData, int]:
+        segment = bisect.bisect_right(self.starts, i) - 1
+        return segment, self.parts[segment % len(self.parts)], i - self.starts[segment]
+
+    def __repr__(self) -> str:
+        return "ChainedDay(%s)" % self.name
+
+
+class _ChainedTimestamps:
+
+    def __init__(self, chain: ChainedDay) -> None:
+        self.chain = chain
+
+    def __len__(self) -> int:
+        return self.chain.total
+
+    def __getitem__(self, i: int) -> int:
+        if i < 0:
+            i += self.chain.total
+        segment, data, j = self.chain.locate(i)
+        return segment * self.chain.span + data.timestamps[j]
+
+    def __iter__(self):
+        chain = self.chain
+        produced = 0
+        segment = 0
+        while produced < chain.total:
+            data = chain.parts[segment % len(chain.parts)]
+            offset = segment * chain.span
+            for timestamp in data.timestamps:
+                if produced == chain.total:
+                    return
+                yield offset + timestamp
+                produced += 1
+            segment += 1
+
+
+class _ChainedSequence:
+
+    def __init__(self, chain: ChainedDay, field: str) -> None:
+        self.chain = chain
+        self.field = field
+
+    def __len__(self) -> int:
+        return self.chain.total
+
+    def __getitem__(self, i: int):
+        _, data, j = self.chain.locate(i)
+        return getattr(data, self.field)[j]
+
+
+class _ChainedMapping:
+
+    def __init__(self, chain: ChainedDay, field: str) -> None:
+        self.chain = chain
+        self.field = field
+
+    def get(self, timestamp: int, default=None):
+        segment, base = divmod(timestamp, self.chain.span)
+        data = self.chain.parts[segment % len(self.chain.parts)]
+        return getattr(data, self.field).get(base, default)
+
+
+def load_days(rounds: List[int], days: Optional[List[int]] = None) -> List[DayData]:
+    """Days of one round, or of several rounds paired up in order and combined."""
+    if len(rounds) == 1:
+        return [load_day(rounds[0], day) for day in days or find_days(rounds[0])]
+    per_round = [find_days(r) for r in rounds]
+    count = min(len(d) for d in per_round)
+    picked = days if days else range(count)
+    return [combine_days([load_day(r, d[i]) for r, d in zip(rounds, per_round)]) for i in picked]
+
+
+def iter_days(rounds: List[int], days: Optional[List[int]] = None) -> Iterator[DayData]:
+    """load_days for a single pass: one round's days are streamed, each only when it is reached."""
+    if len(rounds) > 1:
+        yield from load_days(rounds, days)
+        return
+    for day in days or find_days(rounds[0]):
+        yield stream_day(rounds[0], day)
+
+
+def parse_rounds(spec: str) -> List[int]:
+    return [int(r) for r in spec.split("+")]
+
+
+def load_trader_module(path: str):
+    """Import a trader file under a fresh module name.
+
+    Most traders keep their state in mutable class attributes, so every
+    replay needs its own copy of the module rather than the cached import.
+    """
+    path = os.path.abspath(path)
+    folder = os.path.dirname(path)
+    name = "_replay_%s_%d" % (os.path.splitext(os.path.basename(path))[0], next(_module_ids))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, folder)
+    try:
+        with contextlib.redirect_stdout(_NullWriter()):
+            spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(folder)
+    return module
+
+
+_module_ids = itertools.count()
+
+
+class _NullWriter:
+
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+class DayResult:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pnl: Dict[Symbol, float] = {}
+        self.position: Dict[Symbol, int] = {}
+        self.own_trades: List[Trade] = []
+        self.errors = 0
+        self.rejected = 0
+        self.first_error: Optional[str] = None
+        self.ticks = 0
+        self.seconds = 0.0
+
+    @property
+    def total(self) -> float:
+        return sum(self.pnl.values())
+
+
+class Backtester:
+
+    def __init__(self, trader, data: DayData, limits: Dict[Symbol, int] = POSITION_LIMITS, quiet: bool = True, logging: Optional[bool] = None,
+                 batch: bool = True) -> None:
+        self.trader = trader
+        self.data = data
+        self.limits = limits
+        self.quiet = quiet
+        # Whether shared Loggers build their lines at all; by default only when they are shown
+        self.logging = not quiet if logging is None else logging
+        # Whether a trader's run_batch hook is called; the platform never calls it
+        self.batch = batch
+
+    def run(self) -> DayResult:
+        data = self.data
+        result = DayResult(data.name)
+        # The platform hands listings over as plain dicts (the Logger copies index them by key)
+        listings = {p: {"symbol": p, "product": p, "denomination": "SEASHELLS"} for p in data.products}
+        position: Dict[Symbol, int] = {}
+        cash: Dict[Symbol, float] = {p: 0.0 for p in data.products}
+        last_mid: Dict[Symbol, float] = {}
+        trader_data = ""
+        own_trades: Dict[Symbol, List[Trade]] = {}
+        market_trades: Dict[Symbol, List[Trade]] = {}
+        empty_observations: Dict[Symbol, ConversionObservation] = {}
+
+        start = time.perf_counter()
+        out = _NullWriter() if self.quiet else sys.stdout
+        with contextlib.redirect_stdout(out), (logger.disabled() if not self.logging else contextlib.nullcontext()):
+            batch = self._run_batch(result)
+            for i, timestamp in enumerate(data.timestamps):
+                if batch is not None:
+                    batch.record_position(i, position)
+                order_depths = {}
+                for product, (buy_orders, sell_orders) in data.books[i].items():
+                    # The setters store copies, so the day's books stay untouched
+                    depth = OrderDepth()
+                    depth.buy_orders = buy_orders
+                    depth.sell_orders = sell_orders
+                    order_depths[product] = depth
+                last_mid.update(data.mids[i])
+
+                conversion_observations = data.observations.get(timestamp, empty_observations)
+                state = TradingState(
+                    trader_data,
+                    timestamp,
+                    listings,
+                    order_depths,
+                    own_trades,
+                    market_trades,
+                    dict(position),
+                    Observation({}, dict(conversion_observations)),
+                )
+
+                try:
+                    output = self.trader.run(state)
+                except Exception:
+                    result.errors += 1
+                    if result.first_error is None:
+                        result.first_error = traceback.format_exc()
+                    output = None
+
+                orders, conversions, trader_data = _unpack(output, trader_data)
+                own_trades = {}
+                if conversions:
+                    self._convert(conversions, conversion_observations, position, cash)
+
+                tick_trades = data.trades.get(timestamp, ())
+                remaining = [t[2] for t in tick_trades]
+                for product, product_orders in orders.items():
+                    levels = data.levels[i].get(product)
+                    if not product_orders or levels is None:
+                        continue
+                    # Market trades of this product, consumed in place by the matcher
+                    indices = [k for k, t in enumerate(tick_trades) if t[0] == product and remaining[k]]
+                    trade_volumes = [remaining[k] for k in indices]
+                    current = position.get(product, 0)
+                    fills = matching.match_orders(
+                        [o.price for o in product_orders],
+                        [o.quantity for o in product_orders],
+                        levels[0], levels[1], levels[2], levels[3],
+                        [tick_trades[k][1] for k in indices],
+                        trade_volumes,
+                        current,
+                        self.limits.get(product, 0),
+                    )
+                    if fills is None:
+                        result.rejected += 1
+                        continue
+                    for k, volume in zip(indices, trade_volumes):
+                        remaining[k] = volume
+
+                    trades = []
+                    for price, quantity, source in fills:
+                        counterparty = ""
+                        if quantity > 0:
+                            if source != matching.BOOK:
+                                counterparty = tick_trades[indices[source]][4]
+                            trades.append(Trade(product, price, quantity, SUBMISSION, counterparty, timestamp))
+                        else:
+                            if source != matching.BOOK:
+                                counterparty = tick_trades[indices[source]][3]
+                            trades.append(Trade(product, price, -quantity, counterparty, SUBMISSION, timestamp))
+                        current += quantity
+                        cash[product] = cash.get(product, 0.0) - price * quantity
+                    position[product] = current
+                    if trades:
+                        own_trades[product] = trades
+                        result.own_trades.extend(trades)
+
+                # What the platform shows next tick is what was left of this tick's trades
+                market_trades = {}
+                for (symbol, price, _, buyer, seller), quantity in zip(tick_trades, remaining):
+                    if quantity:
+                        market_trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, buyer, seller, timestamp))
+
+        result.seconds = time.perf_counter() - start
+        result.ticks = len(data.timestamps)
+        result.position = position
+        for product, value in cash.items():
+            result.pnl[product] = value + position.get(product, 0) * last_mid.get(product, 0.0)
+        return result
+
+    def _run_batch(self, result: DayResult) -> Optional[TradingStateBatch]:
+        # Optional hook: the trader sees the whole day as arrays once, before the first tick
+        run_batch = getattr(self.trader, "run_batch", None)
+        # A ChainedDay runs in constant memory; a batch of it would hold every tick of the chain
+        if run_batch is None or not self.batch or isinstance(self.data, ChainedDay):
+            return None
+        batch = TradingStateBatch.from_day(self.data)
+        try:
+            run_batch(batch)
+        except Exception:
+            result.errors += 1
+            result.first_error = traceback.format_exc()
+        return batch
+
+    def _convert(self, conversions: int, observations: Dict[Symbol, ConversionObservation], position: Dict[Symbol, int], cash: Dict[Symbol, float]) -> None:
+        # Conversions can only close an existing position, never open one
+        observation = observations.get("ORCHIDS")
+        current = position.get("ORCHIDS", 0)
+        if observation is None or current == 0 or (conversions > 0) != (current < 0) or abs(conversions) > abs(current):
+            return
+        if conversions > 0:
+            price = observation.askPrice + observation.transportFees + observation.importTariff
+        else:
+            price = observation.bidPrice - observation.transportFees - observation.exportTariff
+        position["ORCHIDS"] = current + conversions
+        cash["ORCHIDS"] = cash.get("ORCHIDS", 0.0) - price * conversions
+
+
+def _unpack(output, trader_data: str):
+    if output is None:
+        return {}, 0, trader_data
+    if isinstance(output, tuple):
+        orders = output[0] or {}
+        conversions = output[1] if len(output) > 1 else 0
+        trader_data = output[2] if len(output) > 2 else trader_data
+        return orders, conversions or 0, trader_data if isinstance(trader_data, str) else str(trader_data)
+    return output, 0, trader_data
+
+
+def run_days(trader_path: str, rounds: List[int], days: Optional[List[int]] = None, quiet: bool = True, datas: Optional[List[DayData]] = None) -> List[DayResult]:
+    results = []
+    for data in datas if datas is not None else iter_days(rounds, days):
+        module = load_trader_module(trader_path)
+        results.append(Backtester(module.Trader(), data, quiet=quiet).run())
+    return results
+
+
+def print_results(results: List[DayResult]) -> None:
+    total = 0.0
+    for r in results:
+        print("%s: %d ticks in %.2fs, %d errors, %d limit rejections" % (r.name, r.ticks, r.seconds, r.errors, r.rejected))
+        for product, pnl in sorted(r.pnl.items()):
+            print("    %-16s %12.1f  (position %d)" % (product, pnl, r.position.get(product, 0)))
+        print("    %-16s %12.1f" % ("TOTAL", r.total))
+        if r.first_error:
+            print("    first error:\n" + r.first_error)
+        total += r.total
+    print("Total PnL: %.1f" % total)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    if os.path.isdir(sys.argv[2]):
+        print_results(run_days(sys.argv[1], [], datas=load_bottle(sys.argv[2])))
+    else:
+        print_results(run_days(sys.argv[1], parse_rounds(sys.argv[2]), [int(d) for d in sys.argv[3:]]))
@@ -0,0 +1,143 @@
+"""A whole day of TradingStates as NumPy arrays, for vectorized signals.
+
+A Trader may define an optional run_batch(batch) hook. The backtester calls
+it once per day, before the first tick, with a TradingStateBatch of every
+tick; the trader computes its signals for all ticks in one pass and looks
+them up by timestamp in run(). The platform never calls run_batch, and
+neither does the backtester on a ChainedDay or with batch=False (profiler.py,
+growth.py), so run() must still work on its own.
+
+    def run_batch(self, batch):
+        mid = batch.mid("STARFRUIT")                     # (N,) float, NaN where a side is empty
+        self.signal_at = dict(zip(batch.timestamps.tolist(), (mid - np.roll(mid, 1)).tolist()))
+
+Layout (N ticks, L = data_cache.LEVELS):
+    timestamps                  (N,) int64
+    bid_prices[p], ask_prices[p] (N, L) int64, best first, 0 where there is no level
+    bid_volumes[p], ask_volumes[p] (N, L) int64, positive on both sides
+    observations[p][field]      (N,) float64 conversion observation fields, NaN where missing
+    trade_* columns             market trades of the whole day (timestamp, symbol, price, quantity, buyer, seller)
+    position[p]                 (N,) int64 position at the start of each tick, filled in by the
+                                backtester as the replay goes (only rows up to the current tick are final)
+"""
+from typing import Dict, List
+
+import numpy as np
+
+import data_cache
+
+OBSERVATION_FIELDS = ["bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sunlight", "humidity"]
+
+
+class TradingStateBatch:
+
+    def __init__(self, timestamps: np.ndarray, products: List[str]) -> None:
+        n = len(timestamps)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.products = list(products)
+        self.bid_prices: Dict[str, np.ndarray] = {}
+        self.bid_volumes: Dict[str, np.ndarray] = {}
+        self.ask_prices: Dict[str, np.ndarray] = {}
+        self.ask_volumes: Dict[str, np.ndarray] = {}
+        self.observations: Dict[str, Dict[str, np.ndarray]] = {}
+        self.position: Dict[str, np.ndarray] = {p: np.zeros(n, dtype=np.int64) for p in self.products}
+        self.trade_timestamp = np.zeros(0, dtype=np.int64)
+        self.trade_symbol: List[str] = []
+        self.trade_price = np.zeros(0, dtype=np.float64)
+        self.trade_quantity = np.zeros(0, dtype=np.int64)
+        self.trade_buyer: List[str] = []
+        self.trade_seller: List[str] = []
+        self._index = {t: i for i, t in enumerate(self.timestamps.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def index(self, timestamp: int) -> int:
+        """Row of a tick, as passed in TradingState.timestamp."""
+        return self._index[timestamp]
+
+    def best_bid(self, product: str) -> np.ndarray:
+        return np.where(self.bid_prices[product][:, 0] != 0, self.bid_prices[product][:, 0], np.nan)
+
+    def best_ask(self, product: str) -> np.ndarray:
+        return np.where(self.ask_prices[product][:, 0] != 0, self.ask_prices[product][:, 0], np.nan)
+
+    def mid(self, product: str) -> np.ndarray:
+        """(best bid + best ask) / 2 per tick, NaN where either side is empty."""
+        return (self.best_bid(product) + self.best_ask(product)) / 2
+
+    def trades(self, product: str) -> np.ndarray:
+        """Indices into the trade_* columns of the market trades in product."""
+        return np.flatnonzero(np.array(self.trade_symbol, dtype=object) == product)
+
+    def record_position(self, i: int, position: Dict[str, int]) -> None:
+        for product, column in self.position.items():
+            column[i] = position.get(product, 0)
+
+    def _fill_levels_from_tables(self, tables) -> None:
+        # Straight copies of the cached columns, placed by timestamp
+        n, width = len(self), data_cache.LEVELS
+        for product in self.products:
+            for name in ("bid_prices", "bid_volumes", "ask_prices", "ask_volumes"):
+                getattr(self, name)[product] = np.zeros((n, width), dtype=np.int64)
+        for table in tables:
+            for product in table.products:
+                if product not in self.bid_prices:
+                    continue
+                rows = table.rows(product)
+                at = np.searchsorted(self.timestamps, table.timestamp[rows])
+                self.bid_prices[product][at] = table.bid_price[rows]
+                self.bid_volumes[product][at] = table.bid_volume[rows]
+                self.ask_prices[product][at] = table.ask_price[rows]
+                self.ask_volumes[product][at] = table.ask_volume[rows]
+
+    def _fill_levels(self, data) -> None:
+        n, width = len(self), data_cache.LEVELS
+        empty = [0] * width
+        padded = {p: ([], [], [], []) for p in self.products}
+        for i in range(n):
+            levels = data.levels[i]
+            for product, rows in padded.items():
+                book = levels.get(product)
+                if book is None:
+                    for column in rows:
+                        column.append(empty)
+                    continue
+                for column, values in zip(rows, book):
+                    column.append(values + empty[len(values):] if len(values) < width else values)
+        for product, rows in padded.items():
+            for name, column in zip(("bid_prices", "bid_volumes", "ask_prices", "ask_volumes"), rows):
+                getattr(self, name)[product] = np.array(column, dtype=np.int64).reshape(n, width)
+
+    @classmethod
+    def from_day(cls, data) -> "TradingStateBatch":
+        """Arrays of a backtester DayData (or anything with its timestamps/levels/trades/observations)."""
+        timestamps = list(data.timestamps)
+        n = len(timestamps)
+        batch = cls(np.array(timestamps, dtype=np.int64), data.products)
+        tables = getattr(data, "price_tables", None)
+        # The tables only hold real books; observation-only products (round 2's ORCHIDS) come from data.levels
+        if tables and all(any(product in table.products for table in tables) for product in data.products):
+            batch._fill_levels_from_tables(tables)
+        else:
+            batch._fill_levels(data)
+
+        trade_rows = []
+        for i, timestamp in enumerate(timestamps):
+            for symbol, price, quantity, buyer, seller in data.trades.get(timestamp, ()):
+                trade_rows.append((timestamp, symbol, price, quantity, buyer, seller))
+            for product, observation in data.observations.get(timestamp, {}).items():
+                fields = batch.observations.get(product)
+                if fields is None:
+                    fields = batch.observations[product] = {f: np.full(n, np.nan) for f in OBSERVATION_FIELDS}
+                for f in OBSERVATION_FIELDS:
+                    fields[f][i] = getattr(observation, f)
+        if trade_rows:
+            columns = list(zip(*trade_rows))
+            batch.trade_timestamp = np.array(columns[0], dtype=np.int64)
+            batch.trade_symbol = list(columns[1])
+            batch.trade_price = np.array(columns[2], dtype=np.float64)
+            batch.trade_quantity = np.array(columns[3], dtype=np.int64)
+            batch.trade_buyer = list(columns[4])
+            batch.trade_seller = list(columns[5])
+        return batch
@@ -0,0 +1,536 @@
+"""Micro-benchmarks for the replay tooling.
+
+Usage:
+    python bench.py              # run every benchmark
+    python bench.py matching     # run the named ones only
+"""
+import os
+import sys
+import time
+
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__[len("bench_"):]] = fn
+    return fn
+
+
+def timeit(fn, repeat: int = 5, number: int = 1) -> float:
+    """Best wall time of fn over repeat runs, in seconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+@benchmark
+def bench_matching() -> None:
+    import matching
+
+    # A 3-level book on each side with a few market trades, hit by a ladder of
+    # passive quotes plus a couple of crossing orders, like orders_mm_orchids
+    book = ([1101, 1100, 1099], [10, 12, 15], [1104, 1105, 1106], [9, 11, 14])
+    trade_prices = [1101, 1104, 1102]
+    ladder_prices = [1103, 1102, 1105, 1107, 1108, 1109, 1110, 1111]
+    ladder_quantities = [4, 3, -5, -4, -3, -2, -1, -1]
+    crossing_prices = [1105, 1100]
+    crossing_quantities = [15, -15]
+
+    for name, prices, quantities in (("ladder", ladder_prices, ladder_quantities), ("crossing", crossing_prices, crossing_quantities)):
+        number = 20000
+        seconds = timeit(lambda: matching.match_orders(prices, quantities, book[0], book[1], book[2], book[3], trade_prices, [5, 5, 5], 0, 100), number=number)
+        print("matching %-9s %6.0f ns per call, %5.0f ns per order level" % (name, seconds * 1e9, seconds * 1e9 / len(prices)))
+
+
+class _Legacy:
+    """The dict-backed datamodel classes as they were before __slots__, for comparison."""
+
+    class Order:
+
+        def __init__(self, symbol, price, quantity):
+            self.symbol = symbol
+            self.price = price
+            self.quantity = quantity
+
+    class OrderDepth:
+
+        def __init__(self):
+            self.buy_orders = {}
+            self.sell_orders = {}
+
+    class Trade:
+
+        def __init__(self, symbol, price, quantity, buyer=None, seller=None, timestamp=0):
+            self.symbol = symbol
+            self.price = price
+            self.quantity = quantity
+            self.buyer = buyer
+            self.seller = seller
+            self.timestamp = timestamp
+
+    class Observation:
+
+        def __init__(self, plainValueObservations, conversionObservations):
+            self.plainValueObservations = plainValueObservations
+            self.conversionObservations = conversionObservations
+
+    class TradingState:
+
+        def __init__(self, traderData, timestamp, listings, order_depths, own_trades, market_trades, position, observations):
+            self.traderData = traderData
+            self.timestamp = timestamp
+            self.listings = listings
+            self.order_depths = order_depths
+            self.own_trades = own_trades
+            self.market_trades = market_trades
+            self.position = position
+            self.observations = observations
+
+
+def _instance_bytes(obj) -> int:
+    return sys.getsizeof(obj) + (sys.getsizeof(vars(obj)) if not hasattr(type(obj), "__slots__") else 0)
+
+
+@benchmark
+def bench_datamodel() -> None:
+    import backtester
+    import datamodel
+
+    # Per object: construction, memory and attribute reads, old vs slotted
+    samples = {
+        "Order": lambda m: m.Order("GIFT_BASKET", 70000, 5),
+        "Trade": lambda m: m.Trade("GIFT_BASKET", 70000, 5, "SUBMISSION", "", 100),
+        "OrderDepth": lambda m: m.OrderDepth(),
+        "TradingState": lambda m: m.TradingState("", 0, {}, {}, {}, {}, {}, None),
+    }
+    for name, make in samples.items():
+        old, new = make(_Legacy), make(datamodel)
+        t_old = timeit(lambda: make(_Legacy), number=20000)
+        t_new = timeit(lambda: make(datamodel), number=20000)
+        print("%-13s create %4.0f -> %4.0f ns   %4d -> %4d bytes" % (name, t_old * 1e9, t_new * 1e9, _instance_bytes(old), _instance_bytes(new)))
+    orders_old = [_Legacy.Order("A", i, 1) for i in range(1000)]
+    orders_new = [datamodel.Order("A", i, 1) for i in range(1000)]
+    t_old = timeit(lambda: sum(o.price * o.quantity for o in orders_old), number=200)
+    t_new = timeit(lambda: sum(o.price * o.quantity for o in orders_new), number=200)
+    print("attribute reads %.1f -> %.1f ns per order" % (t_old * 1e9 / 1000, t_new * 1e9 / 1000))
+
+    # A whole round-3 replay of stan_basket3 with each set of classes
+    days = backtester.load_days([3])
+    path = os.path.join(backtester.DATA_ROOT, "stan_basket3.py")
+    for label, classes in (("dict-backed", _Legacy), ("slotted", datamodel)):
+        counts = {"TradingState": 0, "OrderDepth": 0, "Trade": 0, "Order": 0}
+        patched = {name: getattr(backtester, name) for name in ("OrderDepth", "Trade", "TradingState", "Observation")}
+        for name in patched:
+            setattr(backtester, name, getattr(classes, name))
+        seconds = 0.0
+        try:
+            for data in days:
+                module = backtester.load_trader_module(path)
+                module.Order = classes.Order
+                trader = module.Trader()
+                run = trader.run
+
+                def counted_run(state, run=run):
+                    output = run(state)
+                    counts["TradingState"] += 1
+                    counts["OrderDepth"] += len(state.order_depths)
+                    counts["Trade"] += sum(len(t) for t in state.own_trades.values()) + sum(len(t) for t in state.market_trades.values())
+                    counts["Order"] += sum(len(o) for o in output[0].values()) if output else 0
+                    return output
+
+                trader.run = counted_run
+                result = backtester.Backtester(trader, data).run()
+                seconds += result.seconds
+        finally:
+            for name, cls in patched.items():
+                setattr(backtester, name, cls)
+        allocated = sum(counts[name] * _instance_bytes(samples[name](classes)) for name in counts)
+        print("round 3 replay, %-11s %6.2f s   %8d objects   %6.1f MB in datamodel instances" % (label, seconds, sum(counts.values()), allocated / 1e6))
+
+
+class _Recorder:
+    """A trader that keeps every TradingState it is handed and sends no orders."""
+
+    def __init__(self) -> None:
+        self.states = []
+
+    def run(self, state):
+        self.states.append(state)
+        return {}, 0, ""
+
+
+@benchmark
+def bench_codec() -> None:
+    import gc
+    import json
+
+    import backtester
+    import state_codec
+
+    states = []
+    for data in backtester.load_days([3]):
+        recorder = _Recorder()
+        backtester.Backtester(recorder, data).run()
+        states.extend(recorder.states)
+
+    # Every state must come back exactly: same fields, book order and types
+    lines = [state_codec.encode(s) for s in states]
+    for state, line in zip(states, lines):
+        again = state_codec.decode(line)
+        assert state_codec.encode(again) == line
+        assert again.toJSON() == state.toJSON()
+        for symbol, depth in again.order_depths.items():
+            assert list(depth.buy_orders.items()) == list(state.order_depths[symbol].buy_orders.items())
+            assert list(depth.sell_orders.items()) == list(state.order_depths[symbol].sell_orders.items())
+
+    # With 30000 states alive every full collection walks all of them; keep
+    # the collector out of the timings, as the stdlib timeit does
+    def per_state(fn, items=states) -> float:
+        gc.disable()
+        try:
+            return timeit(lambda: [fn(item) for item in items], repeat=3) / len(items)
+        finally:
+            gc.enable()
+
+    t_old = per_state(lambda s: s.toJSON())
+    t_new = per_state(state_codec.encode)
+    backend = "orjson" if state_codec.orjson is not None else "json"
+    print("round 3 encode   toJSON %6.1f us   state_codec (%s) %5.1f us   %4.1fx   %4d -> %4d bytes"
+          % (t_old * 1e6, backend, t_new * 1e6, t_old / t_new, sum(len(s.toJSON()) for s in states) // len(states), sum(map(len, lines)) // len(lines)))
+    old_lines = [s.toJSON() for s in states]
+    t_old = per_state(json.loads, old_lines)
+    t_new = per_state(state_codec.decode, lines)
+    print("round 3 decode   json.loads(toJSON) %5.1f us (dicts only)   state_codec %5.1f us (TradingState)" % (t_old * 1e6, t_new * 1e6))
+    print("%d states round-tripped exactly" % len(states))
+
+
+@benchmark
+def bench_counterparty() -> None:
+    import gc
+
+    import backtester
+    import catalog
+    import counterparty
+
+    states = []
+    for data in backtester.load_days([4]):
+        recorder = _Recorder()
+        backtester.Backtester(recorder, data).run()
+        states.extend(recorder.states)
+    raj = counterparty.NAMES("Raj")
+
+    # What co_coconut asks every tick, by scanning names and through the index
+    def scan():
+        hits = 0
+        for state in states:
+            for trade in state.market_trades.get("COCONUT", ()):
+                if trade.seller == "Raj" and trade.timestamp == state.timestamp - 100:
+                    hits -= 1
+                elif trade.buyer == "Raj" and trade.timestamp == state.timestamp - 100:
+                    hits += 1
+        return hits
+
+    def indexed():
+        tape = counterparty.TradeIndex(horizon=1000)
+        hits = 0
+        for state in states:
+            tape.add_trades(state.market_trades)
+            for side, _, _, _ in tape.trades(raj, "COCONUT", state.timestamp - 100):
+                hits += side
+        return hits
+
+    assert scan() == indexed()
+    gc.disable()
+    try:
+        t_scan, t_index = timeit(scan, repeat=3) / len(states), timeit(indexed, repeat=3) / len(states)
+    finally:
+        gc.enable()
+    print("round 4 per tick   name scan %5.2f us   index (filing included) %5.2f us" % (t_scan * 1e6, t_index * 1e6))
+    index = catalog.default().counterparties(4, 1)
+    lookups = [(who, product, t) for who in range(len(counterparty.NAMES.names)) for product in ("COCONUT", "COCONUT_COUPON") for t in range(0, 1000000, 100)]
+    t_lookup = timeit(lambda: [index.net(*key) for key in lookups], repeat=3) / len(lookups)
+    print("round 4 day 1 tape: %d (name, product, tick) entries, net() lookup %.0f ns" % (len(index), t_lookup * 1e9))
+
+
+@benchmark
+def bench_logger() -> None:
+    import contextlib
+    import gc
+    import io
+
+    import backtester
+    import logger
+    from datamodel import Order
+
+    states = []
+    for data in backtester.load_days([3], [0]):
+        recorder = _Recorder()
+        backtester.Backtester(recorder, data).run()
+        states.extend(recorder.states)
+    orders = {"GIFT_BASKET": [Order("GIFT_BASKET", 70000, 5)], "ROSES": [Order("ROSES", 14000, -3), Order("ROSES", 14001, -2)]}
+    # The Logger every trader file pastes in
+    pasted = backtester.load_trader_module(os.path.join(backtester.DATA_ROOT, "trader_amethysts.py")).Logger
+
+    def replay(log, prints: int):
+        def go():
+            for state in states:
+                for k in range(prints):
+                    log.print("BS Price: ", 123.25, "Mid Price: ", state.timestamp, k)
+                log.flush(state, orders, 0, "Next price: 5053")
+        return go
+
+    for prints in (3, 300):
+        outputs = []
+        for log in (pasted(), logger.Logger()):
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                replay(log, prints)()
+            outputs.append(out.getvalue())
+        assert outputs[0] == outputs[1]
+
+        times = []
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(backtester._NullWriter()):
+                for log in (pasted(), logger.Logger(), logger.Logger(enabled=False)):
+                    times.append(timeit(replay(log, prints), repeat=3) / len(states))
+        finally:
+            gc.enable()
+        print("%3d prints per tick   pasted %6.1f us   shared %6.1f us (%.1fx)   disabled %4.2f us per tick"
+              % (prints, times[0] * 1e6, times[1] * 1e6, times[0] / times[1], times[2] * 1e6))
+
+    # Sampled: every 100th tick plus ticks with fills (none in these states), the prints on a DEBUG channel
+    def sampled_replay(log, prints: int):
+        def go():
+            for state in states:
+                for k in range(prints):
+                    log.print("BS Price: ", 123.25, "Mid Price: ", state.timestamp, k, level=logger.DEBUG, channel="coupon")
+                log.flush(state, orders, 0, "Next price: 5053")
+        return go
+
+    full = io.StringIO()
+    with contextlib.redirect_stdout(full):
+        replay(logger.Logger(), 3)()
+    sampled = io.StringIO()
+    with contextlib.redirect_stdout(sampled):
+        sampled_replay(logger.Logger(sampling=logger.Sampling(every=100, levels={"coupon": logger.DEBUG})), 3)()
+    # The ticks that are flushed print the same line as without sampling
+    assert sampled.getvalue().splitlines() == full.getvalue().splitlines()[::100]
+    for prints in (3, 300):
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(backtester._NullWriter()):
+                kept = timeit(sampled_replay(logger.Logger(sampling=logger.Sampling(every=100, levels={"coupon": logger.DEBUG})), prints), repeat=3) / len(states)
+                dropped = timeit(sampled_replay(logger.Logger(sampling=logger.Sampling(every=100)), prints), repeat=3) / len(states)
+        finally:
+            gc.enable()
+        print("%3d prints per tick   sampled 1/100: DEBUG kept %6.2f us   DEBUG below level %5.2f us per tick" % (prints, kept * 1e6, dropped * 1e6))
+
+
+@benchmark
+def bench_delta_log() -> None:
+    import contextlib
+    import io
+    import json
+
+    import backtester
+    import logger
+    import state_codec
+
+    # Each round's first day, with traderData carried over like trader_final_r5's
+    # and more log text per tick than any Logger can keep
+    for round_num in (1, 3, 4):
+        data = backtester.load_days([round_num], backtester.find_days(round_num)[:1])[0]
+        recorder = _Recorder()
+        backtester.Backtester(recorder, data).run()
+        states = recorder.states
+        lines = {}
+        for log in (logger.Logger(), logger.DeltaLogger()):
+            out = io.StringIO()
+            trader_data = ""
+            with contextlib.redirect_stdout(out):
+                for state in states:
+                    state.traderData = trader_data
+                    trader_data = "Next price: %d" % (state.timestamp // 300)
+                    log.print("x" * 5000)
+                    log.flush(state, {}, 0, trader_data)
+            lines[type(log).__name__] = out.getvalue().splitlines()
+        kept = {name: sum(len(json.loads(line)[-1]) for line in rows) / len(rows) for name, rows in lines.items()}
+        size = {name: sum(map(len, rows)) / len(rows) for name, rows in lines.items()}
+        print("round %d   log chars kept per tick: Logger %4.0f, DeltaLogger %4.0f (%.1fx)   line %4.0f / %4.0f chars"
+              % (round_num, kept["Logger"], kept["DeltaLogger"], kept["DeltaLogger"] / kept["Logger"], size["Logger"], size["DeltaLogger"]))
+        decoded = list(logger.decode_delta(lines["DeltaLogger"]))
+        assert [state_codec.encode(s) for s, *_ in decoded] == [state_codec.encode(s) for s in states]
+
+
+@benchmark
+def bench_ring_buffer() -> None:
+    import gc
+    import json
+
+    import numpy as np
+
+    import backtester
+    from ring_buffer import RingBuffer
+
+    # trader_final_r4's basket spread over round 3 day 0
+    data = backtester.load_days([3], [0])[0]
+    spreads = [m["GIFT_BASKET"] - 4 * m["CHOCOLATE"] - 6 * m["STRAWBERRIES"] - m["ROSES"] for m in data.mids]
+
+    def with_list():
+        cache, out = [], []
+        for spread in spreads:
+            if len(cache) == 200:
+                cache.pop(0)
+            cache.append(spread)
+            out.append((np.mean(np.array(cache)), np.std(np.array(cache)), np.mean(np.array(cache[-3:]))))
+        return out
+
+    def with_ring():
+        cache, out = RingBuffer(200), []
+        for spread in spreads:
+            cache.append(spread)
+            out.append((cache.mean(), cache.std(), cache.tail_mean(3)))
+        return out
+
+    assert np.allclose(with_list(), with_ring(), rtol=1e-9, atol=1e-9)
+    gc.disable()
+    try:
+        t_list = timeit(with_list, repeat=3) / len(spreads)
+        t_ring = timeit(with_ring, repeat=3) / len(spreads)
+    finally:
+        gc.enable()
+    cache = RingBuffer(200, spreads[-200:])
+    print("200-tick spread window: list + numpy %.1f us, RingBuffer %.2f us per tick (%.0fx)   traderData %d chars (digits=1)"
+          % (t_list * 1e6, t_ring * 1e6, t_list / t_ring, len(json.dumps(cache.dump(digits=1)))))
+
+
+@benchmark
+def bench_pricing() -> None:
+    import statistics
+
+    import numpy as np
+
+    import pricing
+    from data_cache import read_frame
+
+    # The copy data_analysis.py and the trader files carried
+    def black_scholes_price(S, T, r, sigma, K=10000):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+        d2 = d1 - sigma * np.sqrt(T)
+        return S * statistics.NormalDist().cdf(d1) - K * np.exp(-r * T) * statistics.NormalDist().cdf(d2)
+
+    # data_analysis.py's workload: a BS price per COCONUT row of round 4 day 1
+    df = read_frame(os.path.join("round-4-island-data-bottle", "prices_round_4_day_1.csv"))
+    df = df[df["product"] == "COCONUT"].reset_index(drop=True)
+    applied = df.apply(lambda x: black_scholes_price(x["mid_price"], 249/365, 0, 0.193), axis=1)
+    assert np.allclose(applied, pricing.call_price_array(df["mid_price"].to_numpy(), 249/365, 0, 0.193), rtol=0, atol=1e-9)
+    t_apply = timeit(lambda: df.apply(lambda x: black_scholes_price(x["mid_price"], 249/365, 0, 0.193), axis=1), repeat=3)
+    t_array = timeit(lambda: pricing.call_price_array(df["mid_price"].to_numpy(), 249/365, 0, 0.193), repeat=20)
+    t_greeks = timeit(lambda: pricing.call_greeks_array(df["mid_price"].to_numpy(), 249/365, 0, 0.193), repeat=20)
+    print("%d rows: df.apply %.1f ms, call_price_array %.3f ms (%.0fx), with greeks %.3f ms"
+          % (len(df), t_apply * 1e3, t_array * 1e3, t_apply / t_array, t_greeks * 1e3))
+
+    # get_order_coupon's per-tick call
+    mids = df["mid_price"].tolist()
+    t_copy = timeit(lambda: [black_scholes_price(S, 245/365, 0.01, 0.191) for S in mids], repeat=3) / len(mids)
+    t_scalar = timeit(lambda: [pricing.call_price(S, 245/365, 0.01, 0.191) for S in mids], repeat=3) / len(mids)
+    t_scalar_greeks = timeit(lambda: [pricing.call_greeks(S, 245/365, 0.01, 0.191) for S in mids], repeat=3) / len(mids)
+    print("per call: copy %.2f us, call_price %.2f us (%.1fx), call_greeks %.2f us"
+          % (t_copy * 1e6, t_scalar * 1e6, t_copy / t_scalar, t_scalar_greeks * 1e6))
+
+
+@benchmark
+def bench_implied_vol() -> None:
+    from math import exp, log, sqrt
+
+    import numpy as np
+    from scipy.stats import norm
+
+    import catalog
+    import find_vol
+    import pricing
+
+    # find_vol.py's per-row Newton loop, as it was
+    def find_vol_row(S, K, t, r, C0):
+        vol, epsilon, count = 0.50, 1, 0
+        while epsilon > 1e-3:
+            count += 1
+            if count >= 1000:
+                break
+            orig_vol = vol
+            d1 = 1 / (vol * sqrt(t)) * (log(S / K) + (r + vol ** 2 / 2) * t)
+            d2 = d1 - vol * sqrt(t)
+            value = norm.cdf(d1) * S - norm.cdf(d2) * K * exp(-r * t) - C0
+            vol = -value / (S * norm.pdf(d1) * sqrt(t)) + vol
+            epsilon = abs((vol - orig_vol) / orig_vol)
+        return vol
+
+    cat = catalog.default()
+    days = cat.days(4)
+    find_vol.iv_series(4, days[0])  # parse the days once, outside the timing
+    spot, call = cat.query(4, days[0], "COCONUT").mid_price, cat.query(4, days[0], "COCONUT_COUPON").mid_price
+    rows = 300
+    t_loop = timeit(lambda: [find_vol_row(S, 10000, 249/250, 0, C) for S, C in zip(spot[:rows].tolist(), call[:rows].tolist())], repeat=1) / rows
+    old = np.array([find_vol_row(S, 10000, 249/250, 0, C) for S, C in zip(spot[:rows].tolist(), call[:rows].tolist())])
+    new = pricing.implied_vol_array(call[:rows], spot[:rows], 249/250, 0)
+    # The old loop stops at a 0.1% change between iterations; the new one at 1e-6 seashells of price
+    assert np.allclose(old, new, rtol=1e-3)
+    ticks = sum(len(cat.query(4, day, "COCONUT")) for day in days)
+    t_days = timeit(lambda: [find_vol.iv_series(4, day) for day in days], repeat=3)
+    t_array = timeit(lambda: pricing.implied_vol_array(call, spot, 249/250, 0), repeat=5)
+    print("round 4, %d ticks: per-row loop %.0f us per row (%.1f s projected), iv_series %.0f ms (%.0fx); one day's array %.1f ms"
+          % (ticks, t_loop * 1e6, t_loop * ticks, t_days * 1e3, t_loop * ticks / t_days, t_array * 1e3))
+
+
+@benchmark
+def bench_rls() -> None:
+    import gc
+
+    import catalog
+    from rls import ARPredictor
+
+    # trader_final_r5's STARFRUIT AR(4), from lr.ipynb's fit and from a naive start
+    cat = catalog.default()
+    coeff, intercept = [0.18895127, 0.20771801, 0.26114406, 0.34171985], 2.3552758852292754
+    for start_coeff, start_intercept in ((coeff, intercept), ([0.0, 0.0, 0.0, 1.0], 0.0)):
+        errors = []
+        for day in cat.days(1):
+            mids = cat.query(1, day, "STARFRUIT").mid_price.tolist()
+            # delta=0 and no forgetting: the coefficients never move
+            for predictor in (ARPredictor(start_coeff, start_intercept, forgetting=1.0, delta=0.0), ARPredictor(start_coeff, start_intercept)):
+                se = n = 0
+                for mid in mids:
+                    predicted = predictor.predict()
+                    if predicted is not None:
+                        se += (mid - predicted) ** 2
+                        n += 1
+                    predictor.update(mid)
+                errors.append(se / n)
+        print("start %s: next-mid MSE fixed / RLS  %s" % (start_coeff, "   ".join("%.4f / %.4f" % pair for pair in zip(errors[::2], errors[1::2]))))
+
+    def run():
+        predictor = ARPredictor(coeff, intercept)
+        for mid in mids:
+            predictor.update(mid)
+            predictor.predict()
+    gc.disable()
+    try:
+        t = timeit(run, repeat=3) / len(mids)
+    finally:
+        gc.enable()
+    print("update + predict %.1f us per tick" % (t * 1e6))
+
+
+def main(names) -> None:
+    for name in names or BENCHMARKS:
+        print("== %s" % name)
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,131 @@
+"""Bundle a Trader file and the helper modules it imports into the single file the platform takes.
+
+Usage:
+    python bundle.py trader_final_r5.py                  # writes dist/trader_final_r5.py
+    python bundle.py trader_final_r4.py upload.py
+
+The platform runs one uploaded file next to its own datamodel.py, so every
+top-level `from pricing import call_price` of a module that sits beside the
+trader (pricing, vol_tracker, rls, logger, ring_buffer, lazy_import, ...)
+is replaced by that module's code, once, after the helpers it imports in
+turn. A helper import wrapped in try/except ImportError is replaced the
+same way, handler and all. Everything else, datamodel and the standard
+library included, is left as written. Inlined modules lose their docstring
+and `if __name__ == "__main__":` block.
+
+The helper modules stay the only copy of their code: edit them, not the
+bundle. tests/test_bundle.py replays each bundled submission trader with
+the helper modules hidden and checks it trades and logs exactly as the
+trader does with them.
+"""
+import ast
+import os
+import sys
+from typing import List, Optional, Set
+
+DIST_DIR = "dist"
+# Provided by the platform, never inlined
+PLATFORM_MODULES = {"datamodel"}
+
+
+def helper_modules(folder: str) -> Set[str]:
+    """Names of the modules in folder that a bundle inlines."""
+    return {name[:-3] for name in os.listdir(folder) if name.endswith(".py")} - PLATFORM_MODULES
+
+
+def _is_import_error(handler: ast.ExceptHandler) -> bool:
+    names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return all(isinstance(n, ast.Name) and n.id in ("ImportError", "ModuleNotFoundError") for n in names)
+
+
+def _helper_import(node: ast.stmt, helpers: Set[str]) -> Optional[str]:
+    """The helper a top-level statement imports from, directly or with an ImportError fallback; None for any other statement."""
+    if isinstance(node, ast.Try) and len(node.body) == 1 and not node.orelse and not node.finalbody \
+            and node.handlers and all(_is_import_error(h) for h in node.handlers):
+        found = _helper_import(node.body[0], helpers)
+        if found is not None:
+            return found
+    if isinstance(node, ast.ImportFrom) and not node.level and node.module in helpers:
+        return node.module
+    return None
+
+
+def _check_imports(tree: ast.Module, helpers: Set[str], path: str) -> None:
+    top = set()
+    for node in tree.body:
+        if _helper_import(node, helpers) is not None:
+            top.update(id(n) for n in ast.walk(node))
+    for node in ast.walk(tree):
+        if id(node) in top:
+            continue
+        if isinstance(node, ast.ImportFrom) and not node.level and node.module in helpers:
+            raise ValueError("%s:%d: only top-level `from %s import ...` can be bundled" % (path, node.lineno, node.module))
+        if isinstance(node, ast.Import) and any(a.name.partition(".")[0] in helpers for a in node.names):
+            raise ValueError("%s:%d: `import module` of a helper cannot be bundled, use `from ... import ...`" % (path, node.lineno))
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            raise ValueError("%s:%d: __future__ imports cannot be bundled" % (path, node.lineno))
+
+
+def _is_main_block(node: ast.stmt) -> bool:
+    test = node.test if isinstance(node, ast.If) else None
+    return isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+
+
+def _source(path: str, helpers: Set[str], done: List[str], inlined: bool) -> List[str]:
+    """Lines of path with its helper imports replaced by the helpers' own (not yet inlined) code."""
+    with open(path) as f:
+        text = f.read()
+    tree = ast.parse(text, path)
+    _check_imports(tree, helpers, path)
+    lines = text.splitlines()
+    out: List[str] = []
+    cursor = 0
+    for i, node in enumerate(tree.body):
+        docstring = i == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+        module = _helper_import(node, helpers)
+        if module is None and not (inlined and (docstring or _is_main_block(node))):
+            continue
+        out += lines[cursor:node.lineno - 1]
+        cursor = node.end_lineno
+        if module is not None and module not in done:
+            done.append(module)
+            helper_path = os.path.join(os.path.dirname(path), module + ".py")
+            out.append("# ---- %s.py, bundled ----" % module)
+            out += _source(helper_path, helpers, done, inlined=True)
+            out.append("# ---- end of %s.py ----" % module)
+    out += lines[cursor:]
+    return out
+
+
+def bundle(trader_path: str) -> str:
+    """Source of trader_path with the helper modules it imports inlined."""
+    trader_path = os.path.abspath(trader_path)
+    folder = os.path.dirname(trader_path)
+    helpers = helper_modules(folder) - {os.path.basename(trader_path)[:-3]}
+    done: List[str] = []
+    lines = _source(trader_path, helpers, done, inlined=False)
+    header = "# Generated by bundle.py from %s%s; edit those files, not this one" % (
+        os.path.basename(trader_path), "".join(", %s.py" % m for m in done))
+    return "\n".join([header] + lines) + "\n"
+
+
+def write_bundle(trader_path: str, out_path: Optional[str] = None) -> str:
+    if out_path is None:
+        out_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DIST_DIR, os.path.basename(trader_path))
+    text = bundle(trader_path)
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w") as f:
+        f.write(text)
+    return out_path
+
+
+def main(argv: List[str]) -> None:
+    if not argv or len(argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+    out_path = write_bundle(argv[0], argv[1] if len(argv) > 1 else None)
+    print("wrote %s" % out_path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
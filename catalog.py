@@ -0,0 +1,327 @@
+"""Content-addressed catalog of every day file in the repo's bottles.
+
+The same price files ship several times (round-5-island-data-bottle repeats
+rounds 1, 3 and 4, Ayush/ keeps more copies, round-4-island-data-bottle.zip
+another). Every prices/trades CSV under the repo, including those inside zip
+archives (read in place, never extracted), is hashed once (hashes are remembered in .bottle_cache/catalog.json
+by size and mtime) and each unique file is parsed into the columnar cache
+once, under its hash, whichever copy is read.
+
+The anonymised (_nn) and named (_wn) trade files of a day are joined into a
+single tape: every trade appears once, with names wherever a named copy has
+them.
+
+    cat = default()
+    cat.days(3)                                  # [0, 1, 2]
+    book = cat.query(3, 1, "GIFT_BASKET")        # one product's book and trades
+    book.mid_price, book.trades.buyer_names()
+    cat.counterparties(4, 1).net(counterparty.NAMES("Raj"), "COCONUT", 1500)
+    cat.duplicates()                             # {sha1: [paths]} of the repeated files
+
+    python catalog.py                            # print what is stored once and where
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import counterparty
+import data_cache
+
+INDEX_FILE = os.path.join(data_cache.CACHE_DIR, "catalog.json")
+SKIP_DIRS = {"__MACOSX", "__pycache__", ".git", ".bottle_cache"}
+
+DAY_FILE = re.compile(r"^(prices|trades)_round_(-?\d+)_day_(-?\d+)(?:_(nn|wn))?\.csv$")
+
+PRICES = "prices"
+NN = "nn"
+WN = "wn"
+
+
+class Source:
+    """One CSV on disk and what it holds."""
+
+    def __init__(self, path: str, kind: str, round_num: int, day: int, sha1: str, size: int) -> None:
+        self.path = path
+        self.kind = kind  # PRICES, NN or WN
+        self.round = round_num
+        self.day = day
+        self.sha1 = sha1
+        self.size = size  # uncompressed bytes
+
+    def __repr__(self) -> str:
+        return "Source(%s, %s)" % (os.path.relpath(self.path, data_cache.DATA_ROOT), self.sha1[:10])
+
+
+class ProductDay:
+    """One product's rows of a day: book columns plus its slice of the joined trade tape."""
+
+    def __init__(self, round_num: int, day: int, product: str, prices: data_cache.Table, trades: Optional[data_cache.TradeTable]) -> None:
+        self.round = round_num
+        self.day = day
+        self.product = product
+        if isinstance(prices, data_cache.ObservationTable):
+            if product != "ORCHIDS":
+                raise KeyError(product)
+            self.timestamp = prices.timestamp
+            self.mid_price = prices.orchids
+            self.observations = prices
+        else:
+            if product not in prices.products:
+                raise KeyError(product)
+            rows = prices.rows(product)
+            self.timestamp = prices.timestamp[rows]
+            self.bid_price = prices.bid_price[rows]
+            self.bid_volume = prices.bid_volume[rows]
+            self.ask_price = prices.ask_price[rows]
+            self.ask_volume = prices.ask_volume[rows]
+            self.mid_price = prices.mid_price[rows]
+            self.observations = None
+        self.trades = ProductTrades(trades, product) if trades is not None else None
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+class ProductTrades:
+
+    def __init__(self, table: data_cache.TradeTable, product: str) -> None:
+        rows = table.rows(product) if product in table.symbols else np.zeros(0, dtype=np.intp)
+        self.names = table.names
+        self.timestamp = table.timestamp[rows]
+        self.price = table.price[rows]
+        self.quantity = table.quantity[rows]
+        self.buyer = table.buyer[rows]
+        self.seller = table.seller[rows]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def buyer_names(self) -> List[str]:
+        return [self.names[i] for i in self.buyer.tolist()]
+
+    def seller_names(self) -> List[str]:
+        return [self.names[i] for i in self.seller.tolist()]
+
+
+def file_sha1(path: str) -> str:
+    """sha1 of a file's bytes; a zip member is hashed as it is decompressed."""
+    h = hashlib.sha1()
+    archive, member = data_cache.split_archive(path)
+    with (zipfile.ZipFile(archive).open(member) if member is not None else open(path, "rb")) as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_index() -> Dict[str, dict]:
+    try:
+        with open(INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: Dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+    tmp = INDEX_FILE + ".tmp%d" % os.getpid()
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=0, sort_keys=True)
+    os.replace(tmp, INDEX_FILE)
+
+
+def _preference(source: Source) -> tuple:
+    # The round's own bottle first, then other top-level bottles, then copies further down
+    rel = os.path.relpath(source.path, data_cache.DATA_ROOT)
+    folder = os.path.dirname(rel)
+    return (folder != "round-%d-island-data-bottle" % source.round, rel.count(os.sep), rel)
+
+
+def join_trades(nn: Optional[data_cache.TradeTable], wn: Optional[data_cache.TradeTable]) -> Tuple[Dict[str, np.ndarray], dict]:
+    """One tape holding each trade of the nn and wn files once, named where wn names it.
+
+    Trades are matched on (timestamp, symbol, price, quantity) and their
+    occurrence count, so the few trades one file has and the other lacks
+    are kept as well.
+    """
+    symbols = data_cache.Interner()
+    names = data_cache.Interner([""])
+    rows = []
+    seen = collections.Counter()
+    for table in (wn, nn):
+        if table is None:
+            continue
+        columns = zip(*(np.asarray(c).tolist() for c in (table.timestamp, table.symbol, table.price, table.quantity, table.buyer, table.seller)))
+        counts = collections.Counter()
+        for timestamp, symbol, price, quantity, buyer, seller in columns:
+            key = (timestamp, table.symbols[symbol], price, quantity)
+            counts[key] += 1
+            # An occurrence the named file already supplied
+            if counts[key] <= seen[key]:
+                continue
+            rows.append((timestamp, symbols(key[1]), price, quantity, names(table.names[buyer]), names(table.names[seller])))
+        seen |= counts
+    rows.sort(key=lambda r: r[0])
+    columns = list(zip(*rows)) or [[]] * 6
+    arrays = {
+        "timestamp": np.array(columns[0], dtype=np.int32),
+        "symbol": np.array(columns[1], dtype=np.uint8),
+        "price": np.array(columns[2], dtype=np.float64),
+        "quantity": np.array(columns[3], dtype=np.int32),
+        "buyer": np.array(columns[4], dtype=np.int16),
+        "seller": np.array(columns[5], dtype=np.int16),
+    }
+    return arrays, {"symbols": symbols.names, "names": names.names}
+
+
+class Catalog:
+
+    def __init__(self, root: str = data_cache.DATA_ROOT) -> None:
+        self.root = root
+        self.sources: List[Source] = []
+        # (round, day) -> kind -> preferred source of that kind
+        self.files: Dict[Tuple[int, int], Dict[str, Source]] = {}
+        self._counterparties: Dict[Tuple[int, int], Optional[counterparty.TradeIndex]] = {}
+        self.scan()
+
+    def _walk(self):
+        for folder, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith(".") and not d.startswith("synthetic-"))
+            for name in sorted(files):
+                match = DAY_FILE.match(name)
+                if match:
+                    yield os.path.join(folder, name), match
+                elif name.endswith(".zip"):
+                    yield from self._walk_zip(os.path.join(folder, name))
+
+    def _walk_zip(self, archive: str):
+        try:
+            with zipfile.ZipFile(archive) as z:
+                members = sorted(z.namelist())
+        except zipfile.BadZipFile:
+            return
+        for member in members:
+            if any(part in SKIP_DIRS for part in member.split("/")[:-1]):
+                continue
+            match = DAY_FILE.match(member.rsplit("/", 1)[-1])
+            if match:
+                yield os.path.join(archive, *member.split("/")), match
+
+    def scan(self) -> None:
+        index = _load_index()
+        fresh = {}
+        self.sources = []
+        for path, match in self._walk():
+            stamp = data_cache._source_stamp(path)
+            rel = os.path.relpath(path, self.root)
+            entry = index.get(rel)
+            if entry is None or any(entry.get(k) != v for k, v in stamp.items()):
+                entry = dict(stamp, sha1=file_sha1(path))
+            fresh[rel] = entry
+            kind = PRICES if match.group(1) == "prices" else (match.group(4) or NN)
+            self.sources.append(Source(path, kind, int(match.group(2)), int(match.group(3)), entry["sha1"], entry["size"]))
+        if fresh != index:
+            _save_index(fresh)
+
+        self.files = {}
+        for source in sorted(self.sources, key=_preference):
+            self.files.setdefault((source.round, source.day), {}).setdefault(source.kind, source)
+
+    def rounds(self) -> List[int]:
+        return sorted({r for r, _ in self.files})
+
+    def days(self, round_num: int) -> List[int]:
+        return sorted(d for r, d in self.files if r == round_num and PRICES in self.files[r, d])
+
+    def duplicates(self) -> Dict[str, List[str]]:
+        by_hash = collections.defaultdict(list)
+        for source in self.sources:
+            by_hash[source.sha1].append(source.path)
+        return {h: paths for h, paths in by_hash.items() if len(paths) > 1}
+
+    def _source(self, round_num: int, day: int, kind: str) -> Optional[Source]:
+        return self.files.get((round_num, day), {}).get(kind)
+
+    def day_hash(self, round_num: int, day: int) -> str:
+        """Hash of everything replayed for a day (its prices and trade files)."""
+        found = self.files.get((round_num, day), {})
+        return hashlib.sha1(" ".join(found[k].sha1 if k in found else "-" for k in (PRICES, NN, WN)).encode()).hexdigest()
+
+    def _prices_source(self, round_num: int, day: int) -> Source:
+        source = self._source(round_num, day, PRICES)
+        if source is None:
+            raise FileNotFoundError("no prices file for round %d day %d" % (round_num, day))
+        return source
+
+    def prices(self, round_num: int, day: int) -> data_cache.Table:
+        source = self._prices_source(round_num, day)
+        return data_cache.load_hashed(source.sha1, source.path)
+
+    def stream_prices(self, round_num: int, day: int, chunk_rows: int = data_cache.CHUNK_ROWS) -> Iterator[data_cache.Table]:
+        """The day's prices in chunks of whole ticks, decoded (and decompressed) on demand."""
+        source = self._prices_source(round_num, day)
+        return data_cache.stream_hashed(source.sha1, source.path, chunk_rows)
+
+    def trades(self, round_num: int, day: int) -> Optional[data_cache.TradeTable]:
+        """The day's joined nn/wn trade tape, or None when the day has no trades."""
+        nn, wn = self._source(round_num, day, NN), self._source(round_num, day, WN)
+        if nn is None and wn is None:
+            return None
+        if nn is None or wn is None:
+            only = nn or wn
+            return data_cache.load_hashed(only.sha1, only.path)
+        digest = hashlib.sha1(("join %s %s" % (nn.sha1, wn.sha1)).encode()).hexdigest()
+        table = data_cache.open_hashed(digest)
+        if table is None:
+            arrays, meta = join_trades(data_cache.load_hashed(nn.sha1, nn.path), data_cache.load_hashed(wn.sha1, wn.path))
+            table = data_cache.store_hashed(digest, data_cache.TRADES, arrays, meta)
+        return table
+
+    def counterparties(self, round_num: int, day: int) -> Optional[counterparty.TradeIndex]:
+        """The day's trade tape indexed by (counterparty id, product, timestamp)."""
+        key = (round_num, day)
+        if key not in self._counterparties:
+            table = self.trades(round_num, day)
+            self._counterparties[key] = counterparty.TradeIndex.from_table(table) if table is not None else None
+        return self._counterparties[key]
+
+    def products(self, round_num: int, day: int) -> List[str]:
+        table = self.prices(round_num, day)
+        return list(table.products) if isinstance(table, data_cache.PriceTable) else ["ORCHIDS"]
+
+    def query(self, round_num: int, day: int, product: str) -> ProductDay:
+        return ProductDay(round_num, day, product, self.prices(round_num, day), self.trades(round_num, day))
+
+
+_DEFAULT: Optional[Catalog] = None
+
+
+def default() -> Catalog:
+    """The catalog of this repo, scanned once per process."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = Catalog()
+    return _DEFAULT
+
+
+def main() -> None:
+    cat = default()
+    unique = {s.sha1 for s in cat.sources}
+    size = sum(s.size for s in cat.sources)
+    unique_size = sum({s.sha1: s.size for s in cat.sources}.values())
+    print("%d files, %d unique (%.1f MB of CSV, %.1f MB unique)" % (len(cat.sources), len(unique), size / 1e6, unique_size / 1e6))
+    for round_num in cat.rounds():
+        for day in cat.days(round_num):
+            found = cat.files[round_num, day]
+            print("round %d day %2d: %s" % (round_num, day, "  ".join("%s=%s" % (k, os.path.relpath(found[k].path, cat.root)) for k in (PRICES, NN, WN) if k in found)))
+    for digest, paths in sorted(cat.duplicates().items(), key=lambda kv: kv[1]):
+        print("%s x%d: %s" % (digest[:10], len(paths), ", ".join(os.path.relpath(p, cat.root) for p in paths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Cold-start cost of each Trader file: import time, and the first run() call.
+
+Usage:
+    python coldstart.py                           # every module defining Trader
+    python coldstart.py trader_final_r5.py Ayush/round1 --repeat 5
+
+Each file is imported in a fresh interpreter under python -X importtime, as
+the platform does on a cold start, then Trader().run is called once on the
+first state of the first day it trades (sent over in state_codec form, so
+the backtester and its numpy never load in that interpreter). Reported per
+file, best of --repeat runs:
+
+    import ms      executing the file, with everything it imports
+    first tick ms  Trader() plus the first run(), where lazy_import modules load
+    heaviest       the top-level imports that cost the most, by cumulative time
+    on first tick  lazy_import modules that woke up inside run(), and how many
+                   other top-level modules loaded with them
+
+ColdStart.heavy lists which of HEAVY_MODULES were really loaded (not just
+lazily registered) once the first tick was over; the submission traders
+keep numpy off that list (tests/test_coldstart.py).
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import backtester
+import state_codec
+import tournament
+
+DEFAULT_REPEAT = 3
+START, MARKER = "coldstart: importing", "coldstart: imported"
+# Modules whose loading dominates a cold start
+HEAVY_MODULES = ("numpy", "pandas", "scipy")
+
+# Runs in the fresh interpreter: argv = [trader path, repo root], stdin = one encoded state
+_CHILD = r"""
+import importlib.util, io, os, sys, time
+path, root = sys.argv[1], sys.argv[2]
+sys.path[:0] = [os.path.dirname(path), root]
+stdout, sys.stdout = sys.stdout, io.StringIO()
+sys.stderr.write("%s\n" % START)
+sys.stderr.flush()
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("trader_cold", path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter() - start
+sys.stderr.write("%s\n" % MARKER)
+sys.stderr.flush()
+import state_codec
+from lazy_import import is_loaded
+state = state_codec.decode(sys.stdin.read())
+before = {name.partition(".")[0] for name in sys.modules}
+pending = [name for name, m in list(sys.modules.items()) if not is_loaded(m)]
+start = time.perf_counter()
+error = None
+try:
+    module.Trader().run(state)
+except Exception as e:
+    error = repr(e)
+first_tick = time.perf_counter() - start
+woken = sorted(name for name in pending if is_loaded(sys.modules[name]))
+others = len({name.partition(".")[0] for name in sys.modules} - before - set(woken))
+loaded = woken + (["+%d modules" % others] if others else [])
+heavy = [name for name in HEAVY if name in sys.modules and is_loaded(sys.modules[name])]
+sys.stdout = stdout
+import json
+print(json.dumps({"import": imported, "first_tick": first_tick, "loaded": loaded, "heavy": heavy, "error": error}))
+""".replace("START", repr(START)).replace("MARKER", repr(MARKER)).replace("HEAVY", repr(HEAVY_MODULES))
+
+
+class ColdStart:
+
+    def __init__(self, path: str, rounds: Tuple[int, ...]) -> None:
+        self.path = path
+        self.rounds = rounds
+        self.import_ms = float("inf")
+        self.first_tick_ms = float("inf")
+        # top-level module -> cumulative import microseconds
+        self.imports: Dict[str, int] = {}
+        self.loaded_on_first_tick: List[str] = []
+        # HEAVY_MODULES really loaded, at import or by the first run()
+        self.heavy: List[str] = []
+        self.error: Optional[str] = None
+
+    @property
+    def total_ms(self) -> float:
+        return self.import_ms + self.first_tick_ms
+
+    def heaviest(self, n: int = 3) -> List[Tuple[str, int]]:
+        return sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+class _FirstState:
+    """A trader that keeps the first TradingState it is handed."""
+
+    def __init__(self) -> None:
+        self.state = None
+
+    def run(self, state):
+        if self.state is None:
+            self.state = state
+        return {}, 0, ""
+
+
+def first_state(rounds: Tuple[int, ...]) -> str:
+    recorder = _FirstState()
+    backtester.Backtester(recorder, tournament._day(rounds, 0)).run()
+    return state_codec.encode(recorder.state)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds of each top-level import the trader file made."""
+    imports = {}
+    lines = stderr.splitlines()
+    for line in lines[lines.index(START) + 1:]:
+        if line == MARKER:
+            break
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def measure(path: str, rounds: Tuple[int, ...], state: str, repeat: int = DEFAULT_REPEAT) -> ColdStart:
+    result = ColdStart(path, rounds)
+    full_path = os.path.join(backtester.DATA_ROOT, path)
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD, full_path, backtester.DATA_ROOT],
+                              input=state, capture_output=True, text=True, cwd=os.path.dirname(full_path))
+        if proc.returncode != 0:
+            result.error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "exit %d" % proc.returncode
+            return result
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        if report["import"] * 1000 < result.import_ms:
+            result.import_ms = report["import"] * 1000
+            result.imports = parse_importtime(proc.stderr)
+        result.first_tick_ms = min(result.first_tick_ms, report["first_tick"] * 1000)
+        result.loaded_on_first_tick = report["loaded"]
+        result.heavy = report["heavy"]
+        result.error = report["error"]
+    return result
+
+
+def coldstart(paths: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT) -> List[ColdStart]:
+    products = tournament.round_products()
+    states: Dict[Tuple[int, ...], str] = {}
+    results = []
+    for path in tournament.discover(paths):
+        with open(os.path.join(backtester.DATA_ROOT, path), encoding="utf-8", errors="replace") as f:
+            rounds = tournament.applicable_rounds(f.read(), products)
+        if not rounds:
+            continue
+        if rounds not in states:
+            states[rounds] = first_state(rounds)
+        results.append(measure(path, rounds, states[rounds], repeat))
+    return results
+
+
+def print_report(results: List[ColdStart]) -> None:
+    width = max([len(r.path) for r in results] + [6])
+    print("%-*s  %9s  %13s  %8s  %-40s  %s" % (width, "trader", "import ms", "first tick ms", "total ms", "heaviest imports (ms)", "on first tick"))
+    # Files that failed to import have no times and go last
+    for r in sorted(results, key=lambda r: (r.total_ms == float("inf"), -r.total_ms)):
+        heaviest = ", ".join("%s %.0f" % (name, us / 1000) for name, us in r.heaviest())
+        note = " ".join(r.loaded_on_first_tick)
+        if r.error:
+            note = (note + "  " if note else "") + "error: " + r.error
+        times = ["%.1f" % t if t != float("inf") else "-" for t in (r.import_ms, r.first_tick_ms, r.total_ms)]
+        print("%-*s  %9s  %13s  %8s  %-40s  %s" % (width, r.path, times[0], times[1], times[2], heaviest, note))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repeat = DEFAULT_REPEAT
+    if "--repeat" in args:
+        i = args.index("--repeat")
+        repeat = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    print_report(coldstart(args or None, repeat))
@@ -0,0 +1,144 @@
+"""Counterparty names as small ints, and an index of who traded what at each tick.
+
+The named trade files (trades_*_wn.csv) and the platform's market_trades say
+who was on each side of a trade. Research over whole tapes asks the same
+question over and over ("did Raj sell COCONUT at this tick?"), so names are
+interned once and trades are kept under (counterparty id, product, timestamp):
+
+    from counterparty import NAMES, TradeIndex
+    RAJ = NAMES("Raj")
+
+    index = catalog.default().counterparties(4, 1)   # a whole day's tape, for replays
+    index.net(RAJ, "COCONUT", 1500)                  # Raj's bought minus sold volume at that tick
+
+    tape = TradeIndex(horizon=1000)            # a rolling tape: keep the last 10 ticks
+    tape.add_trades(state.market_trades)
+    for side, price, quantity, other in tape.trades(RAJ, "COCONUT", state.timestamp - 100):
+        ...                                    # side is BUY or SELL, from Raj's point of view
+
+Submission files keep scanning state.market_trades by name instead: a tick
+carries only a handful of trades, so the scan is cheaper than filing them
+(python bench.py counterparty), and it needs no extra file uploaded.
+
+Ids are the same in every process: KNOWN names come first, in a fixed order,
+and names never seen before are appended as they appear.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+BUY, SELL = 1, -1
+
+# Everyone the round 1-5 tapes name; "" is the anonymous side of the _nn files
+KNOWN = ["", "SUBMISSION", "Adam", "Amelia", "Raj", "Remy", "Rhianna", "Ruby", "Valentina", "Vinnie", "Vladimir"]
+
+
+class Names:
+    """Maps counterparty names to small consecutive ints, KNOWN first."""
+
+    def __init__(self, names: List[str] = KNOWN) -> None:
+        self.names: List[str] = list(names)
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __call__(self, name: Optional[str]) -> int:
+        if name is None:
+            name = ""
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def name(self, i: int) -> str:
+        return self.names[i]
+
+
+NAMES = Names()
+
+# (side, price, quantity, other side's id)
+Fill = Tuple[int, float, int, int]
+
+
+class TradeIndex:
+    """Trades under (counterparty id, product, timestamp), in tape order.
+
+    Every trade is filed twice, once under its buyer (side BUY) and once
+    under its seller (side SELL). With horizon set, ticks more than horizon
+    older than the newest one added are dropped as new ones come in.
+    """
+
+    def __init__(self, names: Names = NAMES, horizon: Optional[int] = None) -> None:
+        self.names = names
+        self.horizon = horizon
+        self._fills: Dict[Tuple[int, str, int], List[Fill]] = {}
+        # timestamp -> keys filed at it, oldest first, for pruning
+        self._ticks: deque = deque()
+        self._keys_at: Dict[int, List[Tuple[int, str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fills)
+
+    def add(self, timestamp: int, symbol: str, price: float, quantity: int, buyer: int, seller: int) -> None:
+        keys = self._keys_at.get(timestamp)
+        if keys is None:
+            keys = self._keys_at[timestamp] = []
+            self._ticks.append(timestamp)
+        for who, side, other in ((buyer, BUY, seller), (seller, SELL, buyer)):
+            key = (who, symbol, timestamp)
+            fills = self._fills.get(key)
+            if fills is None:
+                fills = self._fills[key] = []
+                keys.append(key)
+            fills.append((side, price, quantity, other))
+
+    def add_trades(self, trades: Dict[str, List]) -> None:
+        """File a tick's state.market_trades (or own_trades); names are interned on the way in."""
+        names = self.names
+        newest = None
+        for rows in trades.values():
+            for t in rows:
+                if newest is None:
+                    # Timestamps running backwards past the horizon mean a new day
+                    if self.horizon is not None and self._ticks and t.timestamp < self._ticks[-1] - self.horizon:
+                        self.clear()
+                    newest = t.timestamp
+                self.add(t.timestamp, t.symbol, t.price, t.quantity, names(t.buyer), names(t.seller))
+                if t.timestamp > newest:
+                    newest = t.timestamp
+        if self.horizon is not None and newest is not None:
+            self.prune(newest - self.horizon)
+
+    def clear(self) -> None:
+        self._fills.clear()
+        self._ticks.clear()
+        self._keys_at.clear()
+
+    def prune(self, before: int) -> None:
+        """Drop every tick older than before."""
+        ticks = self._ticks
+        while ticks and ticks[0] < before:
+            for key in self._keys_at.pop(ticks.popleft()):
+                del self._fills[key]
+
+    def trades(self, who: int, product: str, timestamp: int) -> List[Fill]:
+        return self._fills.get((who, product, timestamp), [])
+
+    def bought(self, who: int, product: str, timestamp: int) -> int:
+        return sum(quantity for side, _, quantity, _ in self.trades(who, product, timestamp) if side == BUY)
+
+    def sold(self, who: int, product: str, timestamp: int) -> int:
+        return sum(quantity for side, _, quantity, _ in self.trades(who, product, timestamp) if side == SELL)
+
+    def net(self, who: int, product: str, timestamp: int) -> int:
+        return sum(side * quantity for side, _, quantity, _ in self.trades(who, product, timestamp))
+
+    @classmethod
+    def from_table(cls, table, names: Names = NAMES) -> "TradeIndex":
+        """Index a data_cache.TradeTable; its per-file name ids are remapped onto names."""
+        index = cls(names)
+        remap = [names(name) for name in table.names]
+        symbols = table.symbols
+        for timestamp, symbol, price, quantity, buyer, seller in zip(
+                table.timestamp.tolist(), table.symbol.tolist(), table.price.tolist(),
+                table.quantity.tolist(), table.buyer.tolist(), table.seller.tolist()):
+            index.add(timestamp, symbols[symbol], price, quantity, remap[buyer], remap[seller])
+        return index
@@ -0,0 +1,477 @@
+"""Columnar binary cache for the semicolon price/trade CSV bottles.
+
+The first load of a CSV converts it into one .npy file per column under
+.bottle_cache/; later loads memory-map those files, so they are zero-copy
+and take milliseconds. A cache entry is rebuilt whenever the size or
+modification time of its source CSV changes.
+
+    table = load("round-3-island-data-bottle/prices_round_3_day_0.csv")
+    rows = table.rows("GIFT_BASKET")
+    table.mid_price[rows]
+
+    df = read_frame("round-4-island-data-bottle/prices_round_4_day_1.csv")  # drop-in for pd.read_csv(..., sep=";")
+
+A CSV inside a zip is addressed as "bottle.zip/member.csv" and read without
+extracting it; stream() hands a file out in chunks as it is decompressed
+and parsed, so a replay can start on the first ticks of a day.
+"""
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DATA_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(DATA_ROOT, ".bottle_cache")
+
+LEVELS = 3
+FORMAT_VERSION = 1
+# Rows per chunk when a file is streamed (about 1000 ticks of a 4-product round)
+CHUNK_ROWS = 4096
+
+PRICES = "prices"
+TRADES = "trades"
+OBSERVATIONS = "observations"
+
+OBSERVATION_COLUMNS = ["ORCHIDS", "TRANSPORT_FEES", "EXPORT_TARIFF", "IMPORT_TARIFF", "SUNLIGHT", "HUMIDITY"]
+
+
+class Interner:
+    """Maps strings to small consecutive ints, in first-seen order."""
+
+    def __init__(self, names: List[str] = None) -> None:
+        self.names: List[str] = list(names or [])
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __call__(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+class Table:
+
+    kind = ""
+    columns: List[str] = []
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: dict) -> None:
+        self.meta = meta
+        for name in self.columns:
+            setattr(self, name, arrays[name])
+
+    def __len__(self) -> int:
+        return len(getattr(self, self.columns[0]))
+
+    def chunks(self, rows: int = CHUNK_ROWS) -> Iterator["Table"]:
+        """Consecutive row slices of about rows rows each, never splitting a timestamp."""
+        timestamp = self.timestamp
+        n = len(self)
+        start = 0
+        while start < n:
+            stop = min(start + rows, n)
+            while stop < n and timestamp[stop] == timestamp[stop - 1]:
+                stop += 1
+            yield type(self)({name: getattr(self, name)[start:stop] for name in self.columns}, self.meta)
+            start = stop
+
+
+class PriceTable(Table):
+
+    kind = PRICES
+    columns = ["day", "timestamp", "product", "bid_price", "bid_volume", "ask_price", "ask_volume", "mid_price", "profit_and_loss"]
+
+    @property
+    def products(self) -> List[str]:
+        return self.meta["products"]
+
+    def product_id(self, product: str) -> int:
+        return self.products.index(product)
+
+    def rows(self, product: str) -> np.ndarray:
+        return np.flatnonzero(self.product == self.product_id(product))
+
+    def levels(self) -> np.ndarray:
+        """Number of populated levels per row, as (bid_levels, ask_levels)."""
+        # A level is there when it has a price: a few rows quote a level with volume 0
+        return (self.bid_price != 0).sum(axis=1), (self.ask_price != 0).sum(axis=1)
+
+
+class TradeTable(Table):
+
+    kind = TRADES
+    columns = ["timestamp", "symbol", "buyer", "seller", "price", "quantity"]
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.meta["symbols"]
+
+    @property
+    def names(self) -> List[str]:
+        # id 0 is always the empty name of the anonymised (_nn) files
+        return self.meta["names"]
+
+    def rows(self, symbol: str) -> np.ndarray:
+        return np.flatnonzero(self.symbol == self.symbols.index(symbol))
+
+
+class ObservationTable(Table):
+
+    kind = OBSERVATIONS
+    columns = ["day", "timestamp"] + [c.lower() for c in OBSERVATION_COLUMNS]
+
+
+TABLES = {t.kind: t for t in (PriceTable, TradeTable, ObservationTable)}
+
+
+def _num(value: str) -> float:
+    return float(value) if value else 0.0
+
+
+class _PriceColumns:
+    """Row accumulator for a prices file; take() hands over the rows so far as typed arrays."""
+
+    kind = PRICES
+    timestamp_column = 1
+
+    def __init__(self, header: List[str]) -> None:
+        self.products = Interner()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.day, self.timestamp, self.product, self.mid, self.pnl = [], [], [], [], []
+        self.book = [[] for _ in range(4 * LEVELS)]
+
+    def add(self, row: List[str]) -> None:
+        self.day.append(int(row[0]))
+        self.timestamp.append(int(row[1]))
+        self.product.append(self.products(row[2]))
+        for k in range(4 * LEVELS):
+            self.book[k].append(_num(row[3 + k]))
+        self.mid.append(float(row[15]))
+        self.pnl.append(_num(row[16]))
+
+    def take(self) -> Dict[str, np.ndarray]:
+        n = len(self.day)
+        book = np.array(self.book, dtype=np.float64).reshape(2, LEVELS, 2, n) if n else np.zeros((2, LEVELS, 2, 0))
+        arrays = {
+            "day": np.array(self.day, dtype=np.int16),
+            "timestamp": np.array(self.timestamp, dtype=np.int32),
+            "product": np.array(self.product, dtype=np.uint8),
+            # book[side, level, price/volume, row] -> (rows, levels), 0 where the level is empty
+            "bid_price": np.ascontiguousarray(book[0, :, 0].T, dtype=np.int32),
+            "bid_volume": np.ascontiguousarray(book[0, :, 1].T, dtype=np.int32),
+            "ask_price": np.ascontiguousarray(book[1, :, 0].T, dtype=np.int32),
+            "ask_volume": np.ascontiguousarray(book[1, :, 1].T, dtype=np.int32),
+            "mid_price": np.array(self.mid, dtype=np.float64),
+            "profit_and_loss": np.array(self.pnl, dtype=np.float64),
+        }
+        self._reset()
+        return arrays
+
+    def meta(self) -> dict:
+        return {"products": list(self.products.names)}
+
+
+class _TradeColumns:
+
+    kind = TRADES
+    timestamp_column = 0
+
+    def __init__(self, header: List[str]) -> None:
+        self.symbols = Interner()
+        self.names = Interner([""])
+        self._reset()
+
+    def _reset(self) -> None:
+        self.timestamp, self.symbol, self.buyer, self.seller, self.price, self.quantity = [], [], [], [], [], []
+
+    def add(self, row: List[str]) -> None:
+        self.timestamp.append(int(row[0]))
+        self.buyer.append(self.names(row[1]))
+        self.seller.append(self.names(row[2]))
+        self.symbol.append(self.symbols(row[3]))
+        self.price.append(float(row[5]))
+        self.quantity.append(int(row[6]))
+
+    def take(self) -> Dict[str, np.ndarray]:
+        arrays = {
+            "timestamp": np.array(self.timestamp, dtype=np.int32),
+            "symbol": np.array(self.symbol, dtype=np.uint8),
+            "buyer": np.array(self.buyer, dtype=np.int16),
+            "seller": np.array(self.seller, dtype=np.int16),
+            "price": np.array(self.price, dtype=np.float64),
+            "quantity": np.array(self.quantity, dtype=np.int32),
+        }
+        self._reset()
+        return arrays
+
+    def meta(self) -> dict:
+        return {"symbols": list(self.symbols.names), "names": list(self.names.names)}
+
+
+class _ObservationColumns:
+
+    kind = OBSERVATIONS
+
+    def __init__(self, header: List[str]) -> None:
+        self.index = {name: i for i, name in enumerate(header)}
+        self.timestamp_column = self.index["timestamp"]
+        self._reset()
+
+    def _reset(self) -> None:
+        self.timestamp, self.day = [], []
+        self.columns = {c: [] for c in OBSERVATION_COLUMNS}
+
+    def add(self, row: List[str]) -> None:
+        index = self.index
+        self.timestamp.append(int(row[index["timestamp"]]))
+        self.day.append(int(row[index["DAY"]]) if "DAY" in index else 0)
+        for c in OBSERVATION_COLUMNS:
+            self.columns[c].append(_num(row[index[c]]))
+
+    def take(self) -> Dict[str, np.ndarray]:
+        arrays = {"day": np.array(self.day, dtype=np.int16), "timestamp": np.array(self.timestamp, dtype=np.int32)}
+        for c in OBSERVATION_COLUMNS:
+            arrays[c.lower()] = np.array(self.columns[c], dtype=np.float64)
+        self._reset()
+        return arrays
+
+    def meta(self) -> dict:
+        return {}
+
+
+def parse_chunks(lines, chunk_rows: Optional[int] = CHUNK_ROWS) -> Iterator[Tuple[str, Dict[str, np.ndarray], dict]]:
+    """Parse CSV lines incrementally into (kind, column arrays, meta) chunks.
+
+    A chunk is cut once it holds chunk_rows rows, but only where the
+    timestamp changes, so no tick is split across two chunks. Interned ids
+    are shared by all chunks and each chunk's meta covers every name seen so
+    far. The last chunk may be empty; there is always at least one.
+    """
+    reader = csv.reader(lines, delimiter=";")
+    header = next(reader)
+    if "buyer" in header:
+        columns = _TradeColumns(header)
+    elif "ORCHIDS" in header:
+        columns = _ObservationColumns(header)
+    else:
+        columns = _PriceColumns(header)
+    key = columns.timestamp_column
+    rows = 0
+    last = None
+    for row in reader:
+        if not row:
+            continue
+        if chunk_rows is not None and rows >= chunk_rows and row[key] != last:
+            yield columns.kind, columns.take(), columns.meta()
+            rows = 0
+        columns.add(row)
+        last = row[key]
+        rows += 1
+    yield columns.kind, columns.take(), columns.meta()
+
+
+def parse_csv(lines) -> (str, Dict[str, np.ndarray], dict):
+    """Parse an iterable of CSV lines into (kind, column arrays, meta)."""
+    return next(parse_chunks(lines, None))
+
+
+def split_archive(path: str) -> Tuple[str, Optional[str]]:
+    """(zip file, member) for a path like "bottle.zip/prices_round_4_day_1.csv", else (path, None)."""
+    head, sep, member = path.partition(".zip" + os.sep)
+    if sep and os.path.isfile(head + ".zip"):
+        return head + ".zip", member.replace(os.sep, "/")
+    return path, None
+
+
+@contextlib.contextmanager
+def open_text(path: str):
+    """Text stream of a CSV on disk or inside a zip, decompressed as it is read."""
+    archive, member = split_archive(path)
+    if member is None:
+        with open(path, newline="") as f:
+            yield f
+        return
+    with zipfile.ZipFile(archive) as z, z.open(member) as raw:
+        yield io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def _source_stamp(path: str) -> dict:
+    archive, member = split_archive(path)
+    st = os.stat(archive)
+    if member is None:
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    with zipfile.ZipFile(archive) as z:
+        info = z.getinfo(member)
+    return {"size": info.file_size, "mtime_ns": st.st_mtime_ns, "crc": info.CRC}
+
+
+def cache_path(path: str) -> str:
+    rel = os.path.relpath(os.path.abspath(path), DATA_ROOT)
+    if rel.startswith(".."):
+        rel = os.path.abspath(path).lstrip(os.sep)
+    return os.path.join(CACHE_DIR, os.path.splitext(rel)[0])
+
+
+def _read_meta(folder: str):
+    try:
+        with open(os.path.join(folder, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(folder: str, kind: str, arrays: Dict[str, np.ndarray], meta: dict) -> None:
+    # Written to a sibling folder and renamed so a half-written entry is never picked up
+    tmp = folder + ".tmp%d" % os.getpid()
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, name + ".npy"), array)
+    meta = dict(meta, kind=kind, version=FORMAT_VERSION)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp, folder)
+
+
+def _open_entry(folder: str, meta: dict) -> Table:
+    cls = TABLES[meta["kind"]]
+    arrays = {name: np.load(os.path.join(folder, name + ".npy"), mmap_mode="r") for name in cls.columns}
+    return cls(arrays, meta)
+
+
+def load(path: str) -> Table:
+    """Load a prices/trades/observations CSV through the columnar cache."""
+    stamp = _source_stamp(path)
+    folder = cache_path(path)
+    meta = _read_meta(folder)
+    if meta is None or meta.get("version") != FORMAT_VERSION or meta.get("source") != stamp:
+        with open_text(path) as f:
+            kind, arrays, parsed = parse_csv(f)
+        _write_entry(folder, kind, arrays, dict(parsed, source=stamp))
+        meta = _read_meta(folder)
+    return _open_entry(folder, meta)
+
+
+def _stream_entry(folder: str, source: dict, path: str, chunk_rows: int) -> Iterator[Table]:
+    meta = _read_meta(folder)
+    if meta is not None and meta.get("version") == FORMAT_VERSION and meta.get("source") == source:
+        yield from _open_entry(folder, meta).chunks(chunk_rows)
+        return
+    parts = []
+    with open_text(path) as f:
+        for kind, arrays, parsed in parse_chunks(f, chunk_rows):
+            parts.append(arrays)
+            yield TABLES[kind](arrays, parsed)
+    # The whole file went through: keep it for the next (memory-mapped) load
+    whole = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    _write_entry(folder, kind, whole, dict(parsed, source=source))
+
+
+def stream(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Table]:
+    """The table of a CSV (plain or zip member) as chunks, decoded as they are needed.
+
+    Reads the cache when it is fresh; otherwise parses the file while it is
+    decompressed and caches it once the last chunk has been handed out.
+    """
+    return _stream_entry(cache_path(path), _source_stamp(path), path, chunk_rows)
+
+
+def stream_hashed(digest: str, path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Table]:
+    """stream() through the entry keyed by the file's content hash (see load_hashed)."""
+    return _stream_entry(content_path(digest), {"sha1": digest}, path, chunk_rows)
+
+
+def content_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, "content", digest)
+
+
+def load_hashed(digest: str, path: str) -> Table:
+    """Load a CSV through an entry keyed by its content hash, shared by every copy of the file."""
+    folder = content_path(digest)
+    meta = _read_meta(folder)
+    if meta is None or meta.get("version") != FORMAT_VERSION:
+        with open_text(path) as f:
+            kind, arrays, parsed = parse_csv(f)
+        _write_entry(folder, kind, arrays, dict(parsed, source={"sha1": digest}))
+        meta = _read_meta(folder)
+    return _open_entry(folder, meta)
+
+
+def open_hashed(digest: str):
+    """The entry stored under digest, or None."""
+    folder = content_path(digest)
+    meta = _read_meta(folder)
+    if meta is None or meta.get("version") != FORMAT_VERSION:
+        return None
+    return _open_entry(folder, meta)
+
+
+def store_hashed(digest: str, kind: str, arrays: Dict[str, np.ndarray], meta: dict) -> Table:
+    folder = content_path(digest)
+    _write_entry(folder, kind, arrays, dict(meta, source={"sha1": digest}))
+    return _open_entry(folder, _read_meta(folder))
+
+
+def store(path: str, kind: str, arrays: Dict[str, np.ndarray], meta: dict) -> None:
+    """Cache columns already in memory for the CSV at path (e.g. one just generated)."""
+    _write_entry(cache_path(path), kind, arrays, dict(meta, source=_source_stamp(path)))
+
+
+def read_frame(path: str):
+    """The cached table as a DataFrame equal to pd.read_csv(path, sep=";"): same columns, order and dtypes.
+
+    The cache keeps narrow ints and every book level as a float; they are
+    widened back to what read_csv infers from the text: int64 for the day,
+    timestamp and quantity columns and for book levels present on every row,
+    float64 with NaN for levels some rows lack, and float64 NaN for a buyer
+    or seller column that names nobody.
+    """
+    import pandas as pd
+
+    table = load(path)
+    if isinstance(table, PriceTable):
+        products = np.array(table.products, dtype=object)
+        data = {"day": table.day.astype(np.int64), "timestamp": table.timestamp.astype(np.int64), "product": products[table.product]}
+        for side in ("bid", "ask"):
+            prices, volumes = getattr(table, side + "_price"), getattr(table, side + "_volume")
+            empty = prices == 0
+            for level in range(LEVELS):
+                if empty[:, level].any():
+                    data["%s_price_%d" % (side, level + 1)] = np.where(empty[:, level], np.nan, prices[:, level])
+                    data["%s_volume_%d" % (side, level + 1)] = np.where(empty[:, level], np.nan, volumes[:, level])
+                else:
+                    data["%s_price_%d" % (side, level + 1)] = prices[:, level].astype(np.int64)
+                    data["%s_volume_%d" % (side, level + 1)] = volumes[:, level].astype(np.int64)
+        data["mid_price"] = table.mid_price
+        data["profit_and_loss"] = table.profit_and_loss
+        return pd.DataFrame(data)
+    if isinstance(table, TradeTable):
+        names = np.array(table.names, dtype=object)
+        names[0] = np.nan
+
+        def counterparties(ids: np.ndarray) -> np.ndarray:
+            return names[ids] if ids.any() else np.full(len(ids), np.nan)
+
+        return pd.DataFrame({
+            "timestamp": table.timestamp.astype(np.int64),
+            "buyer": counterparties(table.buyer),
+            "seller": counterparties(table.seller),
+            "symbol": np.array(table.symbols, dtype=object)[table.symbol],
+            "currency": "SEASHELLS",
+            "price": table.price,
+            "quantity": table.quantity.astype(np.int64),
+        })
+    data = {"timestamp": table.timestamp.astype(np.int64)}
+    for c in OBSERVATION_COLUMNS:
+        data[c] = getattr(table, c.lower())
+    data["DAY"] = table.day.astype(np.int64)
+    return pd.DataFrame(data)
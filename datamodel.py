@@ -1,7 +1,8 @@
+import bisect
+import itertools
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 from json import JSONEncoder
-import jsonpickle
 
 Time = int
 Symbol = str
@@ -11,7 +12,21 @@ UserId = str
 ObservationValue = int
 
 
-class Listing:
+class _Slotted:
+    # Attributes live in __slots__ (no per-instance dict) because a replay
+    # creates millions of these objects; __dict__ is still readable so
+    # vars(), toJSON and ProsperityEncoder see the same fields as before
+
+    __slots__ = ()
+
+    @property
+    def __dict__(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Listing(_Slotted):
+
+    __slots__ = ("symbol", "product", "denomination")
 
     def __init__(self, symbol: Symbol, product: Product, denomination: Product):
         self.symbol = symbol
@@ -19,7 +34,9 @@ class Listing:
         self.denomination = denomination
         
                  
-class ConversionObservation:
+class ConversionObservation(_Slotted):
+
+    __slots__ = ("bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sunlight", "humidity")
 
     def __init__(self, bidPrice: float, askPrice: float, transportFees: float, exportTariff: float, importTariff: float, sunlight: float, humidity: float):
         self.bidPrice = bidPrice
@@ -31,17 +48,23 @@ class ConversionObservation:
         self.humidity = humidity
         
 
-class Observation:
+class Observation(_Slotted):
+
+    __slots__ = ("plainValueObservations", "conversionObservations")
 
     def __init__(self, plainValueObservations: Dict[Product, ObservationValue], conversionObservations: Dict[Product, ConversionObservation]) -> None:
         self.plainValueObservations = plainValueObservations
         self.conversionObservations = conversionObservations
         
     def __str__(self) -> str:
-        return "(plainValueObservations: " + jsonpickle.encode(self.plainValueObservations) + ", conversionObservations: " + jsonpickle.encode(self.conversionObservations) + ")"
+        # Same text jsonpickle.encode gave, without its per-call object walk
+        conversions = {product: {"py/object": type(o).__module__ + "." + type(o).__qualname__, **o.__dict__} for product, o in self.conversionObservations.items()}
+        return "(plainValueObservations: " + json.dumps(self.plainValueObservations) + ", conversionObservations: " + json.dumps(conversions) + ")"
      
 
-class Order:
+class Order(_Slotted):
+
+    __slots__ = ("symbol", "price", "quantity")
 
     def __init__(self, symbol: Symbol, price: int, quantity: int) -> None:
         self.symbol = symbol
@@ -55,14 +78,247 @@ class Order:
         return "(" + self.symbol + ", " + str(self.price) + ", " + str(self.quantity) + ")"
     
 
-class OrderDepth:
+class OrderDepth(_Slotted):
+    """Both sides of a product's book, each kept sorted best price first.
+
+    buy_orders (price -> volume) and sell_orders (price -> negative volume)
+    read as plain dicts, as on the platform, but each side keeps itself best
+    first: assigning a dict stores a sorted copy, and adding a price in place
+    (depth.buy_orders[11] = 5) moves it to its rank, so
+    list(buy_orders.items())[0] is always the best bid. The top of book,
+    level lists, cumulative depth and VWAP are computed on first use and
+    cached until either side changes, by assignment or in place.
+    """
+
+    __slots__ = ("_buy_orders", "_sell_orders", "_levels")
 
     def __init__(self):
-        self.buy_orders: Dict[int, int] = {}
-        self.sell_orders: Dict[int, int] = {}
+        self._buy_orders = _Bids()
+        self._sell_orders = _Asks()
+        self._levels = None
+
+    @property
+    def __dict__(self) -> dict:
+        # Plain dicts, so vars(), toJSON and jsonpickle see the platform's {"buy_orders": {...}, "sell_orders": {...}}
+        return {"buy_orders": dict(self._buy_orders), "sell_orders": dict(self._sell_orders)}
+
+    def __setstate__(self, state) -> None:
+        # pickle hands back the slots as (None, {"_buy_orders": ..., ...}), with the sides as plain dicts
+        self._levels = None
+        slots = state[1]
+        self.buy_orders = slots["_buy_orders"]
+        self.sell_orders = slots["_sell_orders"]
+
+    @property
+    def buy_orders(self) -> Dict[int, int]:
+        return self._buy_orders
+
+    @buy_orders.setter
+    def buy_orders(self, orders: Dict[int, int]) -> None:
+        self._buy_orders = _side(_Bids, orders)
+        self._levels = None
+
+    @property
+    def sell_orders(self) -> Dict[int, int]:
+        return self._sell_orders
+
+    @sell_orders.setter
+    def sell_orders(self, orders: Dict[int, int]) -> None:
+        self._sell_orders = _side(_Asks, orders)
+        self._levels = None
+
+    def _book(self) -> "_BookLevels":
+        levels = self._levels
+        buy, sell = self._buy_orders, self._sell_orders
+        if levels is None or getattr(buy, "changed", False) or getattr(sell, "changed", False):
+            levels = self._levels = _BookLevels(buy, sell)
+            buy.changed = sell.changed = False
+        return levels
+
+    # Level lists, best first; ask volumes keep the platform's negative sign
+    @property
+    def bid_prices(self) -> List[int]:
+        return self._book().bid_prices
+
+    @property
+    def bid_volumes(self) -> List[int]:
+        return self._book().bid_volumes
+
+    @property
+    def ask_prices(self) -> List[int]:
+        return self._book().ask_prices
+
+    @property
+    def ask_volumes(self) -> List[int]:
+        return self._book().ask_volumes
+
+    # Cumulative size available up to and including each level (positive on both sides)
+    @property
+    def bid_depth(self) -> List[int]:
+        return self._book().bid_depth
+
+    @property
+    def ask_depth(self) -> List[int]:
+        return self._book().ask_depth
+
+    @property
+    def best_bid(self) -> Optional[int]:
+        return self._book().best_bid
+
+    @property
+    def best_ask(self) -> Optional[int]:
+        return self._book().best_ask
+
+    @property
+    def best_bid_volume(self) -> int:
+        levels = self._book()
+        return levels.bid_volumes[0] if levels.bid_volumes else 0
+
+    @property
+    def best_ask_volume(self) -> int:
+        levels = self._book()
+        return levels.ask_volumes[0] if levels.ask_volumes else 0
+
+    @property
+    def worst_bid(self) -> Optional[int]:
+        levels = self._book()
+        return levels.bid_prices[-1] if levels.bid_prices else None
+
+    @property
+    def worst_ask(self) -> Optional[int]:
+        levels = self._book()
+        return levels.ask_prices[-1] if levels.ask_prices else None
+
+    @property
+    def mid(self) -> Optional[float]:
+        """(best_bid + best_ask) / 2, or None when a side is empty."""
+        return self._book().mid
 
+    def vwap_to_size(self, quantity: int) -> Optional[float]:
+        """Average price of sweeping the book for quantity (> 0 buys from the asks, < 0 sells into the bids).
 
-class Trade:
+        Stops at the end of the book when it holds less; None when that side is empty.
+        """
+        levels = self._book()
+        if quantity >= 0:
+            prices, depth, notional = levels.ask_prices, levels.ask_depth, levels.ask_notional
+        else:
+            prices, depth, notional = levels.bid_prices, levels.bid_depth, levels.bid_notional
+            quantity = -quantity
+        if not prices or quantity == 0:
+            return prices[0] if prices else None
+        i = bisect.bisect_left(depth, quantity)
+        if i >= len(prices):
+            return notional[-1] / depth[-1]
+        before, traded = (depth[i - 1], notional[i - 1]) if i else (0, 0)
+        return (traded + (quantity - before) * prices[i]) / quantity
+
+
+class _BookSide(dict):
+    """One side of an OrderDepth: a dict that stays sorted best price first and notes when it changes.
+
+    Reads are plain dict reads. Every mutator sets changed (unset until the
+    first one, which reads as False), which tells the OrderDepth to rebuild
+    its cached levels, and one that adds a price re-sorts the side if the new
+    price is out of place. Copies and pickles of a side are plain dicts.
+    """
+
+    __slots__ = ("changed",)
+    descending = False
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def _sort(self) -> None:
+        prices = list(self)
+        ordered = sorted(prices, reverse=self.descending)
+        if prices != ordered:
+            items = [(price, dict.__getitem__(self, price)) for price in ordered]
+            dict.clear(self)
+            dict.update(self, items)
+
+    def __setitem__(self, price: int, volume: int) -> None:
+        added = price not in self
+        dict.__setitem__(self, price, volume)
+        if added:
+            self._sort()
+        self.changed = True
+
+    def __delitem__(self, price: int) -> None:
+        dict.__delitem__(self, price)
+        self.changed = True
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        self.changed = True
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.changed = True
+        return dict.popitem(self)
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self.changed = True
+
+    def setdefault(self, price: int, volume: int = None):
+        if price not in self:
+            self[price] = volume
+        return dict.__getitem__(self, price)
+
+    def update(self, *args, **kwargs) -> None:
+        dict.update(self, *args, **kwargs)
+        self._sort()
+        self.changed = True
+
+    def copy(self) -> Dict[int, int]:
+        return dict(self)
+
+
+class _Bids(_BookSide):
+    __slots__ = ()
+    descending = True
+
+
+class _Asks(_BookSide):
+    __slots__ = ()
+
+
+def _side(cls: type, orders: Dict[int, int]) -> _BookSide:
+    # Books arrive sorted already (from the platform or the backtester), so the copy is usually kept as it is
+    side = cls(orders)
+    if len(side) > 1:
+        prices = list(side)
+        if prices != sorted(prices, reverse=cls.descending):
+            side._sort()
+    return side
+
+
+class _BookLevels:
+
+    __slots__ = ("bid_prices", "bid_volumes", "ask_prices", "ask_volumes", "bid_depth", "ask_depth",
+                 "bid_notional", "ask_notional", "best_bid", "best_ask", "mid")
+
+    def __init__(self, buy_orders: Dict[int, int], sell_orders: Dict[int, int]) -> None:
+        self.bid_prices = list(buy_orders)
+        self.bid_volumes = list(buy_orders.values())
+        self.ask_prices = list(sell_orders)
+        self.ask_volumes = list(sell_orders.values())
+        self.bid_depth = list(itertools.accumulate(self.bid_volumes))
+        self.ask_depth = list(itertools.accumulate(-v for v in self.ask_volumes))
+        self.bid_notional = list(itertools.accumulate(p * v for p, v in zip(self.bid_prices, self.bid_volumes)))
+        self.ask_notional = list(itertools.accumulate(-p * v for p, v in zip(self.ask_prices, self.ask_volumes)))
+        self.best_bid = self.bid_prices[0] if self.bid_prices else None
+        self.best_ask = self.ask_prices[0] if self.ask_prices else None
+        self.mid = (self.best_bid + self.best_ask) / 2 if self.bid_prices and self.ask_prices else None
+
+
+class Trade(_Slotted):
+
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
 
     def __init__(self, symbol: Symbol, price: int, quantity: int, buyer: UserId=None, seller: UserId=None, timestamp: int=0) -> None:
         self.symbol = symbol
@@ -79,7 +335,9 @@ class Trade:
         return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
 
 
-class TradingState(object):
+class TradingState(_Slotted):
+
+    __slots__ = ("traderData", "timestamp", "listings", "order_depths", "own_trades", "market_trades", "position", "observations")
 
     def __init__(self,
                  traderData: str,
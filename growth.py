@@ -0,0 +1,187 @@
+"""Detect trader state and per-tick cost that grow with time.
+
+Usage:
+    python growth.py zscore_round3.py 3                    # round 3 days back to back
+    python growth.py zscore_round3.py 3 --ticks 1000000    # cycle them for a million ticks
+
+The trader runs on one continuous clock (backtester.ChainedDay). Every
+--every ticks the deep size of each Trader attribute (instance and class
+level) and of the module logger is sampled, along with the traderData
+length and the mean run time since the previous sample. Anything whose
+size or cost keeps climbing over the run is reported.
+"""
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import backtester
+
+# Flag a series that ends at least this many times its early level...
+MIN_RATIO = 1.5
+# ...and this much above it in absolute terms (bytes, characters or ms)...
+MIN_BYTES = 1024
+MIN_MS = 0.01
+# ...with most of the samples on a rising line (Spearman-like rank correlation)
+MIN_TREND = 0.8
+
+
+def deep_size(obj, seen: Optional[set] = None) -> int:
+    """Approximate retained size of obj in bytes, following containers and __dict__s."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        # getsizeof already counts the data buffer of arrays that own it
+        return sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += deep_size(k, seen) + deep_size(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += deep_size(v, seen)
+    slots = [slot for cls in type(obj).__mro__ for slot in vars(cls).get("__slots__", ())]
+    if slots:
+        # Slotted objects (the datamodel classes) only expose __dict__ as a computed view
+        for slot in slots:
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def tracked_attributes(trader) -> Dict[str, object]:
+    """Data attributes of trader, instance ones shadowing class ones."""
+    attributes = {}
+    for cls in reversed(type(trader).__mro__):
+        if cls is object:
+            continue
+        for name, value in vars(cls).items():
+            if not name.startswith("__") and not callable(value) and not isinstance(value, (staticmethod, classmethod, property)):
+                attributes[name] = value
+    attributes.update((name, value) for name, value in vars(trader).items() if not callable(value))
+    return attributes
+
+
+def trend(values: List[float]) -> float:
+    """Rank correlation of values with time, in [-1, 1]."""
+    if len(values) < 3:
+        return 0.0
+    ranks = np.argsort(np.argsort(values, kind="stable"), kind="stable").astype(float)
+    steps = np.arange(len(values), dtype=float)
+    if ranks.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ranks, steps)[0, 1])
+
+
+class GrowthReport:
+
+    def __init__(self, every: int) -> None:
+        self.every = every
+        self.ticks: List[int] = []
+        self.sizes: Dict[str, List[int]] = {}
+        self.trader_data: List[int] = []
+        self.latency_ms: List[float] = []
+
+    def sample(self, tick: int, trader, module, trader_data: str, window_ns: int, window_ticks: int) -> None:
+        self.ticks.append(tick)
+        attributes = tracked_attributes(trader)
+        logger = getattr(module, "logger", None)
+        if logger is not None:
+            attributes["<module logger>"] = logger
+        for name, value in attributes.items():
+            series = self.sizes.setdefault(name, [0] * (len(self.ticks) - 1))
+            series.append(deep_size(value))
+        for series in self.sizes.values():
+            if len(series) < len(self.ticks):
+                series.append(0)
+        self.trader_data.append(len(trader_data) if isinstance(trader_data, str) else 0)
+        self.latency_ms.append(window_ns / 1e6 / max(window_ticks, 1))
+
+    def growing(self) -> List[tuple]:
+        """(name, unit, first, last, per 10k ticks) of every series that grows."""
+        found = []
+        series = [(name, "bytes", values, MIN_BYTES) for name, values in self.sizes.items()]
+        series.append(("traderData", "chars", self.trader_data, 1))
+        series.append(("run latency", "ms", self.latency_ms, MIN_MS))
+        for name, unit, values, minimum in series:
+            if len(values) < 4:
+                continue
+            # Skip the first sample: caches are still filling up to their steady size
+            early = float(np.median(values[1:4]))
+            last = float(values[-1])
+            if last - early >= minimum and last >= early * MIN_RATIO and trend(values[1:]) >= MIN_TREND:
+                span = self.ticks[-1] - self.ticks[1]
+                found.append((name, unit, early, last, (last - values[1]) / span * 10000 if span else 0.0))
+        return found
+
+    def report(self) -> str:
+        lines = ["%d samples over %d ticks" % (len(self.ticks), self.ticks[-1] + 1 if self.ticks else 0)]
+        growing = self.growing()
+        if not growing:
+            lines.append("no attribute, traderData or latency grows with time")
+        for name, unit, early, last, rate in growing:
+            lines.append("GROWS  %-28s %12.1f -> %12.1f %s  (+%.1f %s per 10k ticks)" % (name, early, last, unit, rate, unit))
+        lines.append("")
+        lines.append("%-28s %14s %14s" % ("attribute", "first bytes", "last bytes"))
+        for name, values in sorted(self.sizes.items(), key=lambda kv: kv[1][-1], reverse=True):
+            lines.append("%-28s %14d %14d" % (name, values[0], values[-1]))
+        lines.append("%-28s %14d %14d" % ("traderData (chars)", self.trader_data[0], self.trader_data[-1]))
+        lines.append("%-28s %14.4f %14.4f" % ("run latency (ms)", self.latency_ms[0], self.latency_ms[-1]))
+        return "\n".join(lines)
+
+
+def watch(trader_path: str, rounds: List[int], ticks: Optional[int] = None, every: Optional[int] = None) -> GrowthReport:
+    chain = backtester.ChainedDay(backtester.load_days(rounds), ticks)
+    every = every or max(1, chain.total // 50)
+    report = GrowthReport(every)
+    module = backtester.load_trader_module(trader_path)
+    trader = module.Trader()
+    run = trader.run
+    clock = time.perf_counter_ns
+    window = {"tick": 0, "ns": 0, "count": 0}
+
+    def watched_run(state):
+        output = None
+        start = clock()
+        try:
+            output = run(state)
+            return output
+        finally:
+            window["ns"] += clock() - start
+            window["count"] += 1
+            tick = window["tick"]
+            window["tick"] += 1
+            if tick % every == 0 or tick == chain.total - 1:
+                trader_data = output[2] if isinstance(output, tuple) and len(output) > 2 else ""
+                report.sample(tick, trader, module, trader_data, window["ns"], window["count"])
+                window["ns"] = window["count"] = 0
+
+    trader.run = watched_run
+    # No run_batch: run() is measured as the platform calls it (ChainedDay replays skip it anyway)
+    backtester.Backtester(trader, chain, logging=True, batch=False).run()
+    return report
+
+
+def main(argv: List[str]) -> None:
+    options = {"--ticks": None, "--every": None}
+    for flag in options:
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = int(argv[i + 1])
+            argv = argv[:i] + argv[i + 2:]
+    if len(argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    print(watch(argv[0], backtester.parse_rounds(argv[1]), options["--ticks"], options["--every"]).report())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+"""Modules that load on first attribute access instead of at import time.
+
+A Trader file pays for every import on the platform's cold start, even for
+modules only one rarely taken code path needs. lazy() hands back a module
+object whose real import runs the first time an attribute is read:
+
+    from lazy_import import lazy
+    np = lazy("numpy")            # nothing loaded yet
+    ...
+    np.log(x)                     # numpy imports here, once
+
+A module that is already imported is returned as is. Trader files import
+it as above; python bundle.py inlines this file into the one that is
+uploaded.
+
+python coldstart.py reports what each Trader file costs to import.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy(name: str) -> ModuleType:
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError("No module named %r" % name, name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(module: ModuleType) -> bool:
+    """False while a lazy() module is still waiting for its first attribute access.
+
+    LazyLoader keeps the module's own class in its spec's loader_state and
+    swaps it back in on the first access. Any attribute read through the
+    module, __spec__ included, would trigger that load, so the spec is taken
+    from the instance dict directly.
+    """
+    try:
+        spec = object.__getattribute__(module, "__dict__").get("__spec__")
+    except AttributeError:
+        return True
+    state = getattr(spec, "loader_state", None)
+    if not isinstance(state, dict) or "__class__" not in state:
+        return True
+    return type(module) is state["__class__"]
@@ -0,0 +1,224 @@
+"""Rebuild the live TradingState sequence from a submission log, and re-run a Trader on it.
+
+Usage:
+    python log_parser.py submission.log                      # what the log holds
+    python log_parser.py submission.log trader_final_r5.py   # re-run the trader, diff its orders
+
+Reads the platform's .log download (the "Sandbox logs:" section, one JSON
+object per tick whose lambdaLog holds what the Trader printed) or a plain
+stream of Logger.flush lines, such as a non-quiet backtester run. Each
+tick's flush line, [compressed state, orders, conversions, traderData,
+logs], becomes a TradingState with its order depths, trades, position and
+ConversionObservations. DeltaLogger lines are decoded by logger.decode_delta.
+The file is read line by line and ticks are yielded one at a time, so
+memory does not grow with the size of the log.
+
+    for tick in parse("submission.log"):
+        tick.state, tick.orders, tick.conversions, tick.trader_data, tick.logs
+"""
+import contextlib
+import itertools
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import backtester
+import logger
+from datamodel import ConversionObservation, Observation, Order, OrderDepth, Symbol, Trade, TradingState
+
+SANDBOX_HEADER = "Sandbox logs:"
+# Mismatching ticks replay() keeps in full; the rest are only counted, so a long log cannot fill memory
+KEEP_MISMATCHES = 100
+# How a Logger.flush line starts (plain, or a DeltaLogger delta / keyframe)
+FLUSH_PREFIXES = ("[[", "[0,", "[1,")
+# Sections after the sandbox logs, which the parser stops at
+END_HEADERS = ("Activities log:", "Trade History:")
+
+
+class LogTick:
+
+    def __init__(self, state: TradingState, orders: Dict[Symbol, List[Order]], conversions: int, trader_data: str, logs: str, sandbox_log: str = "") -> None:
+        self.state = state
+        self.orders = orders
+        self.conversions = conversions
+        self.trader_data = trader_data
+        self.logs = logs
+        self.sandbox_log = sandbox_log
+
+    def __repr__(self) -> str:
+        return "LogTick(%d, %d orders)" % (self.state.timestamp, sum(len(o) for o in self.orders.values()))
+
+
+def _flush_line(printed: str) -> Optional[str]:
+    """The Logger.flush line among everything a tick printed: the last one."""
+    for line in reversed(printed.splitlines()):
+        if line.startswith(FLUSH_PREFIXES):
+            return line
+    return None
+
+
+def flush_lines(lines: Iterable[str]) -> Iterator[tuple]:
+    """(flush line, sandboxLog) per tick, from a .log download or a plain stream of flush lines."""
+    lines = iter(lines)
+    obj: List[str] = []
+    in_sandbox = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line == SANDBOX_HEADER:
+            in_sandbox = True
+            continue
+        if line in END_HEADERS:
+            return
+        if in_sandbox:
+            # Pretty-printed objects: "{", its fields, "}"; collect one object at a time
+            if line == "{":
+                obj = [line]
+            elif obj:
+                obj.append(line)
+                if line == "}":
+                    entry = json.loads("\n".join(obj))
+                    obj = []
+                    flush = _flush_line(entry.get("lambdaLog", ""))
+                    if flush is not None:
+                        yield flush, entry.get("sandboxLog", "")
+        elif line.startswith(FLUSH_PREFIXES):
+            yield line, ""
+
+
+def _trades(compressed: List[list]) -> Dict[Symbol, List[Trade]]:
+    trades: Dict[Symbol, List[Trade]] = {}
+    for symbol, price, quantity, buyer, seller, timestamp in compressed:
+        trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, buyer, seller, timestamp))
+    return trades
+
+
+def _orders(compressed: List[list]) -> Dict[Symbol, List[Order]]:
+    orders: Dict[Symbol, List[Order]] = {}
+    for symbol, price, quantity in compressed:
+        orders.setdefault(symbol, []).append(Order(symbol, price, quantity))
+    return orders
+
+
+def parse_flush(line: str, sandbox_log: str = "") -> LogTick:
+    """One Logger.flush line back into a LogTick."""
+    compressed_state, compressed_orders, conversions, trader_data, logs = json.loads(line)
+    timestamp, state_trader_data, listings, order_depths, own_trades, market_trades, position, (plain, conversion) = compressed_state
+    depths = {}
+    for symbol, (buy_orders, sell_orders) in order_depths.items():
+        depth = OrderDepth()
+        depth.buy_orders = {int(price): volume for price, volume in buy_orders.items()}
+        depth.sell_orders = {int(price): volume for price, volume in sell_orders.items()}
+        depths[symbol] = depth
+    state = TradingState(
+        state_trader_data,
+        timestamp,
+        {symbol: {"symbol": symbol, "product": product, "denomination": denomination} for symbol, product, denomination in listings},
+        depths,
+        _trades(own_trades),
+        _trades(market_trades),
+        position,
+        Observation(plain, {product: ConversionObservation(*fields) for product, fields in conversion.items()}),
+    )
+    return LogTick(state, _orders(compressed_orders), conversions, trader_data, logs, sandbox_log)
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[LogTick]:
+    found = flush_lines(lines)
+    first = next(found, None)
+    if first is None:
+        return
+    found = itertools.chain([first], found)
+    if first[0].startswith("[["):
+        for line, sandbox_log in found:
+            yield parse_flush(line, sandbox_log)
+    else:
+        for state, orders, conversions, trader_data, logs in logger.decode_delta(line for line, _ in found):
+            yield LogTick(state, orders, conversions, trader_data, logs)
+
+
+def parse(path: str) -> Iterator[LogTick]:
+    with open(path, encoding="utf-8") as f:
+        yield from parse_lines(f)
+
+
+def _order_key(orders: Dict[Symbol, List[Order]]) -> List[tuple]:
+    return sorted((o.symbol, o.price, o.quantity) for rows in orders.values() for o in rows)
+
+
+class ReplayDiff:
+
+    def __init__(self, keep: int = KEEP_MISMATCHES) -> None:
+        self.ticks = 0
+        self.errors = 0
+        self.truncated_trader_data = 0
+        # Ticks whose orders or conversions differ, and (timestamp, live orders, local orders,
+        # live conversions, local conversions) of the first keep of them
+        self.mismatch_count = 0
+        self.keep = keep
+        self.mismatches: List[tuple] = []
+
+    def add_mismatch(self, mismatch: tuple) -> None:
+        self.mismatch_count += 1
+        if len(self.mismatches) < self.keep:
+            self.mismatches.append(mismatch)
+
+
+def replay(trader_path: str, ticks: Iterable[LogTick], keep: int = KEEP_MISMATCHES) -> ReplayDiff:
+    """Run a local Trader on the live states and compare its orders with the logged ones.
+
+    The trader gets the live position, books and trades, but its own traderData
+    from the previous tick, as on the platform (the logged one may be truncated).
+    Every differing tick is counted; only the first keep are held in mismatches.
+    """
+    module = backtester.load_trader_module(trader_path)
+    trader = module.Trader()
+    diff = ReplayDiff(keep)
+    trader_data = None
+    out = backtester._NullWriter()
+    for tick in ticks:
+        diff.ticks += 1
+        state = tick.state
+        if tick.state.traderData.endswith("..."):
+            diff.truncated_trader_data += 1
+        if trader_data is not None:
+            state.traderData = trader_data
+        with logger.disabled(), contextlib.redirect_stdout(out):
+            try:
+                output = trader.run(state)
+            except Exception:
+                diff.errors += 1
+                output = None
+        orders, conversions, trader_data = backtester._unpack(output, state.traderData)
+        if _order_key(orders) != _order_key(tick.orders) or (conversions or 0) != (tick.conversions or 0):
+            diff.add_mismatch((state.timestamp, _order_key(tick.orders), _order_key(orders), tick.conversions, conversions))
+    return diff
+
+
+def summary(ticks: Iterable[LogTick]) -> str:
+    count, first, last = 0, None, None
+    products = set()
+    orders = 0
+    for tick in ticks:
+        count += 1
+        first = tick.state.timestamp if first is None else first
+        last = tick.state.timestamp
+        products.update(tick.state.order_depths)
+        orders += sum(len(o) for o in tick.orders.values())
+    if not count:
+        return "no Logger.flush lines found"
+    return "%d ticks, timestamps %d..%d, %d orders, products %s" % (count, first, last, orders, " ".join(sorted(products)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    if len(sys.argv) == 2:
+        print(summary(parse(sys.argv[1])))
+    else:
+        result = replay(os.path.abspath(sys.argv[2]), parse(sys.argv[1]))
+        print("%d ticks, %d with different orders or conversions, %d errors, %d with truncated traderData"
+              % (result.ticks, result.mismatch_count, result.errors, result.truncated_trader_data))
+        for timestamp, live, local, live_conv, local_conv in result.mismatches[:10]:
+            print("  t=%d  live %s conv %s  local %s conv %s" % (timestamp, live, live_conv, local, local_conv))
@@ -0,0 +1,427 @@
+"""The submission Logger, shared instead of pasted into every trader file.
+
+Prints the same line per tick as the Logger copies in the trader files (the
+format the Prosperity visualizer reads), but cheaper:
+
+    from logger import Logger
+    logger = Logger()
+    logger.print("BS Price: ", bs_price)       # kept as fragments, joined once in flush
+    logger.flush(state, result, conversions, traderData)
+
+flush serialises the compressed state once, with the three truncated strings
+left empty, and splices them in afterwards, instead of serialising it twice.
+While logging is off (Logger(enabled=False), or inside disabled(), which
+quiet backtester replays use) print and flush return straight away.
+
+With a Sampling policy only some ticks are flushed: every every-th tick in
+full, every tick with fills in state.own_trades, and every tick on which
+something was printed at level SIGNAL. Prints carry a level and a channel,
+and each channel keeps its own minimum level:
+
+    logger = Logger(sampling=Sampling(every=100, levels={"coupon": DEBUG, "orchids": SIGNAL}))
+    logger.print("BS Price: ", bs_price, level=DEBUG, channel="coupon")
+    logger.print("convert", conversions, level=SIGNAL, channel="orchids")   # this tick is flushed
+
+Prints below their channel's level return straight away. The rest are kept
+unformatted and only turned into text if the tick is flushed, so a tick that
+is not flushed costs a counter and a few list appends. (Objects are str()-ed
+at flush, so pass values rather than something the trader mutates later.)
+
+    python bench.py logger                     # against the pasted Logger
+"""
+import contextlib
+import json
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from datamodel import ConversionObservation, Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
+
+# Print levels; a channel set above SIGNAL is muted
+DEBUG, INFO, SIGNAL = 10, 20, 30
+
+# Depth of disabled() blocks currently open
+_disabled = 0
+
+_encoder = ProsperityEncoder(separators=(",", ":"))
+
+
+@contextlib.contextmanager
+def disabled():
+    """Turn every Logger off for the duration of the block."""
+    global _disabled
+    _disabled += 1
+    try:
+        yield
+    finally:
+        _disabled -= 1
+
+
+class Sampling:
+    """Which ticks a Logger flushes, and which prints it keeps.
+
+    every    flush every every-th tick (0: only ticks with fills or signals)
+    fills    also flush ticks whose state.own_trades has trades (True), or
+             trades in one of these products (a set)
+    level    lowest level kept for channels not in levels
+    levels   {channel: lowest level kept}, e.g. one per strategy
+    """
+
+    def __init__(self, every: int = 100, fills: Union[bool, Iterable[Symbol]] = True, level: int = INFO, levels: Optional[dict[str, int]] = None) -> None:
+        self.every = every
+        self.fills = fills if isinstance(fills, bool) else frozenset(fills)
+        self.level = level
+        self.levels = dict(levels or {})
+
+    def threshold(self, channel: Optional[str]) -> int:
+        return self.levels.get(channel, self.level)
+
+    def filled(self, own_trades: dict[Symbol, list[Trade]]) -> bool:
+        if self.fills is True:
+            return any(own_trades.values())
+        return bool(self.fills) and any(own_trades.get(symbol) for symbol in self.fills)
+
+
+class Logger:
+    def __init__(self, max_log_length: int = 3750, enabled: bool = True, sampling: Optional[Sampling] = None) -> None:
+        # Formatted strings, or (objects, sep, end) left unformatted under a Sampling policy
+        self.logs: list[Any] = []
+        self.max_log_length = max_log_length
+        self.enabled = enabled
+        self.sampling = sampling
+        self._tick = 0
+        self._signalled = False
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and not _disabled
+
+    def wants(self, level: int = INFO, channel: Optional[str] = None) -> bool:
+        """Whether a print at this level and channel would be kept, to guard costly arguments."""
+        if not self.enabled or _disabled:
+            return False
+        return self.sampling is None or level >= self.sampling.threshold(channel)
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", level: int = INFO, channel: Optional[str] = None) -> None:
+        if not self.enabled or _disabled:
+            return
+        sampling = self.sampling
+        if sampling is None:
+            self.logs.append(sep.join(map(str, objects)) + end)
+        elif level >= sampling.levels.get(channel, sampling.level):
+            if level >= SIGNAL:
+                self._signalled = True
+            self.logs.append((objects, sep, end))
+
+    def take_logs(self, state: TradingState) -> Optional[str]:
+        """This tick's printed text, or None when the tick is not to be flushed. Clears the logs."""
+        if not self.enabled or _disabled:
+            self.logs.clear()
+            return None
+        sampling = self.sampling
+        if sampling is None:
+            logs = "".join(self.logs)
+            self.logs.clear()
+            return logs
+        tick = self._tick
+        self._tick += 1
+        signalled = self._signalled
+        self._signalled = False
+        if not (signalled or (sampling.every and tick % sampling.every == 0) or sampling.filled(state.own_trades)):
+            self.logs.clear()
+            return None
+        logs = "".join(sep.join(map(str, objects)) + end for objects, sep, end in self.logs)
+        self.logs.clear()
+        return logs
+
+    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
+        logs = self.take_logs(state)
+        if logs is None:
+            return
+
+        # [[timestamp,"",...],orders,conversions,"",""]: the three strings are spliced in below
+        base = self.to_json([
+            self.compress_state(state, ""),
+            self.compress_orders(orders),
+            conversions,
+            "",
+            "",
+        ])
+
+        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
+        max_item_length = (self.max_log_length - len(base)) // 3
+
+        head = len(self.to_json(state.timestamp)) + 3
+        print("".join((
+            base[:head],
+            self.to_json(self.truncate(state.traderData, max_item_length)),
+            base[head + 2:-7],
+            ",",
+            self.to_json(self.truncate(trader_data, max_item_length)),
+            ",",
+            self.to_json(self.truncate(logs, max_item_length)),
+            "]",
+        )))
+
+    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
+        return [
+            state.timestamp,
+            trader_data,
+            self.compress_listings(state.listings),
+            self.compress_order_depths(state.order_depths),
+            self.compress_trades(state.own_trades),
+            self.compress_trades(state.market_trades),
+            state.position,
+            self.compress_observations(state.observations),
+        ]
+
+    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[list[Any]]:
+        return [[listing["symbol"], listing["product"], listing["denomination"]] for listing in listings.values()]
+
+    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
+        return {symbol: [order_depth.buy_orders, order_depth.sell_orders] for symbol, order_depth in order_depths.items()}
+
+    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
+        return [[trade.symbol, trade.price, trade.quantity, trade.buyer, trade.seller, trade.timestamp] for arr in trades.values() for trade in arr]
+
+    def compress_observations(self, observations: Observation) -> list[Any]:
+        conversion_observations = {}
+        for product, observation in observations.conversionObservations.items():
+            conversion_observations[product] = [
+                observation.bidPrice,
+                observation.askPrice,
+                observation.transportFees,
+                observation.exportTariff,
+                observation.importTariff,
+                observation.sunlight,
+                observation.humidity,
+            ]
+
+        return [observations.plainValueObservations, conversion_observations]
+
+    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[list[Any]]:
+        return [[order.symbol, order.price, order.quantity] for arr in orders.values() for order in arr]
+
+    def to_json(self, value: Any) -> str:
+        return _encoder.encode(value)
+
+    def truncate(self, value: str, max_length: int) -> str:
+        if len(value) <= max_length:
+            return value
+
+        return value[:max_length - 3] + "..."
+
+
+class DeltaLogger(Logger):
+    """A Logger whose lines carry only what changed since the previous tick.
+
+    Every keyframe_every-th line is a keyframe with the full book, position
+    and observations. Lines in between hold only the book levels, positions
+    and observations that changed; trades and orders are new every tick and
+    go out in full. When state.traderData is the traderData this logger
+    printed last tick (the usual case), it is sent as 0 instead of again. What
+    is left of the 3750 characters goes to traderData and logs, and a string
+    that needs less than an equal share leaves the rest to the others instead
+    of everything being cut to a third. decode_delta() rebuilds the full
+    per-tick states. Under a Sampling policy the deltas are against the last
+    line printed, so skipped ticks need nothing to decode.
+
+    Line: [keyframe (1/0), timestamp, state.traderData (or 0: same as the last
+    traderData out), listings (0 between keyframes), books, own trades, market
+    trades, position, plain observations, conversion observations, orders,
+    conversions, traderData, logs], where between keyframes
+        books                 [order, {symbol: [bids, asks] or null}], where order is 0 when the
+                              symbols come in last tick's order, else their positions in last
+                              tick's order (or their names, when the set changed), and each
+                              side is {price: volume or null} of the changed levels, or
+                              [price, volume, price, volume, ...] when the whole side is shorter
+        position / plain      {key: value or null}, null for a key that went away
+        conversion            {product: [bidPrice, ..., humidity] or null}
+    """
+
+    def __init__(self, max_log_length: int = 3750, enabled: bool = True, keyframe_every: int = 100, sampling: Optional[Sampling] = None) -> None:
+        super().__init__(max_log_length, enabled, sampling)
+        self.keyframe_every = keyframe_every
+        self.ticks = 0
+        self._books: dict[Symbol, tuple[dict[int, int], dict[int, int]]] = {}
+        self._position: dict[Symbol, int] = {}
+        self._plain: dict[str, Any] = {}
+        self._conversions: dict[Symbol, list[Any]] = {}
+        self._trader_data = None
+
+    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
+        logs = self.take_logs(state)
+        if logs is None:
+            return
+
+        keyframe = self.ticks % self.keyframe_every == 0
+        self.ticks += 1
+        books = {symbol: (dict(depth.buy_orders), dict(depth.sell_orders)) for symbol, depth in state.order_depths.items()}
+        position = dict(state.position)
+        observations = state.observations
+        plain = dict(observations.plainValueObservations)
+        conversion = self.compress_observations(observations)[1]
+        if keyframe:
+            line = [1, state.timestamp, "", self.compress_listings(state.listings), {s: [b, a] for s, (b, a) in books.items()},
+                    self.compress_trades(state.own_trades), self.compress_trades(state.market_trades),
+                    position, plain, conversion]
+        else:
+            line = [0, state.timestamp, 0 if state.traderData == self._trader_data else "", 0,
+                    [_reorder(list(self._books), list(books)), _book_changes(self._books, books)],
+                    self.compress_trades(state.own_trades), self.compress_trades(state.market_trades),
+                    _changes(self._position, position), _changes(self._plain, plain), _changes(self._conversions, conversion)]
+        self._books, self._position, self._plain, self._conversions = books, position, plain, conversion
+        self._trader_data = trader_data
+        line += [self.compress_orders(orders), conversions, "", ""]
+
+        # One pass, as in Logger.flush: the empty strings are spliced in after measuring
+        base = self.to_json(line)
+        # Strings shorter than an equal share leave the rest of it to the others
+        strings = [state.traderData, trader_data, logs] if line[2] == "" else [trader_data, logs]
+        strings = [self.truncate(value, limit) for value, limit in zip(strings, _shares(self.max_log_length - len(base), [len(value) for value in strings]))]
+        if line[2] == "":
+            head = len(self.to_json(line[:2]))
+            parts = [base[:head], self.to_json(strings[0]), base[head + 2:-7]]
+        else:
+            parts = [base[:-7]]
+        parts += [",", self.to_json(strings[-2]), ",", self.to_json(strings[-1]), "]"]
+        print("".join(parts))
+
+
+def _shares(budget: int, lengths: list[int]) -> list[int]:
+    """Split budget between strings of these lengths, shortest first, none taking more than it needs."""
+    limits = [0] * len(lengths)
+    left = budget
+    for k, i in enumerate(sorted(range(len(lengths)), key=lengths.__getitem__)):
+        limits[i] = min(lengths[i], left // (len(lengths) - k))
+        left -= limits[i]
+    return limits
+
+
+def _changes(old: dict, new: dict) -> dict:
+    changed = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+    for key in old:
+        if key not in new:
+            changed[key] = None
+    return changed
+
+
+def _side(old: dict, new: dict):
+    """The changed levels, or the whole side as a flat list when that has fewer entries."""
+    changes = _changes(old, new)
+    if len(changes) <= len(new):
+        return changes
+    return [x for level in new.items() for x in level]
+
+
+def _book_changes(old: dict, new: dict) -> dict:
+    changed = {}
+    for symbol, (buy, sell) in new.items():
+        previous = old.get(symbol)
+        if previous is None:
+            changed[symbol] = [[x for level in buy.items() for x in level], [x for level in sell.items() for x in level]]
+            continue
+        buy_changes, sell_changes = _side(previous[0], buy), _side(previous[1], sell)
+        # An emptied side comes back as [], which is falsy but still a change
+        if buy_changes != {} or sell_changes != {}:
+            changed[symbol] = [buy_changes, sell_changes]
+    for symbol in old:
+        if symbol not in new:
+            changed[symbol] = None
+    return changed
+
+
+def _reorder(old: list, new: list):
+    if new == old:
+        return 0
+    if len(new) == len(old) and set(new) == set(old):
+        position = {symbol: i for i, symbol in enumerate(old)}
+        return [position[symbol] for symbol in new]
+    return new
+
+
+_MISSING = object()
+
+
+def _apply(values: dict, changes: dict) -> None:
+    for key, value in changes.items():
+        if value is None:
+            values.pop(key, None)
+        else:
+            values[key] = value
+
+
+def decode_delta(lines: Iterable[str]) -> Iterator[tuple[TradingState, dict[Symbol, list[Order]], int, str, str]]:
+    """(state, orders, conversions, traderData, logs) of every tick DeltaLogger printed.
+
+    Lines before the first keyframe, and lines that are not DeltaLogger's,
+    are skipped, so a log cut off at the front resumes at its next keyframe.
+    """
+    listings = None
+    books: dict[Symbol, tuple[dict[int, int], dict[int, int]]] = {}
+    position: dict[Symbol, int] = {}
+    plain: dict[str, Any] = {}
+    conversion: dict[Symbol, list[Any]] = {}
+    trader_data_out = ""
+    for line in lines:
+        if not line.startswith("[0,") and not line.startswith("[1,"):
+            continue
+        (keyframe, timestamp, trader_data_in, compressed_listings, book_changes, own, market, position_changes,
+         plain_changes, conversion_changes, compressed_orders, conversions, trader_data, logs) = json.loads(line)
+        if keyframe:
+            listings = {symbol: {"symbol": symbol, "product": product, "denomination": denomination} for symbol, product, denomination in compressed_listings}
+            books = {symbol: ({int(p): v for p, v in buy.items()}, {int(p): v for p, v in sell.items()}) for symbol, (buy, sell) in book_changes.items()}
+            position, plain, conversion = position_changes, plain_changes, conversion_changes
+        elif listings is None:
+            continue
+        else:
+            order, book_changes = book_changes
+            for symbol, sides in book_changes.items():
+                if sides is None:
+                    books.pop(symbol, None)
+                    continue
+                book = books.get(symbol)
+                if book is None:
+                    book = books[symbol] = ({}, {})
+                for side, changes in zip(book, sides):
+                    if isinstance(changes, list):
+                        side.clear()
+                        side.update(zip(changes[::2], changes[1::2]))
+                    else:
+                        _apply(side, {int(p): v for p, v in changes.items()})
+            if order:
+                previous = list(books)
+                symbols = [previous[i] for i in order] if isinstance(order[0], int) else order
+                books = {symbol: books[symbol] for symbol in symbols}
+            _apply(position, position_changes)
+            _apply(plain, plain_changes)
+            _apply(conversion, conversion_changes)
+        if trader_data_in == 0:
+            trader_data_in = trader_data_out
+        trader_data_out = trader_data
+
+        order_depths = {}
+        for symbol, (buy, sell) in books.items():
+            depth = OrderDepth()
+            depth.buy_orders = dict(buy)
+            depth.sell_orders = dict(sell)
+            order_depths[symbol] = depth
+        state = TradingState(
+            trader_data_in,
+            timestamp,
+            listings,
+            order_depths,
+            _group_trades(own),
+            _group_trades(market),
+            dict(position),
+            Observation(dict(plain), {product: ConversionObservation(*fields) for product, fields in conversion.items()}),
+        )
+        orders = {}
+        for symbol, price, quantity in compressed_orders:
+            orders.setdefault(symbol, []).append(Order(symbol, price, quantity))
+        yield state, orders, conversions, trader_data, logs
+
+
+def _group_trades(compressed: list[list[Any]]) -> dict[Symbol, list[Trade]]:
+    trades: dict[Symbol, list[Trade]] = {}
+    for symbol, price, quantity, buyer, seller, timestamp in compressed:
+        trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, buyer, seller, timestamp))
+    return trades
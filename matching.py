@@ -0,0 +1,106 @@
+"""Order matching with the platform's semantics.
+
+For one product at one tick:
+  1. if the product's orders could take the position past its limit (all
+     buys filled, or all sells filled), every order for it is rejected;
+  2. each order then walks the opposite side of the book snapshot, filling
+     at the book's prices;
+  3. whatever is left matches the tick's market trades at the order's own
+     price, for trades printed at or through that price.
+
+Books and trades are passed as plain int lists (best level first, volumes
+positive) so the inner loops do no dict lookups or sorting.
+"""
+from typing import List, Optional, Tuple
+
+# (price, signed quantity, index of the market trade hit or BOOK)
+Fill = Tuple[int, int, int]
+
+BOOK = -1
+
+
+def within_limit(quantities: List[int], position: int, limit: int) -> bool:
+    buys = 0
+    sells = 0
+    for q in quantities:
+        if q > 0:
+            buys += q
+        else:
+            sells -= q
+    return position + buys <= limit and position - sells >= -limit
+
+
+def match_orders(
+    prices: List[int],
+    quantities: List[int],
+    bid_prices: List[int],
+    bid_volumes: List[int],
+    ask_prices: List[int],
+    ask_volumes: List[int],
+    trade_prices: List[int],
+    trade_volumes: List[int],
+    position: int,
+    limit: int,
+) -> Optional[List[Fill]]:
+    """Match one product's orders; None if they were rejected for the limit.
+
+    trade_volumes is consumed in place so the caller can pass the leftover
+    market trades on to the next tick. The book lists are left untouched.
+    """
+    if not within_limit(quantities, position, limit):
+        return None
+
+    fills: List[Fill] = []
+    bid_volumes = bid_volumes[:]
+    ask_volumes = ask_volumes[:]
+    n_trades = len(trade_prices)
+
+    for price, remaining in zip(prices, quantities):
+        if remaining > 0:
+            for k in range(len(ask_prices)):
+                level = ask_prices[k]
+                if level > price:
+                    break
+                available = ask_volumes[k]
+                if available:
+                    volume = remaining if remaining < available else available
+                    ask_volumes[k] = available - volume
+                    fills.append((level, volume, BOOK))
+                    remaining -= volume
+                    if not remaining:
+                        break
+            if remaining:
+                for k in range(n_trades):
+                    available = trade_volumes[k]
+                    if available and trade_prices[k] <= price:
+                        volume = remaining if remaining < available else available
+                        trade_volumes[k] = available - volume
+                        fills.append((price, volume, k))
+                        remaining -= volume
+                        if not remaining:
+                            break
+        elif remaining < 0:
+            remaining = -remaining
+            for k in range(len(bid_prices)):
+                level = bid_prices[k]
+                if level < price:
+                    break
+                available = bid_volumes[k]
+                if available:
+                    volume = remaining if remaining < available else available
+                    bid_volumes[k] = available - volume
+                    fills.append((level, -volume, BOOK))
+                    remaining -= volume
+                    if not remaining:
+                        break
+            if remaining:
+                for k in range(n_trades):
+                    available = trade_volumes[k]
+                    if available and trade_prices[k] >= price:
+                        volume = remaining if remaining < available else available
+                        trade_volumes[k] = available - volume
+                        fills.append((price, -volume, k))
+                        remaining -= volume
+                        if not remaining:
+                            break
+    return fills
@@ -0,0 +1,199 @@
+"""Black-Scholes prices and greeks for COCONUT_COUPON, shared by the traders and the research scripts.
+
+Scalars, for a Trader's per-tick call (math only, so numpy is not loaded):
+
+    from pricing import call_price, call_greeks
+    bs_price = call_price(S, 245/365, 0.01, 0.191)             # K defaults to 10000
+    g = call_greeks(S, 245/365, 0.01, 0.191)                   # g.price, g.delta, g.gamma, g.vega, g.theta
+
+Whole arrays at once, for research and run_batch (S, T, sigma and K broadcast):
+
+    from pricing import call_price_array, call_greeks_array
+    df["bs_price"] = call_price_array(df["mid_price"].to_numpy(), 249/365, 0, 0.193)
+
+N(x) is 0.5 * (1 + erf(x / sqrt(2))), the formula statistics.NormalDist().cdf
+uses, so call_price returns the same floats as the black_scholes_price copies
+it replaces without building a NormalDist per call. The array path uses
+scipy.special.ndtr when scipy is installed and erf element by element
+otherwise. vega is per 1.0 of volatility and theta per year, as T and sigma
+are. T and sigma must be positive.
+
+Implied volatility inverts call_price, one price at a time or a whole
+array at once (Newton steps with a bisection fallback, see implied_vol_array):
+
+    iv = implied_vol(coupon_mid, coconut_mid, 249/250, 0)
+    ivs = implied_vol_array(coupon_mids, coconut_mids, 249/250, 0)   # NaN where no vol fits
+
+    python bench.py pricing                    # against the copies' df.apply(..., axis=1)
+    python bench.py implied_vol                # against find_vol's per-row Newton loop
+"""
+import math
+from typing import NamedTuple
+
+try:
+    from lazy_import import lazy
+except ImportError:
+    from importlib import import_module as lazy
+
+np = lazy("numpy")
+
+_SQRT2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+# Volatility bracket the implied vol solvers search, and their tolerance on the price
+VOL_LOW, VOL_HIGH = 1e-4, 4.0
+PRICE_TOL = 1e-6
+
+# Resolved on first use by _ndtr
+_ndtr_impl = None
+
+
+class Greeks(NamedTuple):
+    price: float
+    delta: float
+    gamma: float
+    vega: float
+    theta: float
+
+
+def norm_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / _SQRT2))
+
+
+def norm_pdf(x: float) -> float:
+    return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
+
+
+def call_price(S: float, T: float, r: float, sigma: float, K: float = 10000) -> float:
+    sigma_t = sigma * math.sqrt(T)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_t
+    d2 = d1 - sigma_t
+    return S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
+
+
+def call_greeks(S: float, T: float, r: float, sigma: float, K: float = 10000) -> Greeks:
+    sqrt_t = math.sqrt(T)
+    sigma_t = sigma * sqrt_t
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_t
+    d2 = d1 - sigma_t
+    n1, n2, p1 = norm_cdf(d1), norm_cdf(d2), norm_pdf(d1)
+    discounted = K * math.exp(-r * T)
+    return Greeks(
+        S * n1 - discounted * n2,
+        n1,
+        p1 / (S * sigma_t),
+        S * p1 * sqrt_t,
+        -S * p1 * sigma / (2 * sqrt_t) - r * discounted * n2,
+    )
+
+
+def _ndtr(x):
+    global _ndtr_impl
+    if _ndtr_impl is None:
+        try:
+            from scipy.special import ndtr as _ndtr_impl
+        except ImportError:
+            erf = np.frompyfunc(math.erf, 1, 1)
+            _ndtr_impl = lambda x: 0.5 * (1.0 + erf(np.asarray(x) / _SQRT2).astype(float))
+    return _ndtr_impl(x)
+
+
+def call_price_array(S, T, r: float, sigma, K=10000):
+    S = np.asarray(S, dtype=float)
+    sigma_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * np.square(sigma)) * T) / sigma_t
+    d2 = d1 - sigma_t
+    return S * _ndtr(d1) - K * np.exp(-r * T) * _ndtr(d2)
+
+
+def call_greeks_array(S, T, r: float, sigma, K=10000) -> Greeks:
+    """Greeks of arrays, one entry per element of the broadcast inputs."""
+    S = np.asarray(S, dtype=float)
+    sqrt_t = np.sqrt(T)
+    sigma_t = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r + 0.5 * np.square(sigma)) * T) / sigma_t
+    d2 = d1 - sigma_t
+    n1, n2 = _ndtr(d1), _ndtr(d2)
+    p1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    discounted = K * np.exp(-r * T)
+    return Greeks(
+        S * n1 - discounted * n2,
+        n1,
+        p1 / (S * sigma_t),
+        S * p1 * sqrt_t,
+        -S * p1 * sigma / (2 * sqrt_t) - r * discounted * n2,
+    )
+
+
+def implied_vol(price: float, S: float, T: float, r: float = 0.0, K: float = 10000, guess: float = 0.5, max_iter: int = 100) -> float:
+    """The sigma at which call_price matches price, or NaN when none in [VOL_LOW, VOL_HIGH] does."""
+    discounted = K * math.exp(-r * T)
+    if not max(S - discounted, 0.0) < price < S:
+        return math.nan
+    low, high = VOL_LOW, VOL_HIGH
+    sqrt_t = math.sqrt(T)
+    log_moneyness = math.log(S / K) + r * T
+    vol = guess
+    for _ in range(max_iter):
+        sigma_t = vol * sqrt_t
+        d1 = (log_moneyness + 0.5 * vol * vol * T) / sigma_t
+        diff = S * norm_cdf(d1) - discounted * norm_cdf(d1 - sigma_t) - price
+        if abs(diff) < PRICE_TOL:
+            return vol
+        # The price rises with sigma, so diff says which side of the root vol is on
+        if diff > 0:
+            high = vol
+        else:
+            low = vol
+        vega = S * norm_pdf(d1) * sqrt_t
+        step = vol - diff / vega if vega > 1e-12 else low
+        vol = step if low < step < high else 0.5 * (low + high)
+    return math.nan
+
+
+def implied_vol_array(price, S, T, r: float = 0.0, K=10000, guess: float = 0.5, max_iter: int = 100):
+    """implied_vol over broadcast arrays: Newton steps on every unconverged entry at once.
+
+    Each entry keeps a bracket around its root. A Newton step that leaves the
+    bracket, or comes from a vega too small to divide by, is replaced by a
+    bisection step, and entries drop out of the arrays as they converge.
+    Prices outside the no-arbitrage bounds, and roots outside [VOL_LOW,
+    VOL_HIGH], give NaN.
+    """
+    price, S, T, K = (np.array(a, dtype=float) for a in np.broadcast_arrays(price, S, T, K))
+    shape = price.shape
+    price, S, T, K = price.ravel(), S.ravel(), T.ravel(), K.ravel()
+    discounted = K * np.exp(-r * T)
+    out = np.full(price.shape, np.nan)
+
+    active = np.flatnonzero((price > np.maximum(S - discounted, 0.0)) & (price < S))
+    price, S, discounted = price[active], S[active], discounted[active]
+    sqrt_t = np.sqrt(T[active])
+    log_moneyness = np.log(S / K[active]) + r * T[active]
+    T = T[active]
+    vol = np.full(active.shape, guess)
+    low = np.full(active.shape, VOL_LOW)
+    high = np.full(active.shape, VOL_HIGH)
+    for _ in range(max_iter):
+        if not active.size:
+            break
+        sigma_t = vol * sqrt_t
+        d1 = (log_moneyness + 0.5 * vol * vol * T) / sigma_t
+        diff = S * _ndtr(d1) - discounted * _ndtr(d1 - sigma_t) - price
+        done = np.abs(diff) < PRICE_TOL
+        if done.any():
+            out[active[done]] = vol[done]
+            keep = ~done
+            active, price, S, discounted, sqrt_t, log_moneyness, T = (
+                a[keep] for a in (active, price, S, discounted, sqrt_t, log_moneyness, T))
+            vol, low, high, diff, d1 = vol[keep], low[keep], high[keep], diff[keep], d1[keep]
+        above = diff > 0
+        high = np.where(above, vol, high)
+        low = np.where(above, low, vol)
+        vega = S * (_INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)) * sqrt_t
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = vol - diff / vega
+        newton = (vega > 1e-12) & (step > low) & (step < high)
+        vol = np.where(newton, step, 0.5 * (low + high))
+    out = out.reshape(shape)
+    return float(out) if not shape else out
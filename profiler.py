@@ -0,0 +1,179 @@
+"""Per-tick latency profile of Trader.run on real data.
+
+Usage:
+    python profiler.py trader_final_r4.py 3
+    python profiler.py stan_basket3.py 3 0 --budget 900 --warn 0.1
+
+Reports p50/p99/max wall time of run, a per-method breakdown of where that
+time goes (every method of the Trader instance, every function in the
+trader module's namespace, and the module's logger), and the ticks that
+came within --warn of the platform's time budget.
+
+Each method's time is its own ("self"): time spent in other instrumented
+methods it calls is charged to those, so the share column adds up to at
+most 100% of run. The inclusive time is reported next to it.
+"""
+import inspect
+import sys
+import time
+from typing import Dict, List, Optional
+
+import backtester
+
+DEFAULT_BUDGET_MS = 900.0
+DEFAULT_WARN = 0.5
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class MethodStats:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        # time spent in the method itself, and including the instrumented methods it calls
+        self.total_ns = 0
+        self.inclusive_ns = 0
+        # self time of this method during each tick, to find the expensive ticks
+        self.tick_ns: List[int] = []
+
+
+class Profile:
+
+    def __init__(self, budget_ms: float, warn: float) -> None:
+        self.budget_ms = budget_ms
+        self.warn = warn
+        self.run_ns: List[int] = []
+        self.timestamps: List[int] = []
+        self.days: List[str] = []
+        self.methods: Dict[str, MethodStats] = {}
+        self._current: Dict[str, int] = {}
+        # inclusive time of the instrumented calls made so far by each timed call in progress, innermost last
+        self._children: List[int] = []
+
+    def wrap(self, name: str, fn):
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats(name)
+            stats.tick_ns = [0] * len(self.run_ns)
+        current = self._current
+        children = self._children
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            children.append(0)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                own = elapsed - children.pop()
+                if children:
+                    children[-1] += elapsed
+                stats.calls += 1
+                stats.total_ns += own
+                stats.inclusive_ns += elapsed
+                current[name] = current.get(name, 0) + own
+
+        return timed
+
+    def instrument(self, trader, module) -> None:
+        """Replace every method of trader, every function of module and module.logger's print/flush by timed wrappers."""
+        for cls in type(trader).__mro__:
+            if cls is object:
+                continue
+            for name, value in vars(cls).items():
+                if callable(value) and not name.startswith("__") and name != "run" and name not in vars(trader):
+                    setattr(trader, name, self.wrap(name, getattr(trader, name)))
+        # Module-level helpers are looked up as globals of the module at call time, so rebinding them there is enough
+        for name, value in list(vars(module).items()):
+            if inspect.isfunction(value) and not name.startswith("__"):
+                setattr(module, name, self.wrap(name, value))
+        logger = getattr(module, "logger", None)
+        for name in ("print", "flush"):
+            if logger is not None and callable(getattr(logger, name, None)):
+                setattr(logger, name, self.wrap("logger." + name, getattr(logger, name)))
+
+        run = trader.run
+        clock = time.perf_counter_ns
+
+        def timed_run(state):
+            self._current.clear()
+            self._children.clear()
+            start = clock()
+            try:
+                return run(state)
+            finally:
+                self.run_ns.append(clock() - start)
+                self.timestamps.append(state.timestamp)
+                for stats in self.methods.values():
+                    stats.tick_ns.append(self._current.get(stats.name, 0))
+
+        trader.run = timed_run
+
+    def flagged(self) -> List[int]:
+        """Indices of ticks whose run time came within the warning fraction of the budget."""
+        limit = self.budget_ms * self.warn * 1e6
+        return [i for i, ns in enumerate(self.run_ns) if ns >= limit]
+
+    def report(self, top: int = 10) -> str:
+        ms = sorted(ns / 1e6 for ns in self.run_ns)
+        lines = [
+            "%d ticks, budget %.0f ms" % (len(ms), self.budget_ms),
+            "run: p50 %.3f ms  p99 %.3f ms  max %.3f ms  mean %.3f ms" % (percentile(ms, 50), percentile(ms, 99), ms[-1] if ms else 0.0, sum(ms) / len(ms) if ms else 0.0),
+            "",
+            "%-28s %9s %12s %12s %12s %12s %7s" % ("method", "calls", "self ms", "per tick ms", "p99 tick ms", "incl ms", "share"),
+        ]
+        total_ns = sum(self.run_ns) or 1
+        for stats in sorted(self.methods.values(), key=lambda s: s.total_ns, reverse=True):
+            if not stats.calls:
+                continue
+            per_tick = sorted(ns / 1e6 for ns in stats.tick_ns)
+            lines.append("%-28s %9d %12.1f %12.4f %12.4f %12.1f %6.1f%%" % (
+                stats.name, stats.calls, stats.total_ns / 1e6, stats.total_ns / 1e6 / max(len(self.run_ns), 1), percentile(per_tick, 99),
+                stats.inclusive_ns / 1e6, 100.0 * stats.total_ns / total_ns))
+
+        flagged = self.flagged()
+        lines.append("")
+        lines.append("%d ticks at or above %g%% of the budget (%.1f ms)" % (len(flagged), self.warn * 100, self.budget_ms * self.warn))
+        for i in sorted(flagged, key=lambda i: self.run_ns[i], reverse=True)[:top]:
+            worst = max(self.methods.values(), key=lambda s: s.tick_ns[i], default=None)
+            detail = " (%s %.1f ms)" % (worst.name, worst.tick_ns[i] / 1e6) if worst is not None and worst.tick_ns[i] else ""
+            lines.append("    %s t=%d: %.1f ms%s" % (self.days[i], self.timestamps[i], self.run_ns[i] / 1e6, detail))
+        return "\n".join(lines)
+
+
+def profile(trader_path: str, rounds: List[int], days: Optional[List[int]] = None, budget_ms: float = DEFAULT_BUDGET_MS, warn: float = DEFAULT_WARN) -> Profile:
+    result = Profile(budget_ms, warn)
+    for data in backtester.load_days(rounds, days):
+        module = backtester.load_trader_module(trader_path)
+        trader = module.Trader()
+        result.instrument(trader, module)
+        before = len(result.run_ns)
+        # No run_batch: the platform never calls it, so run() is timed without its precomputed signals
+        backtester.Backtester(trader, data, logging=True, batch=False).run()
+        result.days += [data.name] * (len(result.run_ns) - before)
+    return result
+
+
+def main(argv: List[str]) -> None:
+    options = {"--budget": DEFAULT_BUDGET_MS, "--warn": DEFAULT_WARN}
+    for flag in options:
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = float(argv[i + 1])
+            argv = argv[:i] + argv[i + 2:]
+    if len(argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    days = [int(d) for d in argv[2:]]
+    print(profile(argv[0], backtester.parse_rounds(argv[1]), days, options["--budget"], options["--warn"]).report())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
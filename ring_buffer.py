@@ -0,0 +1,186 @@
+"""Fixed-size rolling window with running statistics, for the traders' price and spread caches.
+
+Replaces the cache.pop(0) / cache.append(x) / np.mean(np.array(cache)) pattern:
+appending is O(1) (amortised; min and max use monotonic deques), and so is
+every statistic, instead of a list shift plus two passes over the window per
+tick.
+
+    from ring_buffer import RingBuffer
+    spread_cache = RingBuffer(200)
+    spread_cache.append(spread)
+    spread_cache.mean(), spread_cache.std(), spread_cache.zscore(), spread_cache.tail_mean(3)
+    spread_cache.min(), spread_cache.max(), spread_cache[-1], list(spread_cache)
+
+std() and var() are population statistics, like np.std / np.var. Sums are
+kept relative to a reference value and recomputed exactly once per capacity
+appends, so rounding does not build up over a day.
+
+dump() gives [capacity, oldest, ..., newest] for traderData, and load() rebuilds
+the buffer from it:
+
+    traderData = json.dumps({"spread": spread_cache.dump(digits=1)})
+    spread_cache = RingBuffer.load(json.loads(state.traderData)["spread"])
+
+    python bench.py ring_buffer                # against the list and numpy version
+"""
+import math
+from collections import deque
+from typing import Iterable, Iterator, List, Optional
+
+
+class RingBuffer:
+
+    def __init__(self, capacity: int, values: Iterable[float] = ()) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._values: List[float] = [0.0] * capacity
+        # Slot of the oldest value, and how many slots are in use
+        self._start = 0
+        self._len = 0
+        # Values appended so far; _prefix[count % (capacity + 1)] is the sum of (x - _ref) over them, for tail_mean
+        self._count = 0
+        self._prefix: List[float] = [0.0] * (capacity + 1)
+        self._ref = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._until_resync = capacity
+        # (count, value) pairs, values increasing (_low) / decreasing (_high) from the front
+        self._low: deque = deque()
+        self._high: deque = deque()
+        for x in values:
+            self.append(x)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self) -> Iterator[float]:
+        values, start, capacity = self._values, self._start, self.capacity
+        for i in range(self._len):
+            yield values[(start + i) % capacity]
+
+    def __getitem__(self, i: int) -> float:
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("RingBuffer index out of range")
+        return self._values[(self._start + i) % self.capacity]
+
+    def __repr__(self) -> str:
+        return "RingBuffer(%d, %r)" % (self.capacity, list(self))
+
+    @property
+    def full(self) -> bool:
+        return self._len == self.capacity
+
+    def append(self, x: float) -> None:
+        capacity = self.capacity
+        if self._len == 0:
+            self._ref = x
+        d = x - self._ref
+        if self._len == capacity:
+            old = self._values[self._start] - self._ref
+            self._values[self._start] = x
+            self._start = (self._start + 1) % capacity
+            self._sum += d - old
+            self._sumsq += d * d - old * old
+        else:
+            self._values[(self._start + self._len) % capacity] = x
+            self._len += 1
+            self._sum += d
+            self._sumsq += d * d
+        count = self._count = self._count + 1
+        self._prefix[count % (capacity + 1)] = self._prefix[(count - 1) % (capacity + 1)] + d
+
+        oldest = count - self._len
+        low, high = self._low, self._high
+        while low and low[-1][1] >= x:
+            low.pop()
+        low.append((count, x))
+        while low[0][0] <= oldest:
+            low.popleft()
+        while high and high[-1][1] <= x:
+            high.pop()
+        high.append((count, x))
+        while high[0][0] <= oldest:
+            high.popleft()
+
+        self._until_resync -= 1
+        if self._until_resync == 0:
+            self._resync()
+
+    def _resync(self) -> None:
+        """Recompute the sums exactly, around the current mean."""
+        self._until_resync = self.capacity
+        values = list(self)
+        ref = self._ref = sum(values) / len(values)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        prefix, size = self._prefix, self.capacity + 1
+        count = self._count - len(values)
+        prefix[count % size] = 0.0
+        for x in values:
+            d = x - ref
+            self._sum += d
+            self._sumsq += d * d
+            count += 1
+            prefix[count % size] = prefix[(count - 1) % size] + d
+
+    def clear(self) -> None:
+        self.__init__(self.capacity)
+
+    def _need(self) -> None:
+        if not self._len:
+            raise ValueError("RingBuffer is empty")
+
+    def mean(self) -> float:
+        self._need()
+        return self._ref + self._sum / self._len
+
+    def var(self) -> float:
+        self._need()
+        m = self._sum / self._len
+        meansq = self._sumsq / self._len
+        var = meansq - m * m
+        # Below the rounding noise of the subtraction (a flat window just after a jump): flat
+        return var if var > 1e-12 * meansq else 0.0
+
+    def std(self) -> float:
+        return math.sqrt(self.var())
+
+    def zscore(self, x: Optional[float] = None) -> float:
+        """(x - mean) / std, for the newest value by default; 0 when the window is flat."""
+        if x is None:
+            x = self[-1]
+        std = self.std()
+        return (x - self.mean()) / std if std > 0 else 0.0
+
+    def min(self) -> float:
+        self._need()
+        return self._low[0][1]
+
+    def max(self) -> float:
+        self._need()
+        return self._high[0][1]
+
+    def tail_mean(self, k: int) -> float:
+        """Mean of the newest k values (all of them when fewer are held)."""
+        self._need()
+        k = min(k, self._len)
+        size = self.capacity + 1
+        count = self._count
+        return self._ref + (self._prefix[count % size] - self._prefix[(count - k) % size]) / k
+
+    def dump(self, digits: Optional[int] = None) -> list:
+        """[capacity, oldest, ..., newest], with values rounded to digits when given."""
+        values = list(self)
+        if digits is not None:
+            values = [round(x, digits) for x in values]
+        return [self.capacity] + values
+
+    @classmethod
+    def load(cls, data: list) -> "RingBuffer":
+        return cls(data[0], data[1:])
@@ -0,0 +1,134 @@
+"""Autoregressive price predictors whose coefficients follow the market by recursive least squares.
+
+The traders predict next tick's mid as intercept + sum(coeff[i] * mid[i]) over
+the last k mids (oldest first), with coefficients fitted offline in lr.ipynb
+and pasted in. ARPredictor starts from those numbers and keeps refitting them
+online: each new mid is the target for the previous window, and one RLS step
+(O(k^2), plain Python, no numpy) moves the coefficients towards it. A
+forgetting factor below 1 weights recent ticks more, so the fit follows a
+drifting market:
+
+    from rls import ARPredictor
+    starfruit = ARPredictor([0.18895127, 0.20771801, 0.26114406, 0.34171985], 2.3552758852292754)
+    starfruit.update(mid)                  # once per tick
+    starfruit.predict()                    # next tick's mid, None until k mids are in
+    starfruit.coeff, starfruit.intercept   # the current fit, in the offline fit's terms
+
+Raw mids in the thousands are nearly collinear, which makes RLS on them
+ill-conditioned. The fit is therefore kept in an equivalent basis:
+[1, mid[0] - mid[k-1], ..., mid[k-2] - mid[k-1], mid[k-1] - ref], where ref is
+the first mid seen, and the coefficients are [intercept + sum(coeff) * ref,
+coeff[0], ..., coeff[k-2], sum(coeff)]. The model is the same one, only
+better scaled. The covariance stops growing once its trace reaches
+max_trace, so quiet stretches cannot wind it up.
+
+dump() is [coefficients in that basis, the covariance's upper triangle, the
+window, ref], for traderData. The coefficients keep 10 significant digits and
+the covariance 6, enough for a reloaded predictor to carry on the same fit
+without filling traderData with 17-digit floats; the window and ref are mids,
+already short:
+
+    traderData = json.dumps({"starfruit": starfruit.dump()})
+    starfruit.load_state(json.loads(state.traderData)["starfruit"])
+
+    python bench.py rls                    # prediction error and cost against the fixed coefficients
+"""
+from operator import mul
+from typing import List, Optional, Sequence
+
+
+class ARPredictor:
+
+    def __init__(self, coeff: Sequence[float], intercept: float = 0.0, forgetting: float = 0.9995,
+                 delta: float = 1e-4, max_trace: float = 1.0) -> None:
+        self.k = len(coeff)
+        # The offline fit, until the first window fixes ref and it moves into the fitting basis
+        self._start = (float(intercept), [float(c) for c in coeff])
+        self.v: Optional[List[float]] = None
+        self.ref: Optional[float] = None
+        n = self.k + 1
+        self.P: List[List[float]] = [[delta if i == j else 0.0 for j in range(n)] for i in range(n)]
+        self.forgetting = forgetting
+        self.max_trace = max_trace
+        self.window: List[float] = []
+
+    @property
+    def coeff(self) -> List[float]:
+        if self.v is None:
+            return list(self._start[1])
+        lags = self.v[1:-1]
+        return lags + [self.v[-1] - sum(lags)]
+
+    @property
+    def intercept(self) -> float:
+        if self.v is None:
+            return self._start[0]
+        return self.v[0] - self.v[-1] * self.ref
+
+    def _inputs(self) -> List[float]:
+        window = self.window
+        last = window[-1]
+        if self.v is None:
+            intercept, coeff = self._start
+            self.ref = last
+            self.v = [intercept + sum(coeff) * last] + coeff[:-1] + [sum(coeff)]
+        return [1.0] + [p - last for p in window[:-1]] + [last - self.ref]
+
+    def predict(self) -> Optional[float]:
+        if len(self.window) < self.k:
+            return None
+        u = self._inputs()
+        return sum(map(mul, self.v, u))
+
+    def update(self, price: float) -> None:
+        """Refit on the previous window with price as its target, then move the window on."""
+        window = self.window
+        if len(window) == self.k:
+            self._step(self._inputs(), price)
+            window.pop(0)
+        window.append(price)
+
+    def _step(self, u: List[float], y: float) -> None:
+        v, P = self.v, self.P
+        err = y - sum(map(mul, v, u))
+        Pu = [sum(map(mul, row, u)) for row in P]
+        gain_denom = self.forgetting + sum(map(mul, u, Pu))
+        gain = [pi / gain_denom for pi in Pu]
+        self.v = [vi + gi * err for vi, gi in zip(v, gain)]
+        scale = 1.0 if sum(row[i] for i, row in enumerate(P)) >= self.max_trace else 1.0 / self.forgetting
+        self.P = [[(pij - gi * pj) * scale for pij, pj in zip(row, Pu)] for row, gi in zip(P, gain)]
+
+    def dump(self, v_digits: int = 10, p_digits: int = 6) -> list:
+        """[v, P's upper triangle, window, ref], v and P rounded to v_digits / p_digits significant digits."""
+        v_format, p_format = "%%.%dg" % v_digits, "%%.%dg" % p_digits
+        return [
+            [float(v_format % x) for x in self.v] if self.v is not None else [],
+            [float(p_format % x) for i, row in enumerate(self.P) for x in row[i:]],
+            list(self.window),
+            self.ref,
+        ]
+
+    def load_state(self, data: list) -> "ARPredictor":
+        """Take the running values from dump(), keeping this predictor's settings."""
+        v, upper, window, ref = data
+        self.v = list(v) if v else None
+        self.P = [[upper[i] for i in row] for row in _upper_index(self.k + 1)]
+        self.window = list(window)
+        self.ref = ref
+        return self
+
+
+_upper_indices: dict = {}
+
+
+def _upper_index(n: int) -> List[List[int]]:
+    """Where each entry of an n x n symmetric matrix sits in its row-major upper triangle."""
+    index = _upper_indices.get(n)
+    if index is None:
+        index = _upper_indices[n] = [[0] * n for _ in range(n)]
+        k = 0
+        for i in range(n):
+            for j in range(i, n):
+                index[i][j] = index[j][i] = k
+                k += 1
+    return index
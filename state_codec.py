@@ -0,0 +1,99 @@
+"""Compact JSON encoding of TradingState, and the decoder that rebuilds it.
+
+TradingState.toJSON walks every object through a Python default hook and
+sorts every key. This codec instead lays each datamodel type out as a fixed
+positional array around the state's own dicts and hands that tree to orjson
+(or the C json encoder when orjson is not installed), so a recorded state can
+be stored per tick and replayed later:
+
+    line = encode(state)          # one JSON array per state
+    same = decode(line)           # TradingState with equal fields, book order and types
+
+    python bench.py codec         # speed against toJSON
+
+Layout: [VERSION, traderData, timestamp, listings, order_depths, own_trades,
+market_trades, position, plainValueObservations, conversionObservations], with
+    listings                [1, {key: {symbol, product, denomination}}] when the listings are
+                            plain dicts (as the backtester and platform pass them), else
+                            [0, [[key, symbol, product, denomination], ...]] of Listing objects
+    order_depths            [[symbol, buy_orders, sell_orders], ...] (price keys come back as ints)
+    own/market_trades       [[key, [[symbol, price, quantity, buyer, seller, timestamp], ...]], ...]
+    conversionObservations  [[product, bidPrice, askPrice, transportFees, exportTariff, importTariff, sunlight, humidity], ...]
+"""
+import json
+from typing import Dict, List
+
+from datamodel import ConversionObservation, Listing, Observation, OrderDepth, Trade, TradingState
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+VERSION = 1
+
+_encoder = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+
+
+def _trades(trades: Dict[str, List[Trade]]) -> list:
+    return [[key, [[t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp] for t in rows]] for key, rows in trades.items()]
+
+
+def _listings(listings: dict) -> list:
+    if all(type(listing) is dict for listing in listings.values()):
+        return [1, listings]
+    return [0, [[key, listing.symbol, listing.product, listing.denomination] for key, listing in listings.items()]]
+
+
+def to_tree(state: TradingState) -> list:
+    """The positional tree encode() serialises; it shares the state's dicts."""
+    observations = state.observations
+    return [
+        VERSION,
+        state.traderData,
+        state.timestamp,
+        _listings(state.listings),
+        [[symbol, depth._buy_orders, depth._sell_orders] for symbol, depth in state.order_depths.items()],
+        _trades(state.own_trades),
+        _trades(state.market_trades),
+        state.position,
+        observations.plainValueObservations if observations is not None else {},
+        [[product, o.bidPrice, o.askPrice, o.transportFees, o.exportTariff, o.importTariff, o.sunlight, o.humidity]
+         for product, o in observations.conversionObservations.items()] if observations is not None else [],
+    ]
+
+
+def encode(state: TradingState) -> str:
+    if orjson is not None:
+        return orjson.dumps(to_tree(state), option=orjson.OPT_NON_STR_KEYS).decode()
+    return _encoder.encode(to_tree(state))
+
+
+def _depth(buy_orders: dict, sell_orders: dict) -> OrderDepth:
+    # JSON object keys are strings; the sides were stored best first, so the setters keep their order
+    depth = OrderDepth()
+    depth.buy_orders = {int(price): volume for price, volume in buy_orders.items()}
+    depth.sell_orders = {int(price): volume for price, volume in sell_orders.items()}
+    return depth
+
+
+def from_tree(tree: list) -> TradingState:
+    if tree[0] != VERSION:
+        raise ValueError("unsupported state encoding version %r" % (tree[0],))
+    _, trader_data, timestamp, (plain_listings, listings), depths, own, market, position, plain, conversions = tree
+    if not plain_listings:
+        listings = {key: Listing(symbol, product, denomination) for key, symbol, product, denomination in listings}
+    return TradingState(
+        trader_data,
+        timestamp,
+        listings,
+        {symbol: _depth(buy_orders, sell_orders) for symbol, buy_orders, sell_orders in depths},
+        {key: [Trade(*row) for row in rows] for key, rows in own},
+        {key: [Trade(*row) for row in rows] for key, rows in market},
+        position,
+        Observation(plain, {product: ConversionObservation(*fields) for product, *fields in conversions}),
+    )
+
+
+def decode(line: str) -> TradingState:
+    return from_tree(orjson.loads(line) if orjson is not None else json.loads(line))
@@ -0,0 +1,139 @@
+"""Parallel parameter sweep over Trader class attributes.
+
+Usage:
+    python sweep.py stan_basket3.py 3 basket_std=60,70,76,90 std=20,25,30
+    python sweep.py trader_final_r4.py 1+3+4 spread_cache_size=100,200 coupon_thres=1,2.5 -j 8
+
+Every grid point is replayed on every day, one (point, day) pair per task,
+so the pool stays busy and the run scales with the number of cores. The
+days are loaded once in the parent: with the fork start method workers
+inherit them read-only instead of receiving a pickled copy, elsewhere each
+worker opens the same memory-mapped cache (data_cache.py) once.
+"""
+import ast
+import inspect
+import itertools
+import multiprocessing
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import backtester
+
+# Set in the parent before the pool forks, or by _init_worker otherwise
+_DAYS: List[backtester.DayData] = []
+
+
+class SweepResult:
+
+    def __init__(self, params: Dict[str, Any]) -> None:
+        self.params = params
+        self.pnl: Dict[str, float] = {}
+        self.day_pnl: Dict[str, float] = {}
+        self.errors = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.pnl.values())
+
+
+def param_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _init_worker(rounds: List[int], days: Optional[List[int]]) -> None:
+    global _DAYS
+    _DAYS = backtester.load_days(rounds, days)
+
+
+def _run_task(task):
+    point, day_index, trader_path, class_name, params = task
+    module = backtester.load_trader_module(trader_path)
+    cls = getattr(module, class_name)
+    for name, value in params.items():
+        setattr(cls, name, value)
+    result = backtester.Backtester(cls(), _DAYS[day_index]).run()
+    return point, result.name, dict(result.pnl), result.errors
+
+
+def _trader_source(trader) -> (str, str):
+    if isinstance(trader, str):
+        return os.path.abspath(trader), "Trader"
+    return os.path.abspath(inspect.getsourcefile(trader)), trader.__name__
+
+
+def sweep(trader, rounds: List[int], grid: Dict[str, List[Any]], days: Optional[List[int]] = None, processes: Optional[int] = None) -> List[SweepResult]:
+    """Replay every point of the grid and return the results ranked by total PnL.
+
+    trader is either a trader file path or a Trader class defined in one.
+    """
+    global _DAYS
+    trader_path, class_name = _trader_source(trader)
+    points = param_grid(grid)
+    results = [SweepResult(p) for p in points]
+
+    fork = "fork" in multiprocessing.get_all_start_methods()
+    if fork:
+        _DAYS = backtester.load_days(rounds, days)
+        context = multiprocessing.get_context("fork")
+        pool = context.Pool(processes)
+    else:
+        # Build the cache up front so workers only ever memory-map it
+        _init_worker(rounds, days)
+        pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(rounds, days))
+
+    tasks = [(i, d, trader_path, class_name, p) for i, p in enumerate(points) for d in range(len(_DAYS))]
+    with pool:
+        for point, day_name, pnl, errors in pool.imap_unordered(_run_task, tasks):
+            result = results[point]
+            for product, value in pnl.items():
+                result.pnl[product] = result.pnl.get(product, 0.0) + value
+            result.day_pnl[day_name] = sum(pnl.values())
+            result.errors += errors
+
+    results.sort(key=lambda r: r.total, reverse=True)
+    return results
+
+
+def print_table(results: List[SweepResult]) -> None:
+    if not results:
+        return
+    names = list(results[0].params)
+    days = sorted(results[0].day_pnl)
+    header = ["rank"] + names + days + ["total", "errors"]
+    rows = []
+    for rank, r in enumerate(results, 1):
+        rows.append([str(rank)] + [repr(r.params[n]) for n in names] + ["%.1f" % r.day_pnl.get(d, 0.0) for d in days] + ["%.1f" % r.total, str(r.errors)])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header)]
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def main(argv: List[str]) -> None:
+    processes = None
+    if "-j" in argv:
+        i = argv.index("-j")
+        processes = int(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    if len(argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    grid = {}
+    for spec in argv[2:]:
+        name, values = spec.split("=", 1)
+        grid[name] = [_parse_value(v) for v in values.split(",")]
+    print_table(sweep(argv[0], backtester.parse_rounds(argv[1]), grid, processes=processes))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
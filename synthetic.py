@@ -0,0 +1,306 @@
+"""Synthetic order-book days calibrated on the historical bottles.
+
+Usage:
+    python synthetic.py 3 100                  # 100 synthetic round-3 days
+    python synthetic.py 1 10 --out my-bottle --ticks 50000 --seed 7
+
+Per round, fit() learns from every day in the bottles:
+  - the mid-price process of each product: a random walk, or an AR(1)
+    around a fixed mean for products like AMETHYSTS, driven by increments
+    (residuals) resampled jointly across products at the same tick, so
+    contemporaneous moves of e.g. the basket and its components stay
+    correlated;
+  - the book shape around the mid (spread, number of levels, volumes),
+    resampled row by row from the history;
+  - market trades: a Poisson arrival rate per product, with price offsets
+    from the mid and quantities resampled from the history.
+
+generate_day() is vectorised, and write_day() writes the usual
+prices_round_*/trades_round_* CSVs and pre-fills the columnar cache so the
+backtester can replay the output straight away (backtester.load_bottle).
+"""
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import backtester
+import catalog
+import data_cache
+
+# A fitted AR(1) coefficient above this is treated as a random walk
+RANDOM_WALK_PHI = 0.98
+# Keep phi^-k below 1e100 inside one closed-form AR(1) chunk
+_MAX_LOG_SCALE = 100 * np.log(10)
+
+
+class ProductModel:
+
+    def __init__(self, product: str) -> None:
+        self.product = product
+        self.kind = "walk"
+        self.mean = 0.0
+        self.phi = 1.0
+        self.start = 0.0
+        # increments (walk) or residuals (ar1), aligned across products by tick
+        self.shocks = np.zeros(0)
+        # book rows relative to the mid: (rows, LEVELS) offsets and volumes, 0 volume = empty level
+        self.bid_offset = np.zeros((0, data_cache.LEVELS))
+        self.bid_volume = np.zeros((0, data_cache.LEVELS), dtype=np.int32)
+        self.ask_offset = np.zeros((0, data_cache.LEVELS))
+        self.ask_volume = np.zeros((0, data_cache.LEVELS), dtype=np.int32)
+        self.trade_rate = 0.0
+        self.trade_offset = np.zeros(0)
+        self.trade_quantity = np.zeros(0, dtype=np.int32)
+
+
+class RoundModel:
+
+    def __init__(self, round_num: int, products: List[str]) -> None:
+        self.round = round_num
+        self.products = products
+        self.models: Dict[str, ProductModel] = {p: ProductModel(p) for p in products}
+        self.shock_count = 0
+
+
+def fit(round_num: int) -> RoundModel:
+    prices = []
+    trades = []
+    cat = catalog.default()
+    for day in cat.days(round_num):
+        table = cat.prices(round_num, day)
+        if not isinstance(table, data_cache.PriceTable):
+            raise ValueError("round %d has no order book data to fit" % round_num)
+        prices.append(table)
+        trades.append(cat.trades(round_num, day))
+
+    model = RoundModel(round_num, list(prices[0].products))
+    shocks = {p: [] for p in model.products}
+    mids = {p: [] for p in model.products}
+    for table, trade_table in zip(prices, trades):
+        ticks = None
+        for product in model.products:
+            rows = table.rows(product)
+            order = np.argsort(table.timestamp[rows], kind="stable")
+            rows = rows[order]
+            ticks = len(rows) if ticks is None else min(ticks, len(rows))
+            mids[product].append(np.asarray(table.mid_price[rows], dtype=np.float64))
+
+            m = model.models[product]
+            mid = np.asarray(table.mid_price[rows])[:, None]
+            m.bid_offset = np.vstack([m.bid_offset, table.bid_price[rows] - mid])
+            m.ask_offset = np.vstack([m.ask_offset, table.ask_price[rows] - mid])
+            m.bid_volume = np.vstack([m.bid_volume, table.bid_volume[rows]])
+            m.ask_volume = np.vstack([m.ask_volume, table.ask_volume[rows]])
+
+            if trade_table is not None and product in trade_table.symbols:
+                t_rows = trade_table.rows(product)
+                tick_index = np.searchsorted(np.asarray(table.timestamp[rows]), np.asarray(trade_table.timestamp[t_rows]))
+                tick_index = np.clip(tick_index, 0, len(rows) - 1)
+                m.trade_offset = np.concatenate([m.trade_offset, trade_table.price[t_rows] - mid[tick_index, 0]])
+                m.trade_quantity = np.concatenate([m.trade_quantity, trade_table.quantity[t_rows]]).astype(np.int32)
+                m.trade_rate += len(t_rows)
+        for product in model.products:
+            mids[product][-1] = mids[product][-1][:ticks]
+
+    total_ticks = sum(len(m) for m in mids[model.products[0]])
+    for product in model.products:
+        m = model.models[product]
+        m.trade_rate /= max(total_ticks, 1)
+        # Empty levels keep their (meaningless) offset but zero volume
+        m.bid_offset[m.bid_volume == 0] = 0.0
+        m.ask_offset[m.ask_volume == 0] = 0.0
+
+        series = mids[product]
+        flat = np.concatenate(series)
+        m.mean = float(flat.mean())
+        m.start = float(series[0][0])
+        x = np.concatenate([s[:-1] for s in series]) - m.mean
+        y = np.concatenate([s[1:] for s in series]) - m.mean
+        m.phi = float(x @ y / (x @ x)) if x @ x > 0 else 0.0
+        if m.phi >= RANDOM_WALK_PHI:
+            m.kind = "walk"
+            shocks[product] = np.concatenate([np.diff(s) for s in series])
+        else:
+            m.kind = "ar1"
+            m.phi = max(m.phi, 0.0)
+            m.start = m.mean
+            shocks[product] = y - m.phi * x
+        m.shocks = shocks[product]
+    model.shock_count = min(len(s) for s in shocks.values())
+    return model
+
+
+def ar1_path(phi: float, mean: float, start: float, shocks: np.ndarray) -> np.ndarray:
+    """x[t] = mean + phi * (x[t-1] - mean) + shocks[t], vectorised in closed-form chunks."""
+    n = len(shocks)
+    out = np.empty(n)
+    if phi <= 1e-6:
+        return mean + shocks
+    chunk = max(1, min(n, int(_MAX_LOG_SCALE / -np.log(phi)))) if phi < 1 else n
+    level = start - mean
+    for lo in range(0, n, chunk):
+        e = shocks[lo:lo + chunk]
+        k = np.arange(1, len(e) + 1)
+        if phi == 1:
+            path = level + np.cumsum(e)
+        else:
+            # y_k = phi^k * (y_0 + sum_{j<=k} phi^-j e_j)
+            path = phi ** k * (level + np.cumsum(e * phi ** -k))
+        out[lo:lo + len(e)] = path
+        level = path[-1]
+    return out + mean
+
+
+def generate_day(model: RoundModel, day: int, ticks: int = 10000, rng: Optional[np.random.Generator] = None) -> (Dict[str, np.ndarray], Dict[str, np.ndarray]):
+    """One synthetic day as (price columns, trade columns) in the data_cache layout."""
+    rng = rng if rng is not None else np.random.default_rng()
+    products = model.products
+    n_products = len(products)
+    timestamps = np.arange(ticks, dtype=np.int32) * backtester.TICK
+    shock_index = rng.integers(0, model.shock_count, size=ticks)
+
+    rows = ticks * n_products
+    price = {
+        "day": np.full(rows, day, dtype=np.int16),
+        "timestamp": np.repeat(timestamps, n_products),
+        "product": np.tile(np.arange(n_products, dtype=np.uint8), ticks),
+        "bid_price": np.zeros((rows, data_cache.LEVELS), dtype=np.int32),
+        "bid_volume": np.zeros((rows, data_cache.LEVELS), dtype=np.int32),
+        "ask_price": np.zeros((rows, data_cache.LEVELS), dtype=np.int32),
+        "ask_volume": np.zeros((rows, data_cache.LEVELS), dtype=np.int32),
+        "mid_price": np.zeros(rows),
+        "profit_and_loss": np.zeros(rows),
+    }
+    trade_parts = []
+
+    for p, product in enumerate(products):
+        m = model.models[product]
+        shocks = m.shocks[shock_index]
+        if m.kind == "walk":
+            fair = m.start + np.cumsum(shocks)
+        else:
+            fair = ar1_path(m.phi, m.mean, m.start, shocks)
+
+        shape = rng.integers(0, len(m.bid_offset), size=ticks)
+        # floor(x + 0.5) shifts every level by the same integer, so spreads survive rounding
+        bid_price = np.floor(fair[:, None] + m.bid_offset[shape] + 0.5).astype(np.int32)
+        ask_price = np.floor(fair[:, None] + m.ask_offset[shape] + 0.5).astype(np.int32)
+        bid_volume = m.bid_volume[shape]
+        ask_volume = m.ask_volume[shape]
+        bid_price[bid_volume == 0] = 0
+        ask_price[ask_volume == 0] = 0
+
+        out = slice(p, rows, n_products)
+        price["bid_price"][out] = bid_price
+        price["bid_volume"][out] = bid_volume
+        price["ask_price"][out] = ask_price
+        price["ask_volume"][out] = ask_volume
+        has_both = (bid_volume[:, 0] > 0) & (ask_volume[:, 0] > 0)
+        price["mid_price"][out] = np.where(has_both, (bid_price[:, 0] + ask_price[:, 0]) / 2.0, np.round(fair * 2) / 2)
+
+        if m.trade_rate > 0 and len(m.trade_offset):
+            counts = rng.poisson(m.trade_rate, size=ticks)
+            tick_of_trade = np.repeat(np.arange(ticks), counts)
+            sample = rng.integers(0, len(m.trade_offset), size=len(tick_of_trade))
+            trade_parts.append((
+                timestamps[tick_of_trade],
+                np.full(len(tick_of_trade), p, dtype=np.uint8),
+                np.floor(fair[tick_of_trade] + m.trade_offset[sample] + 0.5),
+                m.trade_quantity[sample],
+            ))
+
+    if trade_parts:
+        t_timestamp = np.concatenate([t[0] for t in trade_parts])
+        order = np.argsort(t_timestamp, kind="stable")
+        t_symbol, t_price, t_quantity = (np.concatenate([t[i] for t in trade_parts])[order] for i in (1, 2, 3))
+        t_timestamp = t_timestamp[order]
+    else:
+        t_timestamp, t_symbol, t_price, t_quantity = (np.zeros(0, dtype=d) for d in (np.int32, np.uint8, np.float64, np.int32))
+    trade = {
+        "timestamp": t_timestamp.astype(np.int32),
+        "symbol": t_symbol.astype(np.uint8),
+        "buyer": np.zeros(len(t_timestamp), dtype=np.int16),
+        "seller": np.zeros(len(t_timestamp), dtype=np.int16),
+        "price": t_price.astype(np.float64),
+        "quantity": t_quantity.astype(np.int32),
+    }
+    return price, trade
+
+
+def _column(values: np.ndarray, present: Optional[np.ndarray] = None) -> List[str]:
+    text = list(map(str, values.tolist()))
+    if present is not None:
+        for i in np.flatnonzero(~present).tolist():
+            text[i] = ""
+    return text
+
+
+def write_day(model: RoundModel, day: int, price: Dict[str, np.ndarray], trade: Dict[str, np.ndarray], folder: str) -> (str, str):
+    """Write one generated day as CSVs in the bottle schema and cache its columns."""
+    os.makedirs(folder, exist_ok=True)
+    prices_path = os.path.join(folder, "prices_round_%d_day_%d.csv" % (model.round, day))
+    trades_path = os.path.join(folder, "trades_round_%d_day_%d_nn.csv" % (model.round, day))
+
+    columns = [_column(price["day"]), _column(price["timestamp"]), np.array(model.products, dtype=object)[price["product"]].tolist()]
+    for side in ("bid", "ask"):
+        for level in range(data_cache.LEVELS):
+            present = price[side + "_volume"][:, level] > 0
+            columns.append(_column(price[side + "_price"][:, level], present))
+            columns.append(_column(price[side + "_volume"][:, level], present))
+    columns.append(_column(price["mid_price"]))
+    columns.append(_column(price["profit_and_loss"]))
+    header = "day;timestamp;product;" + ";".join(
+        "%s_%s_%d" % (side, kind, level + 1) for side in ("bid", "ask") for level in range(data_cache.LEVELS) for kind in ("price", "volume")
+    ) + ";mid_price;profit_and_loss"
+    with open(prices_path, "w") as f:
+        f.write(header + "\n")
+        f.write("\n".join(map(";".join, zip(*columns))))
+        f.write("\n")
+
+    symbols = np.array(model.products, dtype=object)[trade["symbol"]].tolist()
+    n = len(symbols)
+    columns = [_column(trade["timestamp"]), [""] * n, [""] * n, symbols, ["SEASHELLS"] * n, _column(trade["price"]), _column(trade["quantity"])]
+    with open(trades_path, "w") as f:
+        f.write("timestamp;buyer;seller;symbol;currency;price;quantity\n")
+        if n:
+            f.write("\n".join(map(";".join, zip(*columns))))
+            f.write("\n")
+
+    data_cache.store(prices_path, data_cache.PRICES, price, {"products": list(model.products)})
+    data_cache.store(trades_path, data_cache.TRADES, trade, {"symbols": list(model.products), "names": [""]})
+    return prices_path, trades_path
+
+
+def generate(round_num: int, days: int, folder: str, ticks: int = 10000, seed: Optional[int] = None, write: bool = True) -> List[int]:
+    model = fit(round_num)
+    rng = np.random.default_rng(seed)
+    generated = []
+    for day in range(days):
+        price, trade = generate_day(model, day, ticks, rng)
+        if write:
+            write_day(model, day, price, trade, folder)
+        generated.append(day)
+    return generated
+
+
+def main(argv: List[str]) -> None:
+    options = {"--out": None, "--ticks": "10000", "--seed": None}
+    for flag in options:
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = argv[i + 1]
+            argv = argv[:i] + argv[i + 2:]
+    if len(argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    round_num, days = int(argv[0]), int(argv[1])
+    folder = options["--out"] or os.path.join(backtester.DATA_ROOT, "synthetic-round-%d-island-data-bottle" % round_num)
+    seed = int(options["--seed"]) if options["--seed"] is not None else None
+    generate(round_num, days, folder, int(options["--ticks"]), seed)
+    print("wrote %d days to %s" % (days, folder))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy as np
+from data_cache import read_frame
 
-df0 = pd.read_csv("round-3-island-data-bottle/prices_round_3_day_0.csv", sep=";")
-df1 = pd.read_csv("round-3-island-data-bottle/prices_round_3_day_1.csv", sep=";")
-df2 = pd.read_csv("round-3-island-data-bottle/prices_round_3_day_2.csv", sep=";")
+df0 = read_frame("round-3-island-data-bottle/prices_round_3_day_0.csv")
+df1 = read_frame("round-3-island-data-bottle/prices_round_3_day_1.csv")
+df2 = read_frame("round-3-island-data-bottle/prices_round_3_day_2.csv")
 df = pd.concat([df0, df1, df2])
 
 
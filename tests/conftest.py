@@ -0,0 +1,62 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+# The modules under test live flat at the repository root, next to the trader files
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtester
+import data_cache
+
+PRICE_HEADER = ("day;timestamp;product;bid_price_1;bid_volume_1;bid_price_2;bid_volume_2;bid_price_3;bid_volume_3;"
+                "ask_price_1;ask_volume_1;ask_price_2;ask_volume_2;ask_price_3;ask_volume_3;mid_price;profit_and_loss")
+TRADE_HEADER = "timestamp;buyer;seller;symbol;currency;price;quantity"
+
+
+def price_rows(books: dict, day: int = 0) -> list:
+    """Lines of a prices CSV for {timestamp: {product: ([(bid, volume), ...], [(ask, volume), ...])}}."""
+    lines = [PRICE_HEADER]
+    for timestamp, products in books.items():
+        for product, (bids, asks) in products.items():
+            cells = [str(day), str(timestamp), product]
+            for side in (bids, asks):
+                for k in range(data_cache.LEVELS):
+                    cells += [str(side[k][0]), str(side[k][1])] if k < len(side) else ["", ""]
+            tops = [side[0][0] for side in (bids, asks) if side]
+            cells += [str(sum(tops) / len(tops) if tops else 0.0), "0.0"]
+            lines.append(";".join(cells))
+    return lines
+
+
+def trade_rows(trades) -> list:
+    """Lines of a trades CSV for [(timestamp, symbol, price, quantity, buyer, seller), ...]."""
+    return [TRADE_HEADER] + ["%d;%s;%s;%s;SEASHELLS;%.1f;%d" % (t, buyer, seller, symbol, price, quantity)
+                             for t, symbol, price, quantity, buyer, seller in trades]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the columnar cache of files written by a test under its tmp_path."""
+    folder = tmp_path / "cache"
+    monkeypatch.setattr(data_cache, "CACHE_DIR", str(folder))
+    return folder
+
+
+@pytest.fixture
+def make_day(tmp_path, cache_dir):
+    """Build a backtester DayData from small books and trades, through CSVs written under tmp_path."""
+    names = itertools.count()
+
+    def make(books: dict, trades=(), round_num: int = 1, day: int = 0) -> backtester.DayData:
+        n = next(names)
+        prices = tmp_path / ("prices_round_%d_day_%d_%d.csv" % (round_num, day, n))
+        prices.write_text("\n".join(price_rows(books, day)) + "\n")
+        trades_path = None
+        if trades:
+            trades_path = tmp_path / ("trades_round_%d_day_%d_%d_nn.csv" % (round_num, day, n))
+            trades_path.write_text("\n".join(trade_rows(trades)) + "\n")
+        return backtester.load_files(str(prices), str(trades_path) if trades_path else None, round_num, day)
+
+    return make
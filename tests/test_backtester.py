@@ -0,0 +1,54 @@
+import backtester
+from datamodel import Order
+
+BOOKS = {t: {"ROSES": ([(14500, 10)], [(14502, 10)]), "CHOCOLATE": ([(7900, 10)], [(7901, 10)])} for t in range(0, 400, 100)}
+LIMITS = {"ROSES": 5, "CHOCOLATE": 5}
+
+
+class ScriptedTrader:
+    """Sends the orders of a {timestamp: [Order, ...]} script, and records the positions it is shown."""
+
+    def __init__(self, script: dict) -> None:
+        self.script = script
+        self.positions = []
+
+    def run(self, state):
+        self.positions.append(state.position.get("ROSES", 0))
+        orders = {}
+        for order in self.script.get(state.timestamp, ()):
+            orders.setdefault(order.symbol, []).append(order)
+        return orders, 0, ""
+
+
+def run(make_day, script: dict):
+    trader = ScriptedTrader(script)
+    result = backtester.Backtester(trader, make_day(BOOKS), limits=LIMITS).run()
+    assert result.errors == 0
+    return result, trader.positions
+
+
+def test_orders_over_the_limit_are_rejected_as_a_batch(make_day):
+    # At t=100 each ROSES order would fit the limit on its own, but not all three together
+    result, positions = run(make_day, {
+        0: [Order("ROSES", 14502, 3)],
+        100: [Order("ROSES", 14502, 2), Order("ROSES", 14502, 1), Order("ROSES", 14502, 1), Order("CHOCOLATE", 7901, 2)],
+        200: [Order("ROSES", 14502, 2)],
+    })
+    assert result.rejected == 1
+    # Nothing of the ROSES batch filled, while the CHOCOLATE order of the same tick did
+    assert [(t.symbol, t.timestamp, t.quantity) for t in result.own_trades] == [("ROSES", 0, 3), ("CHOCOLATE", 100, 2), ("ROSES", 200, 2)]
+    assert positions == [0, 3, 3, 5]
+    assert result.position == {"ROSES": 5, "CHOCOLATE": 2}
+
+
+def test_buys_and_sells_are_counted_apart(make_day):
+    # At the limit, one more buy is rejected even when the sells sent with it would net the position down
+    result, positions = run(make_day, {
+        0: [Order("ROSES", 14502, 5)],
+        100: [Order("ROSES", 14502, 1), Order("ROSES", 14500, -4)],
+        200: [Order("ROSES", 14500, -4)],
+    })
+    assert result.rejected == 1
+    assert [(t.timestamp, t.buyer, t.seller, t.quantity) for t in result.own_trades] == [
+        (0, "SUBMISSION", "", 5), (200, "", "SUBMISSION", 4)]
+    assert positions == [0, 5, 5, 1]
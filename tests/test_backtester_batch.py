@@ -0,0 +1,72 @@
+import types
+
+import backtester
+import growth
+import profiler
+
+BOOKS = {t: {"STARFRUIT": ([(5000 + t // 100, 10)], [(5003 + t // 100, 10)])} for t in range(0, 500, 100)}
+
+
+class BatchTrader:
+
+    def __init__(self) -> None:
+        self.batches = []
+        self.ticks = 0
+
+    def run_batch(self, batch) -> None:
+        self.batches.append(batch)
+
+    def run(self, state):
+        self.ticks += 1
+        return {}, 0, ""
+
+
+def test_run_batch_is_called_on_a_day(make_day):
+    trader = BatchTrader()
+    backtester.Backtester(trader, make_day(BOOKS)).run()
+    assert len(trader.batches) == 1
+    assert trader.batches[0].timestamps.tolist() == list(BOOKS)
+    assert trader.ticks == len(BOOKS)
+
+
+def test_batch_false_skips_run_batch(make_day):
+    trader = BatchTrader()
+    result = backtester.Backtester(trader, make_day(BOOKS), batch=False).run()
+    assert trader.batches == []
+    assert trader.ticks == len(BOOKS) and result.errors == 0
+
+
+def test_chained_day_skips_run_batch(make_day):
+    trader = BatchTrader()
+    chain = backtester.ChainedDay([make_day(BOOKS)], ticks=12)
+    result = backtester.Backtester(trader, chain).run()
+    assert trader.batches == []
+    assert trader.ticks == 12 and result.errors == 0
+
+
+def fake_module(monkeypatch, days):
+    traders = []
+
+    class Trader(BatchTrader):
+        def __init__(self) -> None:
+            super().__init__()
+            traders.append(self)
+
+    monkeypatch.setattr(backtester, "load_trader_module", lambda path: types.SimpleNamespace(Trader=Trader))
+    monkeypatch.setattr(backtester, "load_days", lambda rounds, days_=None: days)
+    return traders
+
+
+def test_profiler_times_run_without_run_batch(make_day, monkeypatch):
+    traders = fake_module(monkeypatch, [make_day(BOOKS)])
+    report = profiler.profile("trader.py", [1])
+    assert len(report.run_ns) == len(BOOKS)
+    assert [t.batches for t in traders] == [[]]
+
+
+def test_growth_times_run_without_run_batch(make_day, monkeypatch):
+    traders = fake_module(monkeypatch, [make_day(BOOKS)])
+    report = growth.watch("trader.py", [1], ticks=20, every=5)
+    assert traders[0].ticks == 20
+    assert traders[0].batches == []
+    assert report.ticks
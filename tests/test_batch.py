@@ -0,0 +1,72 @@
+import numpy as np
+
+import backtester
+from batch import TradingStateBatch
+
+# ROSES loses its bid at t=200 and has no row at all at t=300; CHOCOLATE has two and three levels
+BOOKS = {
+    0: {"ROSES": ([(14500, 3)], [(14502, 4), (14503, 1)]), "CHOCOLATE": ([(7900, 10), (7899, 5)], [(7901, 10), (7902, 2), (7903, 1)])},
+    100: {"ROSES": ([(14501, 2)], [(14503, 4)]), "CHOCOLATE": ([(7900, 9), (7899, 5)], [(7901, 10), (7902, 2), (7903, 1)])},
+    200: {"ROSES": ([], [(14503, 4)]), "CHOCOLATE": ([(7901, 1), (7900, 9), (7899, 5)], [(7902, 2)])},
+    300: {"CHOCOLATE": ([(7900, 9)], [(7902, 2)])},
+}
+TRADES = [(100, "ROSES", 14502, 2, "Rhianna", "Vladimir"), (300, "CHOCOLATE", 7901, 4, "Remy", "Vinnie")]
+
+
+def expected(product: str, side: int, part: int) -> np.ndarray:
+    """(N, LEVELS) array of one side's prices (part 0) or volumes (part 1), zero padded."""
+    rows = []
+    for books in BOOKS.values():
+        levels = [level[part] for level in books.get(product, ([], []))[side]]
+        rows.append(levels + [0] * (3 - len(levels)))
+    return np.array(rows, dtype=np.int64)
+
+
+def check(batch: TradingStateBatch, timestamps) -> None:
+    assert batch.timestamps.tolist() == list(timestamps)
+    assert sorted(batch.products) == ["CHOCOLATE", "ROSES"]
+    for product in batch.products:
+        np.testing.assert_array_equal(batch.bid_prices[product], expected(product, 0, 0))
+        np.testing.assert_array_equal(batch.bid_volumes[product], expected(product, 0, 1))
+        np.testing.assert_array_equal(batch.ask_prices[product], expected(product, 1, 0))
+        np.testing.assert_array_equal(batch.ask_volumes[product], expected(product, 1, 1))
+        assert batch.position[product].tolist() == [0] * len(BOOKS)
+    np.testing.assert_array_equal(batch.mid("ROSES"), [14501, 14502, np.nan, np.nan])
+    np.testing.assert_array_equal(batch.mid("CHOCOLATE"), [7900.5, 7900.5, 7901.5, 7901])
+
+
+def test_from_day_on_a_loaded_day(make_day):
+    day = make_day(BOOKS, TRADES)
+    assert day.price_tables
+    batch = TradingStateBatch.from_day(day)
+    check(batch, BOOKS)
+    assert batch.trade_timestamp.tolist() == [100, 300]
+    assert batch.trade_symbol == ["ROSES", "CHOCOLATE"]
+    assert batch.trade_price.tolist() == [14502, 7901] and batch.trade_quantity.tolist() == [2, 4]
+    assert (batch.trade_buyer, batch.trade_seller) == (["Rhianna", "Remy"], ["Vladimir", "Vinnie"])
+    assert batch.trades("CHOCOLATE").tolist() == [1]
+    assert batch.index(200) == 2
+
+
+def test_from_day_reads_the_same_from_books_without_the_tables(make_day):
+    day = make_day(BOOKS, TRADES)
+    day.price_tables = []
+    batch = TradingStateBatch.from_day(day)
+    check(batch, BOOKS)
+    assert batch.trade_timestamp.tolist() == [100, 300]
+
+
+def test_from_day_on_a_chained_day(make_day):
+    day = make_day(BOOKS, TRADES)
+    chain = backtester.ChainedDay([day], ticks=len(BOOKS))
+    check(TradingStateBatch.from_day(chain), BOOKS)
+    # A second lap runs on after the first, one day later, with the same books and trades
+    chain = backtester.ChainedDay([day], ticks=2 * len(BOOKS))
+    batch = TradingStateBatch.from_day(chain)
+    span = chain.span
+    assert batch.timestamps.tolist() == list(BOOKS) + [t + span for t in BOOKS]
+    for product in batch.products:
+        np.testing.assert_array_equal(batch.bid_prices[product], np.tile(expected(product, 0, 0), (2, 1)))
+        np.testing.assert_array_equal(batch.ask_volumes[product], np.tile(expected(product, 1, 1), (2, 1)))
+    assert batch.trade_timestamp.tolist() == [100, 300, 100 + span, 300 + span]
+    assert batch.trade_symbol == ["ROSES", "CHOCOLATE"] * 2
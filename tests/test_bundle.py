@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import sys
+import types
+
+import pytest
+
+import backtester
+import bundle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRADERS = ["trader_final_r4.py", "trader_final_r5.py"]
+
+
+@pytest.fixture(scope="module")
+def data():
+    return backtester.ChainedDay(backtester.load_days([1, 3, 4], [0]), ticks=3000)
+
+
+@contextlib.contextmanager
+def hidden(modules):
+    """Make importing any of modules fail, as on the platform where only the uploaded file and datamodel exist."""
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(dict.fromkeys(modules))
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def replay(module, data):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = backtester.Backtester(module.Trader(), data, quiet=False, logging=True).run()
+    return result, out.getvalue()
+
+
+@pytest.mark.parametrize("name", TRADERS)
+def test_bundle_trades_and_logs_like_the_modules(name, data, tmp_path):
+    helpers = bundle.helper_modules(ROOT) - {name[:-3]}
+    path = bundle.write_bundle(os.path.join(ROOT, name), str(tmp_path / name))
+    with hidden(helpers):
+        with pytest.raises(ImportError):
+            backtester.load_trader_module(os.path.join(ROOT, name))
+        bundled = backtester.load_trader_module(path)
+    assert not [v for v in vars(bundled).values() if isinstance(v, types.ModuleType) and v.__name__ in helpers]
+
+    expected, expected_logs = replay(backtester.load_trader_module(os.path.join(ROOT, name)), data)
+    result, logs = replay(bundled, data)
+    assert result.errors == expected.errors == 0
+    assert result.own_trades and [repr(t) for t in result.own_trades] == [repr(t) for t in expected.own_trades]
+    assert result.pnl == expected.pnl
+    assert logs == expected_logs
+
+
+def test_helper_imports_are_inlined_once(tmp_path):
+    (tmp_path / "datamodel.py").write_text("class Order:\n    pass\n")
+    (tmp_path / "base.py").write_text('"""Base."""\nSCALE = 2\n\nif __name__ == "__main__":\n    print("base")\n')
+    (tmp_path / "helper.py").write_text(
+        '"""Helper."""\n'
+        "try:\n    from base import SCALE\nexcept ImportError:\n    SCALE = 3\n"
+        "\ndef double(x):\n    return x * SCALE\n")
+    (tmp_path / "trader.py").write_text(
+        "from datamodel import Order\nfrom base import SCALE\nfrom helper import double\n"
+        "\nclass Trader:\n    def run(self, state):\n        return double(SCALE)\n")
+    text = bundle.bundle(str(tmp_path / "trader.py"))
+    assert text.count("SCALE = 2") == 1 and "SCALE = 3" not in text
+    assert "from base" not in text and "from helper" not in text and "from datamodel import Order" in text
+    assert '"""Base."""' not in text and "__main__" not in text
+    namespace = {}
+    exec(compile(text.replace("from datamodel import Order\n", ""), "bundle", "exec"), namespace)
+    assert namespace["Trader"]().run(None) == 4
+
+
+def test_nested_helper_imports_are_refused(tmp_path):
+    (tmp_path / "helper.py").write_text("X = 1\n")
+    (tmp_path / "trader.py").write_text("class Trader:\n    def run(self, state):\n        from helper import X\n        return X\n")
+    with pytest.raises(ValueError, match="top-level"):
+        bundle.bundle(str(tmp_path / "trader.py"))
@@ -0,0 +1,50 @@
+import catalog
+import data_cache
+from conftest import trade_rows
+
+
+def table(trades) -> data_cache.TradeTable:
+    kind, arrays, meta = data_cache.parse_csv(trade_rows(trades))
+    return data_cache.TradeTable(arrays, meta)
+
+
+def tape(nn, wn) -> list:
+    """(timestamp, symbol, price, quantity, buyer, seller) rows of join_trades, in tape order."""
+    arrays, meta = catalog.join_trades(nn and table(nn), wn and table(wn))
+    symbols, names = meta["symbols"], meta["names"]
+    return [(t, symbols[s], p, q, names[b], names[sl]) for t, s, p, q, b, sl in zip(
+        *(arrays[c].tolist() for c in ("timestamp", "symbol", "price", "quantity", "buyer", "seller")))]
+
+
+# The named file and the anonymised file of one day: the same trades, with and without counterparties
+WN = [(100, "ROSES", 14500, 2, "Rhianna", "Vladimir"), (200, "CHOCOLATE", 7900, 5, "Remy", "Vinnie")]
+NN = [(100, "ROSES", 14500, 2, "", ""), (200, "CHOCOLATE", 7900, 5, "", "")]
+
+
+def test_matched_trades_appear_once_with_names():
+    assert tape(NN, WN) == WN
+
+
+def test_trade_only_in_nn_is_kept_unnamed():
+    only_nn = (300, "ROSES", 14510, 1, "", "")
+    assert tape(NN + [only_nn], WN) == WN + [only_nn]
+
+
+def test_trade_only_in_wn_is_kept():
+    only_wn = (300, "ROSES", 14510, 1, "Rhianna", "Ruby")
+    assert tape(NN, WN + [only_wn]) == WN + [only_wn]
+
+
+def test_repeated_identical_trades_in_one_tick_are_counted():
+    # Three identical fills at t=400 in nn; wn names two of them
+    fill = (400, "STRAWBERRIES", 3980, 6, "", "")
+    named = [(400, "STRAWBERRIES", 3980, 6, "Remy", "Raj"), (400, "STRAWBERRIES", 3980, 6, "Vinnie", "Raj")]
+    assert tape(NN + [fill] * 3, WN + named) == WN + named + [fill]
+    # and when wn has more copies than nn, none of them is dropped
+    assert tape(NN + [fill], WN + named) == WN + named
+
+
+def test_one_file_missing():
+    assert tape(NN, None) == NN
+    assert tape(None, WN) == WN
+    assert tape(None, None) == []
@@ -0,0 +1,12 @@
+import pytest
+
+import coldstart
+
+
+@pytest.mark.parametrize("path", ["trader_final_r4.py", "trader_final_r5.py"])
+def test_first_tick_does_not_load_numpy(path):
+    (result,) = coldstart.coldstart([path], repeat=1)
+    assert result.error is None
+    assert result.first_tick_ms != float("inf")
+    assert "numpy" not in result.heavy
+    assert "numpy" not in result.loaded_on_first_tick
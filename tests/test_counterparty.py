@@ -0,0 +1,53 @@
+import counterparty
+import data_cache
+from conftest import trade_rows
+from counterparty import BUY, SELL, Names, TradeIndex
+from datamodel import Trade
+
+RAJ, VINNIE = counterparty.NAMES("Raj"), counterparty.NAMES("Vinnie")
+
+
+def test_known_names_have_fixed_ids_and_new_ones_are_appended():
+    names = Names()
+    assert [names(n) for n in ("", "SUBMISSION", "Raj")] == [0, 1, 4]
+    assert names(None) == 0
+    new = names("Newcomer")
+    assert new == len(counterparty.KNOWN) and names("Newcomer") == new and names.name(new) == "Newcomer"
+    assert Names()("Raj") == RAJ
+
+
+def test_each_trade_is_filed_under_both_sides():
+    tape = TradeIndex()
+    tape.add_trades({"COCONUT": [Trade("COCONUT", 9900, 5, "Raj", "Vinnie", 1500), Trade("COCONUT", 9901, 2, "Vinnie", "Raj", 1500)],
+                     "ROSES": [Trade("ROSES", 14500, 1, "Raj", "Rhianna", 1500)]})
+    assert tape.trades(RAJ, "COCONUT", 1500) == [(BUY, 9900, 5, VINNIE), (SELL, 9901, 2, VINNIE)]
+    assert tape.trades(VINNIE, "COCONUT", 1500) == [(SELL, 9900, 5, RAJ), (BUY, 9901, 2, RAJ)]
+    assert (tape.bought(RAJ, "COCONUT", 1500), tape.sold(RAJ, "COCONUT", 1500), tape.net(RAJ, "COCONUT", 1500)) == (5, 2, 3)
+    assert tape.net(VINNIE, "COCONUT", 1500) == -3
+    assert tape.net(RAJ, "ROSES", 1500) == 1
+    assert tape.trades(RAJ, "COCONUT", 1400) == [] and tape.net(RAJ, "CHOCOLATE", 1500) == 0
+
+
+def test_horizon_keeps_a_rolling_window_and_a_new_day_clears_it():
+    tape = TradeIndex(horizon=200)
+    for t in range(0, 600, 100):
+        tape.add_trades({"COCONUT": [Trade("COCONUT", 9900, 1, "Raj", "Vinnie", t)]})
+    assert [t for t in range(0, 600, 100) if tape.net(RAJ, "COCONUT", t)] == [300, 400, 500]
+    # the next day starts over at 0
+    tape.add_trades({"COCONUT": [Trade("COCONUT", 9900, 4, "Vinnie", "Raj", 0)]})
+    assert tape.net(RAJ, "COCONUT", 500) == 0
+    assert tape.net(RAJ, "COCONUT", 0) == -4
+
+
+def test_from_table_remaps_file_ids_onto_names():
+    kind, arrays, meta = data_cache.parse_csv(trade_rows([
+        (100, "COCONUT", 9900, 5, "Vinnie", "Raj"),
+        (100, "COCONUT", 9901, 3, "", "Vinnie"),
+        (200, "ROSES", 14500, 1, "Raj", "Someone New"),
+    ]))
+    index = TradeIndex.from_table(data_cache.TradeTable(arrays, meta), Names())
+    # the file interns Vinnie before Raj; the index uses the shared ids
+    assert index.trades(RAJ, "COCONUT", 100) == [(SELL, 9900, 5, VINNIE)]
+    assert index.net(VINNIE, "COCONUT", 100) == 5 - 3
+    assert index.trades(0, "COCONUT", 100) == [(BUY, 9901, 3, VINNIE)]
+    assert index.names.name(index.trades(RAJ, "ROSES", 200)[0][3]) == "Someone New"
@@ -0,0 +1,96 @@
+import os
+import zipfile
+
+import numpy as np
+import pytest
+
+import backtester
+import data_cache
+from conftest import price_rows, trade_rows
+
+pd = pytest.importorskip("pandas")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAY_FILES = [
+    "round-3-island-data-bottle/prices_round_3_day_0.csv",
+    "round-3-island-data-bottle/trades_round_3_day_0_nn.csv",
+    # round 2's ORCHIDS observations ship under a prices_ name
+    "round-2-island-data-bottle/prices_round_2_day_0.csv",
+]
+
+
+@pytest.mark.parametrize("name", DAY_FILES)
+def test_read_frame_equals_read_csv(name, cache_dir):
+    path = os.path.join(ROOT, name)
+    pd.testing.assert_frame_equal(data_cache.read_frame(path), pd.read_csv(path, sep=";"))
+    # and again from the cache entry the first call wrote
+    assert os.listdir(cache_dir)
+    pd.testing.assert_frame_equal(data_cache.read_frame(path), pd.read_csv(path, sep=";"))
+
+
+def test_read_frame_of_named_trades_and_full_books(tmp_path, cache_dir):
+    trades = tmp_path / "trades_round_1_day_0_wn.csv"
+    trades.write_text("\n".join(trade_rows([(100, "ROSES", 14500, 2, "Rhianna", "Vladimir"), (200, "ROSES", 14501, 1, "", "Ruby")])) + "\n")
+    prices = tmp_path / "prices_round_1_day_0.csv"
+    books = {t: {"ROSES": ([(14500, 3), (14499, 1), (14498, 2)], [(14502, -3), (14503, -1), (14504, -2)])} for t in (0, 100)}
+    prices.write_text("\n".join(price_rows(books)) + "\n")
+    for path in (str(trades), str(prices)):
+        pd.testing.assert_frame_equal(data_cache.read_frame(path), pd.read_csv(path, sep=";"))
+
+
+BOOKS = {t: {"ROSES": ([(14500 + t // 100, 3)], [(14502 + t // 100, -3), (14503 + t // 100, -1)]),
+             "CHOCOLATE": ([(7900, 10), (7899, 5)], [(7901, -10)])} for t in range(0, 1000, 100)}
+TRADES = [(100, "ROSES", 14501, 2, "Rhianna", "Vladimir"), (100, "ROSES", 14501, 2, "Rhianna", "Vladimir"), (700, "CHOCOLATE", 7900, 4, "", "")]
+
+
+@pytest.fixture
+def bottle(tmp_path):
+    """The same day as plain CSVs and as members of a zip (with the macOS resource fork entries the real bottles have)."""
+    folder = tmp_path / "plain"
+    folder.mkdir()
+    files = {"prices_round_5_day_2.csv": price_rows(BOOKS, 2), "trades_round_5_day_2_wn.csv": trade_rows(TRADES)}
+    archive = tmp_path / "bottle.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, lines in files.items():
+            (folder / name).write_text("\n".join(lines) + "\n")
+            z.writestr("__MACOSX/._" + name, b"\0")
+            z.writestr(name, "\n".join(lines) + "\n")
+    return {name: (str(folder / name), os.path.join(str(archive), name)) for name in files}
+
+
+def assert_same_table(a: data_cache.Table, b: data_cache.Table) -> None:
+    assert type(a) is type(b)
+    assert {k: v for k, v in a.meta.items() if k != "source"} == {k: v for k, v in b.meta.items() if k != "source"}
+    for column in type(a).columns:
+        np.testing.assert_array_equal(getattr(a, column), getattr(b, column))
+
+
+def test_zip_member_loads_like_the_extracted_csv(bottle, cache_dir):
+    for plain, member in bottle.values():
+        assert data_cache.split_archive(member)[1] == os.path.basename(plain)
+        assert_same_table(data_cache.load(member), data_cache.load(plain))
+        pd.testing.assert_frame_equal(data_cache.read_frame(member), pd.read_csv(plain, sep=";"))
+
+
+def test_zip_member_streams_like_the_extracted_csv(bottle, cache_dir):
+    plain, member = bottle["prices_round_5_day_2.csv"]
+    whole = data_cache.load(plain)
+    for _ in range(2):
+        # decompressed and parsed as it is read, then from the cache entry the first pass wrote
+        chunks = list(data_cache.stream(member, chunk_rows=5))
+        assert len(chunks) > 2
+        # chunks are cut between ticks, never inside one
+        ends = [(c.timestamp[0], c.timestamp[-1]) for c in chunks if len(c)]
+        assert all(prev[1] < nxt[0] for prev, nxt in zip(ends, ends[1:]))
+        for column in type(whole).columns:
+            np.testing.assert_array_equal(np.concatenate([getattr(c, column) for c in chunks]), getattr(whole, column))
+
+
+def test_streamed_zip_day_replays_like_the_extracted_day(bottle, cache_dir):
+    prices, member = bottle["prices_round_5_day_2.csv"]
+    trades, trades_member = bottle["trades_round_5_day_2_wn.csv"]
+    loaded = backtester.load_files(prices, trades, 5, 2)
+    streamed = backtester.StreamedDay(5, 2, data_cache.stream(member, chunk_rows=4), data_cache.load(trades_member))
+    assert list(streamed.timestamps) == loaded.timestamps == list(BOOKS)
+    assert streamed.books == loaded.books
+    assert streamed.trades == loaded.trades
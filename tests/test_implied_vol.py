@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+import pricing
+from pricing import call_price, call_price_array, implied_vol, implied_vol_array
+
+T = 245 / 365
+
+
+@pytest.mark.parametrize("S, sigma, r", [(10000, 0.191, 0.0), (9800, 0.16, 0.01), (10300, 0.25, 0.0), (10000, 0.05, 0.0), (10000, 1.5, 0.0)])
+def test_round_trip_with_call_price(S, sigma, r):
+    price = call_price(S, T, r, sigma)
+    assert implied_vol(price, S, T, r) == pytest.approx(sigma, abs=1e-6)
+    assert implied_vol_array(price, S, T, r) == pytest.approx(sigma, abs=1e-6)
+
+
+def test_guess_far_from_the_root_still_converges():
+    price = call_price(10000, T, 0.0, 0.191)
+    for guess in (1e-3, 0.191, 3.9):
+        assert implied_vol(price, 10000, T, guess=guess) == pytest.approx(0.191, abs=1e-6)
+
+
+def test_price_below_intrinsic_or_above_spot_gives_nan():
+    S = 10500
+    intrinsic = S - 10000
+    assert math.isnan(implied_vol(intrinsic - 1, S, T))
+    assert math.isnan(implied_vol(intrinsic, S, T))
+    assert math.isnan(implied_vol(S, S, T))
+    assert math.isnan(implied_vol(0.0, 9000, T))
+    assert np.isnan(implied_vol_array([intrinsic - 1, intrinsic, S], S, T)).all()
+
+
+def test_root_outside_the_bracket_gives_nan():
+    price = call_price(10000, T, 0.0, pricing.VOL_HIGH * 1.5)
+    assert math.isnan(implied_vol(price, 10000, T))
+    assert math.isnan(implied_vol_array(price, 10000, T))
+
+
+def test_array_matches_scalar_and_broadcasts():
+    rng = np.random.default_rng(3)
+    S = rng.uniform(9500, 10500, size=200)
+    sigma = rng.uniform(0.1, 0.4, size=200)
+    prices = call_price_array(S, T, 0.0, sigma)
+    # A few no-arbitrage violations mixed in, left as NaN
+    prices[::50] = np.maximum(S[::50] - 10000, 0.0) - 1
+    ivs = implied_vol_array(prices, S, T)
+    expected = np.array([implied_vol(p, s, T) for p, s in zip(prices, S)])
+    assert ivs.shape == (200,)
+    np.testing.assert_array_equal(np.isnan(ivs), np.isnan(expected))
+    np.testing.assert_allclose(ivs[~np.isnan(ivs)], expected[~np.isnan(expected)], atol=1e-6)
+    np.testing.assert_allclose(ivs[1::50], sigma[1::50], atol=1e-6)
+
+    grid = implied_vol_array(prices[:3].reshape(3, 1), S[:3].reshape(3, 1), np.array([[T, T]]))
+    assert grid.shape == (3, 2)
+    np.testing.assert_allclose(grid[:, 0], grid[:, 1])
+
+
+def test_scalar_inputs_give_a_float():
+    assert isinstance(implied_vol_array(call_price(10000, T, 0.0, 0.2), 10000, T), float)
@@ -0,0 +1,86 @@
+import copy
+import pickle
+
+import pytest
+
+from datamodel import ConversionObservation, Listing, Observation, OrderDepth, Trade, TradingState
+
+jsonpickle = pytest.importorskip("jsonpickle")
+
+# jsonpickle.encode of an OrderDepth under the original datamodel (plain attributes, no __slots__)
+ORDER_DEPTH_JSON = '{"py/object": "datamodel.OrderDepth", "buy_orders": {"10": 3, "9": 5}, "sell_orders": {"11": -2, "12": -4}}'
+
+
+def make_depth() -> OrderDepth:
+    depth = OrderDepth()
+    depth.buy_orders = {10: 3, 9: 5}
+    depth.sell_orders = {11: -2, 12: -4}
+    return depth
+
+
+def test_order_depth_encodes_in_the_original_layout():
+    depth = make_depth()
+    depth.best_bid  # a filled level cache must not show up either
+    assert jsonpickle.encode(depth) == ORDER_DEPTH_JSON
+
+
+def test_order_depth_decodes_from_the_original_layout():
+    depth = jsonpickle.decode(ORDER_DEPTH_JSON)
+    assert isinstance(depth, OrderDepth)
+    # JSON object keys come back as strings, as they did before
+    assert dict(depth.buy_orders) == {"10": 3, "9": 5}
+    assert dict(depth.sell_orders) == {"11": -2, "12": -4}
+
+
+@pytest.mark.parametrize("clone", [lambda d: pickle.loads(pickle.dumps(d)), copy.deepcopy, copy.copy])
+def test_pickled_and_copied_depths_keep_sorted_sides(clone):
+    depth = make_depth()
+    depth.best_bid
+    other = clone(depth)
+    assert list(other.buy_orders.items()) == [(10, 3), (9, 5)]
+    assert other.best_bid == 10 and other.mid == 10.5
+    other.buy_orders[12] = 1
+    assert list(other.buy_orders) == [12, 10, 9]
+    assert other.best_bid == 12
+    assert depth.best_bid == 10
+
+
+# The same three outputs for make_state() under the original datamodel
+STATE_JSONPICKLE = '{"py/object": "datamodel.TradingState", "traderData": "{\\"k\\":1}", "timestamp": 1200, "listings": {"STARFRUIT": {"py/object": "datamodel.Listing", "symbol": "STARFRUIT", "product": "STARFRUIT", "denomination": "SEASHELLS"}}, "order_depths": {"STARFRUIT": {"py/object": "datamodel.OrderDepth", "buy_orders": {"10": 3, "9": 5}, "sell_orders": {"11": -2, "12": -4}}, "ORCHIDS": {"py/object": "datamodel.OrderDepth", "buy_orders": {}, "sell_orders": {"1100": -7}}}, "own_trades": {"STARFRUIT": [{"py/object": "datamodel.Trade", "symbol": "STARFRUIT", "price": 11, "quantity": 2, "buyer": "SUBMISSION", "seller": "Vinnie", "timestamp": 1100}]}, "market_trades": {"STARFRUIT": [{"py/object": "datamodel.Trade", "symbol": "STARFRUIT", "price": 10, "quantity": 1, "buyer": "Raj", "seller": "", "timestamp": 1100}]}, "position": {"STARFRUIT": 2}, "observations": {"py/object": "datamodel.Observation", "plainValueObservations": {"SOMETHING": 3}, "conversionObservations": {"ORCHIDS": {"py/object": "datamodel.ConversionObservation", "bidPrice": 1099.5, "askPrice": 1101.0, "transportFees": 1.5, "exportTariff": 9.0, "importTariff": -3.0, "sunlight": 2500.0, "humidity": 60.5}}}}'
+OBSERVATION_STR = '(plainValueObservations: {"SOMETHING": 3}, conversionObservations: {"ORCHIDS": {"py/object": "datamodel.ConversionObservation", "bidPrice": 1099.5, "askPrice": 1101.0, "transportFees": 1.5, "exportTariff": 9.0, "importTariff": -3.0, "sunlight": 2500.0, "humidity": 60.5}})'
+STATE_TOJSON = '{"listings": {"STARFRUIT": {"denomination": "SEASHELLS", "product": "STARFRUIT", "symbol": "STARFRUIT"}}, "market_trades": {"STARFRUIT": [{"buyer": "Raj", "price": 10, "quantity": 1, "seller": "", "symbol": "STARFRUIT", "timestamp": 1100}]}, "observations": {"conversionObservations": {"ORCHIDS": {"askPrice": 1101.0, "bidPrice": 1099.5, "exportTariff": 9.0, "humidity": 60.5, "importTariff": -3.0, "sunlight": 2500.0, "transportFees": 1.5}}, "plainValueObservations": {"SOMETHING": 3}}, "order_depths": {"ORCHIDS": {"buy_orders": {}, "sell_orders": {"1100": -7}}, "STARFRUIT": {"buy_orders": {"9": 5, "10": 3}, "sell_orders": {"11": -2, "12": -4}}}, "own_trades": {"STARFRUIT": [{"buyer": "SUBMISSION", "price": 11, "quantity": 2, "seller": "Vinnie", "symbol": "STARFRUIT", "timestamp": 1100}]}, "position": {"STARFRUIT": 2}, "timestamp": 1200, "traderData": "{\\"k\\":1}"}'
+
+
+def make_state() -> TradingState:
+    one_sided = OrderDepth()
+    one_sided.sell_orders = {1100: -7}
+    return TradingState(
+        '{"k":1}',
+        1200,
+        {"STARFRUIT": Listing("STARFRUIT", "STARFRUIT", "SEASHELLS")},
+        {"STARFRUIT": make_depth(), "ORCHIDS": one_sided},
+        {"STARFRUIT": [Trade("STARFRUIT", 11, 2, "SUBMISSION", "Vinnie", 1100)]},
+        {"STARFRUIT": [Trade("STARFRUIT", 10, 1, "Raj", "", 1100)]},
+        {"STARFRUIT": 2},
+        Observation({"SOMETHING": 3}, {"ORCHIDS": ConversionObservation(1099.5, 1101.0, 1.5, 9.0, -3.0, 2500.0, 60.5)}),
+    )
+
+
+def test_trading_state_encodes_as_before_slots():
+    assert jsonpickle.encode(make_state()) == STATE_JSONPICKLE
+
+
+def test_observation_str_and_to_json_as_before_slots():
+    state = make_state()
+    assert str(state.observations) == OBSERVATION_STR
+    assert state.toJSON() == STATE_TOJSON
+
+
+def test_trading_state_decodes_from_the_original_text():
+    state = jsonpickle.decode(STATE_JSONPICKLE)
+    assert isinstance(state, TradingState)
+    assert state.timestamp == 1200 and state.position == {"STARFRUIT": 2}
+    assert isinstance(state.listings["STARFRUIT"], Listing) and state.listings["STARFRUIT"].denomination == "SEASHELLS"
+    assert [(t.buyer, t.seller, t.price) for t in state.own_trades["STARFRUIT"]] == [("SUBMISSION", "Vinnie", 11)]
+    assert state.observations.conversionObservations["ORCHIDS"].sunlight == 2500.0
+    assert dict(state.order_depths["ORCHIDS"].sell_orders) == {"1100": -7}
@@ -0,0 +1,41 @@
+import math
+import sys
+
+import pytest
+
+from lazy_import import is_loaded, lazy
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    """Name of a module, not yet imported, that counts its executions in sys.executed."""
+    (tmp_path / "lazy_probe.py").write_text("import sys\nsys.executed = getattr(sys, 'executed', 0) + 1\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "executed", 0, raising=False)
+    yield "lazy_probe"
+    sys.modules.pop("lazy_probe", None)
+
+
+def test_module_loads_on_first_attribute_access(probe):
+    module = lazy(probe)
+    assert sys.modules[probe] is module
+    assert sys.executed == 0
+    # asking does not wake it
+    assert not is_loaded(module) and not is_loaded(module)
+    assert sys.executed == 0
+    assert module.VALUE == 42
+    assert sys.executed == 1 and is_loaded(module)
+    assert module.VALUE == 42 and sys.executed == 1
+
+
+def test_imported_modules_are_loaded(probe):
+    assert is_loaded(math)
+    assert lazy("math") is math
+    module = lazy(probe)
+    module.VALUE
+    assert lazy(probe) is module and is_loaded(module)
+
+
+def test_missing_module():
+    with pytest.raises(ModuleNotFoundError):
+        lazy("no_such_module_anywhere")
@@ -0,0 +1,104 @@
+import json
+
+import log_parser
+from datamodel import ConversionObservation, Observation, Order, OrderDepth, Trade, TradingState
+from logger import DeltaLogger, Logger
+
+LISTINGS = {"STARFRUIT": {"symbol": "STARFRUIT", "product": "STARFRUIT", "denomination": "SEASHELLS"}}
+
+
+def make_state(i: int) -> TradingState:
+    depth = OrderDepth()
+    depth.buy_orders = {10 - i: 3} if i != 1 else {}
+    depth.sell_orders = {12: -4, 13: -1}
+    return TradingState(
+        '{"t":%d}' % (i - 1) if i else "",
+        i * 100,
+        LISTINGS,
+        {"STARFRUIT": depth},
+        {"STARFRUIT": [Trade("STARFRUIT", 12, 1, "SUBMISSION", "", i * 100 - 100)]} if i else {},
+        {"STARFRUIT": [Trade("STARFRUIT", 11, 2, "Vinnie", "Raj", i * 100)]},
+        {"STARFRUIT": i},
+        Observation({}, {"ORCHIDS": ConversionObservation(1099.5, 1101.0, 1.5, 9.0, -3.0, 2500.0, 60.5)}),
+    )
+
+
+def orders_for(i: int) -> dict:
+    return {"STARFRUIT": [Order("STARFRUIT", 12, 1)]} if i % 2 else {}
+
+
+def flush_lines(capsys, logger) -> list:
+    for i in range(3):
+        logger.print("tick", i)
+        logger.flush(make_state(i), orders_for(i), 0, '{"t":%d}' % i)
+    return capsys.readouterr().out.splitlines()
+
+
+def check(ticks):
+    assert len(ticks) == 3
+    for i, tick in enumerate(ticks):
+        state = tick.state
+        assert state.timestamp == i * 100
+        assert state.traderData == ('{"t":%d}' % (i - 1) if i else "")
+        depth = state.order_depths["STARFRUIT"]
+        assert dict(depth.buy_orders) == ({10 - i: 3} if i != 1 else {})
+        assert list(depth.sell_orders.items()) == [(12, -4), (13, -1)]
+        assert state.position == {"STARFRUIT": i}
+        assert [(t.price, t.buyer, t.seller) for t in state.market_trades["STARFRUIT"]] == [(11, "Vinnie", "Raj")]
+        assert state.observations.conversionObservations["ORCHIDS"].sunlight == 2500.0
+        assert [(o.price, o.quantity) for rows in tick.orders.values() for o in rows] == ([(12, 1)] if i % 2 else [])
+        assert tick.trader_data == '{"t":%d}' % i
+        assert tick.logs == "tick %d\n" % i
+
+
+def test_plain_flush_lines(capsys):
+    check(list(log_parser.parse_lines(flush_lines(capsys, Logger()))))
+
+
+def test_delta_lines(capsys):
+    check(list(log_parser.parse_lines(flush_lines(capsys, DeltaLogger()))))
+
+
+def test_sandbox_log_download(capsys, tmp_path):
+    lines = flush_lines(capsys, Logger())
+    text = ["Sandbox logs:"]
+    for i, line in enumerate(lines):
+        text.append(json.dumps({"sandboxLog": "note %d" % i, "lambdaLog": "printed by the trader\n" + line, "timestamp": i * 100}, indent=2))
+    text += ["", "", "Activities log:", "day;timestamp;product", "[[not a flush line]]"]
+    path = tmp_path / "submission.log"
+    path.write_text("\n".join(text) + "\n")
+    ticks = list(log_parser.parse(str(path)))
+    check(ticks)
+    assert [tick.sandbox_log for tick in ticks] == ["note 0", "note 1", "note 2"]
+
+
+def test_no_flush_lines():
+    assert list(log_parser.parse_lines(["hello", "Sandbox logs:"])) == []
+
+
+def always_buys(tmp_path) -> str:
+    trader = tmp_path / "always_buys.py"
+    trader.write_text(
+        "from datamodel import Order\n"
+        "class Trader:\n"
+        "    def run(self, state):\n"
+        "        assert state.traderData == ('{\"t\":%d}' % (state.timestamp // 100 - 1) if state.timestamp else '')\n"
+        "        return {'STARFRUIT': [Order('STARFRUIT', 12, 1)]}, 0, '{\"t\":%d}' % (state.timestamp // 100)\n"
+    )
+    return str(trader)
+
+
+def test_replay_reports_mismatched_ticks(capsys, tmp_path):
+    ticks = list(log_parser.parse_lines(flush_lines(capsys, Logger())))
+    diff = log_parser.replay(always_buys(tmp_path), ticks)
+    assert diff.ticks == 3 and diff.errors == 0
+    assert diff.mismatch_count == 2
+    assert [m[0] for m in diff.mismatches] == [0, 200]
+
+
+def test_replay_keeps_only_the_first_mismatches(capsys, tmp_path):
+    ticks = list(log_parser.parse_lines(flush_lines(capsys, Logger())))
+    diff = log_parser.replay(always_buys(tmp_path), ticks, keep=1)
+    assert diff.mismatch_count == 2
+    assert [m[0] for m in diff.mismatches] == [0]
+    assert log_parser.replay(always_buys(tmp_path), ticks, keep=0).mismatches == []
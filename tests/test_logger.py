@@ -0,0 +1,159 @@
+import json
+from typing import Any
+
+import pytest
+
+from datamodel import ConversionObservation, Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
+from logger import Logger
+
+
+class OriginalLogger:
+    """The Logger the trader files carried before logger.py, verbatim: two full to_json passes per flush."""
+
+    def __init__(self) -> None:
+        self.logs = ""
+        self.max_log_length = 3750
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
+        self.logs += sep.join(map(str, objects)) + end
+
+    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
+        base_length = len(self.to_json([
+            self.compress_state(state, ""),
+            self.compress_orders(orders),
+            conversions,
+            "",
+            "",
+        ]))
+
+        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
+        max_item_length = (self.max_log_length - base_length) // 3
+
+        print(self.to_json([
+            self.compress_state(state, self.truncate(state.traderData, max_item_length)),
+            self.compress_orders(orders),
+            conversions,
+            self.truncate(trader_data, max_item_length),
+            self.truncate(self.logs, max_item_length),
+        ]))
+
+        self.logs = ""
+
+    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
+        return [
+            state.timestamp,
+            trader_data,
+            self.compress_listings(state.listings),
+            self.compress_order_depths(state.order_depths),
+            self.compress_trades(state.own_trades),
+            self.compress_trades(state.market_trades),
+            state.position,
+            self.compress_observations(state.observations),
+        ]
+
+    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[list[Any]]:
+        compressed = []
+        for listing in listings.values():
+            compressed.append([listing["symbol"], listing["product"], listing["denomination"]])
+
+        return compressed
+
+    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
+        compressed = {}
+        for symbol, order_depth in order_depths.items():
+            compressed[symbol] = [order_depth.buy_orders, order_depth.sell_orders]
+
+        return compressed
+
+    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
+        compressed = []
+        for arr in trades.values():
+            for trade in arr:
+                compressed.append([
+                    trade.symbol,
+                    trade.price,
+                    trade.quantity,
+                    trade.buyer,
+                    trade.seller,
+                    trade.timestamp,
+                ])
+
+        return compressed
+
+    def compress_observations(self, observations: Observation) -> list[Any]:
+        conversion_observations = {}
+        for product, observation in observations.conversionObservations.items():
+            conversion_observations[product] = [
+                observation.bidPrice,
+                observation.askPrice,
+                observation.transportFees,
+                observation.exportTariff,
+                observation.importTariff,
+                observation.sunlight,
+                observation.humidity,
+            ]
+
+        return [observations.plainValueObservations, conversion_observations]
+
+    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[list[Any]]:
+        compressed = []
+        for arr in orders.values():
+            for order in arr:
+                compressed.append([order.symbol, order.price, order.quantity])
+
+        return compressed
+
+    def to_json(self, value: Any) -> str:
+        return json.dumps(value, cls=ProsperityEncoder, separators=(",", ":"))
+
+    def truncate(self, value: str, max_length: int) -> str:
+        if len(value) <= max_length:
+            return value
+
+        return value[:max_length - 3] + "..."
+
+
+LISTINGS = {symbol: {"symbol": symbol, "product": symbol, "denomination": "SEASHELLS"} for symbol in ("STARFRUIT", "ORCHIDS")}
+
+
+def make_state(timestamp: int, trader_data: str, books: bool = True) -> TradingState:
+    depths = {}
+    if books:
+        depth = OrderDepth()
+        depth.buy_orders = {10: 3, 9: 5}
+        depth.sell_orders = {12: -4}
+        depths["STARFRUIT"] = depth
+    return TradingState(
+        trader_data,
+        timestamp,
+        LISTINGS if books else {},
+        depths,
+        {"STARFRUIT": [Trade("STARFRUIT", 10, 1, "SUBMISSION", "", timestamp - 100)]} if books else {},
+        {"STARFRUIT": [Trade("STARFRUIT", 11, 2, "Vinnie", "Raj", timestamp)]} if books else {},
+        {"STARFRUIT": -3} if books else {},
+        Observation({"X": 1}, {"ORCHIDS": ConversionObservation(1099.5, 1101.0, 1.5, 9.0, -3.0, 2500.0, 60.5)}) if books else Observation({}, {}),
+    )
+
+
+# (timestamp, state.traderData, trader_data out, printed text, with books): empty, short and truncated strings,
+# and ones whose JSON escapes make them longer than they count for the truncation
+CASES = [
+    (0, "", "", "", True),
+    (100, '{"t":1}', '{"t":2}', "tick 1\n", True),
+    (999900, "x" * 5000, "y" * 5000, "z" * 5000, True),
+    (200, 'quote " and \\ backslash\n' * 300, "tab\t" * 900, "ünïcødé ✓ " * 400, True),
+    (300, "", "", "", False),
+    (400, "a" * 1200, "", "b" * 2000, False),
+]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[str(i) for i in range(len(CASES))])
+def test_flush_prints_the_original_bytes(case, capsys):
+    timestamp, state_data, trader_data, text, books = case
+    orders = {"STARFRUIT": [Order("STARFRUIT", 10, 2), Order("STARFRUIT", 12, -1)]} if books else {}
+    lines = []
+    for logger in (OriginalLogger(), Logger()):
+        logger.print(text, end="")
+        logger.flush(make_state(timestamp, state_data, books), orders, timestamp // 100, trader_data)
+        lines.append(capsys.readouterr().out)
+    assert lines[0] == lines[1]
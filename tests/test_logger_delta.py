@@ -0,0 +1,99 @@
+from datamodel import ConversionObservation, Observation, Order, OrderDepth, Trade, TradingState
+from logger import DeltaLogger, decode_delta
+
+LISTINGS = {symbol: {"symbol": symbol, "product": symbol, "denomination": "SEASHELLS"} for symbol in ("STARFRUIT", "ORCHIDS")}
+
+
+def depth(buy_orders, sell_orders) -> OrderDepth:
+    d = OrderDepth()
+    d.buy_orders = buy_orders
+    d.sell_orders = sell_orders
+    return d
+
+
+def states(trader_data_out):
+    """Five ticks whose books, positions and observations change in the ways the delta format handles."""
+    books = [
+        {"STARFRUIT": ({10: 3, 9: 5}, {12: -4}), "ORCHIDS": ({1099: 2}, {1101: -2})},
+        {"STARFRUIT": ({10: 1, 9: 5}, {12: -4}), "ORCHIDS": ({1099: 2}, {1101: -2})},
+        {"STARFRUIT": ({}, {12: -4, 13: -1}), "ORCHIDS": ({1099: 2}, {1101: -2})},
+        {"ORCHIDS": ({1098: 2}, {1101: -2}), "STARFRUIT": ({8: 1}, {12: -4})},
+        {"STARFRUIT": ({8: 1}, {12: -4})},
+    ]
+    positions = [{}, {"STARFRUIT": 1}, {"STARFRUIT": 1}, {"STARFRUIT": 1, "ORCHIDS": -2}, {"ORCHIDS": -2}]
+    for i, (book, position) in enumerate(zip(books, positions)):
+        timestamp = i * 100
+        yield TradingState(
+            trader_data_out[i - 1] if i else "",
+            timestamp,
+            LISTINGS,
+            {symbol: depth(*sides) for symbol, sides in book.items()},
+            {"STARFRUIT": [Trade("STARFRUIT", 10, 1, "SUBMISSION", "", timestamp - 100)]} if i == 2 else {},
+            {"STARFRUIT": [Trade("STARFRUIT", 11, 2, "Vinnie", "Raj", timestamp)]},
+            position,
+            Observation({}, {"ORCHIDS": ConversionObservation(1099.5 + i, 1101.0, 1.5, 9.0, -3.0, 2500.0, 60.5)} if "ORCHIDS" in book else {}),
+        )
+
+
+def snapshot(state: TradingState) -> list:
+    return [
+        state.traderData,
+        state.timestamp,
+        {s: (list(d.buy_orders.items()), list(d.sell_orders.items())) for s, d in state.order_depths.items()},
+        {k: [vars(t) for t in rows] for k, rows in state.own_trades.items() if rows},
+        {k: [vars(t) for t in rows] for k, rows in state.market_trades.items() if rows},
+        state.position,
+        {k: vars(o) for k, o in state.observations.conversionObservations.items()},
+    ]
+
+
+def log(capsys, keyframe_every):
+    logger = DeltaLogger(keyframe_every=keyframe_every)
+    trader_data_out = ['{"t":%d}' % i for i in range(5)]
+    printed = []
+    for i, state in enumerate(states(trader_data_out)):
+        logger.print("tick", i)
+        logger.flush(state, {"STARFRUIT": [Order("STARFRUIT", 10, i)]}, i, trader_data_out[i])
+        printed.append(snapshot(state))
+    return capsys.readouterr().out.splitlines(), printed, trader_data_out
+
+
+def test_decode_delta_rebuilds_every_tick(capsys):
+    lines, printed, trader_data_out = log(capsys, keyframe_every=100)
+    assert lines[0].startswith("[1,") and all(line.startswith("[0,") for line in lines[1:])
+    decoded = list(decode_delta(lines))
+    assert [snapshot(state) for state, *_ in decoded] == printed
+    for i, (state, orders, conversions, trader_data, logs) in enumerate(decoded):
+        assert [(o.symbol, o.price, o.quantity) for o in orders["STARFRUIT"]] == [("STARFRUIT", 10, i)]
+        assert conversions == i
+        assert trader_data == trader_data_out[i]
+        assert logs == "tick %d\n" % i
+
+
+def test_decode_delta_with_keyframes_between(capsys):
+    lines, printed, _ = log(capsys, keyframe_every=2)
+    assert [line[:3] for line in lines] == ["[1,", "[0,", "[1,", "[0,", "[1,"]
+    assert [snapshot(state) for state, *_ in decode_delta(lines)] == printed
+
+
+def test_decode_delta_resumes_at_the_next_keyframe(capsys):
+    lines, printed, _ = log(capsys, keyframe_every=2)
+    noise = ["not a log line"]
+    assert [snapshot(state) for state, *_ in decode_delta(noise + lines[1:])] == printed[2:]
+
+
+def test_empty_book_side_survives(capsys):
+    lines, _, _ = log(capsys, keyframe_every=100)
+    state = list(decode_delta(lines))[2][0]
+    assert dict(state.order_depths["STARFRUIT"].buy_orders) == {}
+    assert state.order_depths["STARFRUIT"].best_bid is None
+
+
+def test_side_emptied_while_the_other_stays(capsys):
+    logger = DeltaLogger()
+    books = [({10: 3}, {12: -4}), ({}, {12: -4}), ({}, {12: -4})]
+    for i, (buy_orders, sell_orders) in enumerate(books):
+        state = TradingState("", i * 100, LISTINGS, {"STARFRUIT": depth(buy_orders, sell_orders)}, {}, {}, {}, Observation({}, {}))
+        logger.flush(state, {}, 0, "")
+    decoded = [state.order_depths["STARFRUIT"] for state, *_ in decode_delta(capsys.readouterr().out.splitlines())]
+    assert [(dict(d.buy_orders), dict(d.sell_orders)) for d in decoded] == books
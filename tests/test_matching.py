@@ -0,0 +1,53 @@
+from matching import BOOK, match_orders, within_limit
+
+
+def match(prices, quantities, bids=((), ()), asks=((), ()), trades=((), ()), position=0, limit=20):
+    trade_volumes = list(trades[1])
+    fills = match_orders(list(prices), list(quantities), list(bids[0]), list(bids[1]), list(asks[0]), list(asks[1]),
+                         list(trades[0]), trade_volumes, position, limit)
+    return fills, trade_volumes
+
+
+def test_within_limit_counts_all_buys_and_all_sells_separately():
+    assert within_limit([5, -5], 15, 20)
+    assert not within_limit([6, -1], 15, 20)
+    assert not within_limit([1, -6], -15, 20)
+    assert within_limit([], 20, 20)
+
+
+def test_limit_breach_rejects_every_order_for_the_product():
+    fills, trade_volumes = match([10, 12], [5, 6], asks=([10], [50]), trades=([9], [3]), position=10)
+    assert fills is None
+    assert trade_volumes == [3]
+
+
+def test_buy_walks_the_asks_up_to_its_price():
+    fills, _ = match([11], [8], asks=([10, 11, 12], [3, 4, 5]))
+    assert fills == [(10, 3, BOOK), (11, 4, BOOK)]
+
+
+def test_sell_walks_the_bids_down_to_its_price():
+    fills, _ = match([9], [-8], bids=([10, 9, 8], [3, 4, 5]))
+    assert fills == [(10, -3, BOOK), (9, -4, BOOK)]
+
+
+def test_empty_book_side_falls_through_to_market_trades():
+    fills, trade_volumes = match([10], [5], bids=([9], [4]), trades=([11, 10, 9], [2, 2, 2]))
+    assert fills == [(10, 2, 1), (10, 2, 2)]
+    assert trade_volumes == [2, 0, 0]
+
+
+def test_empty_book_and_no_trades_fill_nothing():
+    fills, _ = match([10, 10], [5, -5])
+    assert fills == []
+
+
+def test_orders_share_the_book_in_turn():
+    fills, _ = match([10, 10], [3, 3], asks=([10], [4]))
+    assert fills == [(10, 3, BOOK), (10, 1, BOOK)]
+
+
+def test_book_lists_are_left_untouched():
+    ask_volumes = [4]
+    match_orders([10], [3], [], [], [10], ask_volumes, [], [], 0, 20)
+    assert ask_volumes == [4]
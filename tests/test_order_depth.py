@@ -0,0 +1,97 @@
+import pytest
+
+from datamodel import OrderDepth
+
+
+def make_depth() -> OrderDepth:
+    depth = OrderDepth()
+    depth.buy_orders = {9: 5, 10: 3}
+    depth.sell_orders = {12: -4, 11: -2}
+    return depth
+
+
+def levels(depth: OrderDepth) -> tuple:
+    return depth.bid_prices, depth.bid_volumes, depth.ask_prices, depth.ask_volumes
+
+
+def expected(buy_orders: dict, sell_orders: dict) -> tuple:
+    """The levels a freshly built OrderDepth has for these sides."""
+    fresh = OrderDepth()
+    fresh.buy_orders = buy_orders
+    fresh.sell_orders = sell_orders
+    return levels(fresh)
+
+
+def test_assigned_sides_are_sorted_best_first():
+    depth = make_depth()
+    assert list(depth.buy_orders) == [10, 9]
+    assert list(depth.sell_orders) == [11, 12]
+    assert levels(depth) == ([10, 9], [3, 5], [11, 12], [-2, -4])
+    assert depth.best_bid == 10 and depth.best_ask == 11 and depth.mid == 10.5
+    assert depth.bid_depth == [3, 8] and depth.ask_depth == [2, 6]
+
+
+# Each in-place edit, applied after the level cache has been filled; the levels must follow it
+MUTATIONS = {
+    "setitem new best": lambda b, s: b.__setitem__(11, 1),
+    "setitem new worst": lambda b, s: s.__setitem__(13, -1),
+    "setitem volume": lambda b, s: b.__setitem__(10, 7),
+    "delitem": lambda b, s: b.__delitem__(10),
+    "pop": lambda b, s: s.pop(11),
+    "pop missing with default": lambda b, s: s.pop(99, None),
+    "popitem": lambda b, s: s.popitem(),
+    "clear": lambda b, s: b.clear(),
+    "setdefault new": lambda b, s: b.setdefault(10.5, 4),
+    "setdefault existing": lambda b, s: b.setdefault(10, 99),
+    "update": lambda b, s: s.update({10.5: -1, 12: -9}),
+    "update from pairs": lambda b, s: b.update([(8, 1), (11, 2)]),
+    "ior": lambda b, s: s.__ior__({10.5: -6}),
+}
+
+
+@pytest.mark.parametrize("mutate", MUTATIONS.values(), ids=MUTATIONS.keys())
+def test_in_place_edits_refresh_the_levels(mutate):
+    depth = make_depth()
+    levels(depth)
+    mutate(depth.buy_orders, depth.sell_orders)
+    buy_orders, sell_orders = dict(depth.buy_orders), dict(depth.sell_orders)
+    assert list(buy_orders) == sorted(buy_orders, reverse=True)
+    assert list(sell_orders) == sorted(sell_orders)
+    bids, bid_volumes, asks, ask_volumes = expected(buy_orders, sell_orders)
+    assert levels(depth) == (bids, bid_volumes, asks, ask_volumes)
+    assert depth.best_bid == (bids[0] if bids else None)
+    assert depth.best_ask == (asks[0] if asks else None)
+
+
+def test_ior_operator_on_the_side():
+    depth = make_depth()
+    levels(depth)
+    side = depth.sell_orders
+    side |= {10.5: -6}
+    assert depth.best_ask == 10.5
+    assert depth.ask_prices == [10.5, 11, 12]
+
+
+def test_reassigning_a_side_refreshes_the_levels():
+    depth = make_depth()
+    levels(depth)
+    depth.buy_orders = {7: 1}
+    assert depth.best_bid == 7 and depth.mid == 9.0
+
+
+def test_empty_side():
+    depth = make_depth()
+    depth.buy_orders.clear()
+    assert depth.best_bid is None and depth.mid is None
+    assert depth.best_bid_volume == 0 and depth.worst_bid is None
+    assert depth.vwap_to_size(-5) is None
+    assert depth.best_ask == 11
+
+
+def test_copies_of_a_side_are_plain_and_detached():
+    depth = make_depth()
+    levels(depth)
+    copy = depth.buy_orders.copy()
+    assert type(copy) is dict
+    copy[20] = 1
+    assert depth.best_bid == 10
@@ -0,0 +1,58 @@
+import backtester
+import profiler
+
+BOOKS = {t: {"STARFRUIT": ([(5000, 10)], [(5003, 10)])} for t in range(0, 500, 100)}
+
+TRADER = '''
+import time
+
+
+def spin(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+class Trader:
+
+    def inner(self):
+        spin(2)
+
+    def outer(self):
+        self.inner()
+        self.inner()
+
+    def run(self, state):
+        self.outer()
+        spin(1)
+        return {}, 0, ""
+'''
+
+
+def run_profile(make_day, monkeypatch, tmp_path) -> profiler.Profile:
+    path = tmp_path / "nested_trader.py"
+    path.write_text(TRADER)
+    monkeypatch.setattr(backtester, "load_days", lambda rounds, days=None: [make_day(BOOKS)])
+    return profiler.profile(str(path), [1])
+
+
+def test_nested_calls_are_charged_once(make_day, monkeypatch, tmp_path):
+    report = run_profile(make_day, monkeypatch, tmp_path)
+    inner, outer, spin = report.methods["inner"], report.methods["outer"], report.methods["spin"]
+    assert (inner.calls, outer.calls, spin.calls) == (10, 5, 15)
+    # outer only calls inner, and inner only calls spin: their own time is the wrappers' overhead
+    assert outer.total_ns < outer.inclusive_ns / 10
+    assert inner.total_ns < inner.inclusive_ns / 10
+    assert outer.inclusive_ns >= inner.inclusive_ns >= 20e6
+    assert spin.total_ns == spin.inclusive_ns >= 25e6
+    assert sum(stats.total_ns for stats in report.methods.values()) <= sum(report.run_ns)
+    assert all(sum(stats.tick_ns[i] for stats in report.methods.values()) <= ns for i, ns in enumerate(report.run_ns))
+
+
+def test_report_shares_add_up_to_at_most_run(make_day, monkeypatch, tmp_path):
+    lines = run_profile(make_day, monkeypatch, tmp_path).report().splitlines()
+    header = lines.index(next(line for line in lines if line.startswith("method")))
+    assert "self ms" in lines[header] and "incl ms" in lines[header]
+    rows = lines[header + 1:lines.index("", header)]
+    assert {row.split()[0] for row in rows} == {"inner", "outer", "spin"}
+    assert sum(float(row.split()[-1].rstrip("%")) for row in rows) <= 100.0
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+import backtester
+from batch import TradingStateBatch
+
+R4 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trader_final_r4.py")
+
+
+@pytest.fixture(scope="module")
+def day():
+    return backtester.load_day(1, 0)
+
+
+def per_tick_and_batch(day, **settings):
+    """(timestamp, calc_next_price_starfruit, run_batch signal) of every tick with a full window."""
+    module = backtester.load_trader_module(R4)
+    for name, value in settings.items():
+        setattr(module.Trader, name, value)
+    trader = module.Trader()
+    trader.run_batch(TradingStateBatch.from_day(day))
+    cache = module.Trader.starfruit_cache = module.RingBuffer(trader.starfruit_dim)
+    pairs = []
+    for timestamp, books in zip(day.timestamps, day.books):
+        # The mid run() appends: best bid and best ask of the book it is handed
+        buy_orders, sell_orders = books["STARFRUIT"]
+        cache.append((next(iter(buy_orders)) + next(iter(sell_orders))) / 2)
+        if len(cache) == trader.starfruit_dim:
+            pairs.append((timestamp, trader.calc_next_price_starfruit(), trader.signal("starfruit_next_price", timestamp)))
+    return pairs
+
+
+def test_batch_signal_matches_per_tick(day):
+    pairs = per_tick_and_batch(day)
+    assert len(pairs) == len(day.timestamps) - 3
+    assert [p[1] for p in pairs] == [p[2] for p in pairs]
+
+
+def test_batch_follows_starfruit_dim(day):
+    pairs = per_tick_and_batch(day, starfruit_dim=3, starfruit_coeff=[0.3, 0.3, 0.4], starfruit_intercept=0.0)
+    assert len(pairs) == len(day.timestamps) - 2
+    assert [p[1] for p in pairs] == [p[2] for p in pairs]
+
+
+def test_coefficients_that_do_not_fit_starfruit_dim_fail_loudly(day):
+    module = backtester.load_trader_module(R4)
+    module.Trader.starfruit_dim = 5
+    with pytest.raises(ValueError):
+        module.Trader().run_batch(TradingStateBatch.from_day(day))
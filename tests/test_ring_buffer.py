@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from ring_buffer import RingBuffer
+
+
+def test_window_shorter_than_capacity():
+    buf = RingBuffer(10, [3.0, 1.0, 2.0])
+    assert len(buf) == 3 and not buf.full
+    assert list(buf) == [3.0, 1.0, 2.0]
+    assert buf.mean() == pytest.approx(2.0)
+    assert buf.std() == pytest.approx(np.std([3.0, 1.0, 2.0]))
+    assert buf.min() == 1.0 and buf.max() == 3.0
+    assert buf.tail_mean(2) == pytest.approx(1.5)
+    assert buf.tail_mean(50) == pytest.approx(2.0)
+    assert buf[0] == 3.0 and buf[-1] == 2.0
+
+
+def test_statistics_follow_numpy_over_a_long_stream():
+    rng = random.Random(7)
+    buf = RingBuffer(25)
+    window = []
+    for i in range(1000):
+        # Mids in the thousands with small moves, as the caches see
+        x = 10000 + round(rng.gauss(0, 30), 1)
+        buf.append(x)
+        window = (window + [x])[-25:]
+        if i % 37 == 1 or i > 990:
+            assert list(buf) == window
+            assert buf.mean() == pytest.approx(np.mean(window), abs=1e-9)
+            assert buf.std() == pytest.approx(np.std(window), rel=1e-9)
+            assert buf.min() == min(window) and buf.max() == max(window)
+            assert buf.tail_mean(5) == pytest.approx(np.mean(window[-5:]), abs=1e-9)
+            assert buf.zscore() == pytest.approx((x - np.mean(window)) / np.std(window), rel=1e-6)
+
+
+def test_flat_window_has_zero_std_and_zscore():
+    buf = RingBuffer(3, [5.0, 5.0, 1e6])
+    for _ in range(3):
+        buf.append(1e6)
+    assert buf.var() == 0.0
+    assert buf.zscore() == 0.0
+
+
+def test_capacity_one():
+    buf = RingBuffer(1, [1.0, 2.0, 3.0])
+    assert list(buf) == [3.0]
+    assert buf.mean() == 3.0 and buf.std() == 0.0 and buf.tail_mean(3) == 3.0
+
+
+def test_empty_buffer():
+    buf = RingBuffer(4)
+    assert not buf
+    for stat in (buf.mean, buf.var, buf.min, buf.max):
+        with pytest.raises(ValueError):
+            stat()
+    with pytest.raises(IndexError):
+        buf[0]
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_clear():
+    buf = RingBuffer(3, [1.0, 2.0, 3.0, 4.0])
+    buf.clear()
+    assert len(buf) == 0 and buf.capacity == 3
+    buf.append(7.0)
+    assert buf.mean() == 7.0 and buf.min() == buf.max() == 7.0
+
+
+def test_dump_and_load():
+    buf = RingBuffer(4, [1.04, 2.0, 3.0, 4.0, 5.0, 6.26])
+    assert buf.dump() == [4, 3.0, 4.0, 5.0, 6.26]
+    assert buf.dump(digits=1) == [4, 3.0, 4.0, 5.0, 6.3]
+    loaded = RingBuffer.load(buf.dump())
+    assert loaded.capacity == 4 and list(loaded) == list(buf)
+    assert loaded.mean() == pytest.approx(buf.mean())
+    partial = RingBuffer.load([10, 1.0, 2.0])
+    assert partial.capacity == 10 and list(partial) == [1.0, 2.0]
@@ -0,0 +1,81 @@
+import json
+import random
+
+import pytest
+
+from rls import ARPredictor
+
+COEFF = [0.18895127, 0.20771801, 0.26114406, 0.34171985]
+INTERCEPT = 2.3552758852292754
+
+
+def offline(window):
+    return INTERCEPT + sum(c * p for c, p in zip(COEFF, window))
+
+
+def test_window_shorter_than_k_predicts_nothing():
+    ar = ARPredictor(COEFF, INTERCEPT)
+    for mid in (5000.0, 5001.0, 5002.5):
+        ar.update(mid)
+        assert ar.predict() is None
+    assert ar.coeff == COEFF and ar.intercept == INTERCEPT
+
+
+def test_first_prediction_is_the_offline_fit():
+    ar = ARPredictor(COEFF, INTERCEPT)
+    window = [5000.0, 5001.0, 5002.5, 5001.5]
+    for mid in window:
+        ar.update(mid)
+    assert ar.predict() == pytest.approx(offline(window), abs=1e-9)
+    assert ar.coeff == pytest.approx(COEFF) and ar.intercept == pytest.approx(INTERCEPT)
+
+
+def test_fit_moves_to_the_process_generating_the_mids():
+    rng = random.Random(11)
+    true_coeff, true_intercept = [0.1, 0.2, 0.3, 0.4], 0.0
+    mids = [5000.0 + rng.gauss(0, 2) for _ in range(4)]
+    for _ in range(6000):
+        mids.append(true_intercept + sum(c * p for c, p in zip(true_coeff, mids[-4:])) + rng.gauss(0, 1))
+    ar = ARPredictor([0.0, 0.0, 0.0, 1.0], forgetting=0.9995)
+    for mid in mids:
+        ar.update(mid)
+    assert ar.coeff == pytest.approx(true_coeff, abs=0.05)
+
+
+def test_covariance_trace_is_capped():
+    ar = ARPredictor(COEFF, INTERCEPT, forgetting=0.99, max_trace=1.0)
+    for _ in range(5000):
+        ar.update(5000.0)
+    trace = sum(ar.P[i][i] for i in range(ar.k + 1))
+    assert trace < 1.0 / 0.99 + 1e-9
+
+
+def test_dump_is_rounded_and_reloads_into_the_same_fit():
+    rng = random.Random(5)
+    mids = [5000 + round(rng.gauss(0, 3)) / 2 for _ in range(300)]
+    ar = ARPredictor(COEFF, INTERCEPT)
+    for mid in mids[:200]:
+        ar.update(mid)
+    data = json.loads(json.dumps(ar.dump()))
+    v, upper, window, ref = data
+    assert len(upper) == (ar.k + 1) * (ar.k + 2) // 2
+    assert all(len(repr(x)) <= 17 for x in v + upper)
+    assert window == ar.window and ref == ar.ref
+
+    loaded = ARPredictor(COEFF, INTERCEPT).load_state(data)
+    for row in range(ar.k + 1):
+        assert loaded.P[row] == pytest.approx(ar.P[row], rel=1e-5, abs=1e-15)
+        assert [loaded.P[col][row] for col in range(ar.k + 1)] == loaded.P[row]
+    for mid in mids[200:]:
+        ar.update(mid)
+        loaded.update(mid)
+        assert loaded.predict() == pytest.approx(ar.predict(), abs=1e-6)
+
+
+def test_dump_before_the_first_window_reloads():
+    ar = ARPredictor(COEFF, INTERCEPT)
+    ar.update(5000.0)
+    loaded = ARPredictor(COEFF, INTERCEPT).load_state(ar.dump())
+    for mid in (5001.0, 5002.0, 5003.0):
+        loaded.update(mid)
+    assert loaded.predict() == pytest.approx(offline([5000.0, 5001.0, 5002.0, 5003.0]), abs=1e-9)
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+import state_codec
+from datamodel import ConversionObservation, Listing, Observation, OrderDepth, Trade, TradingState
+
+
+def make_state(listings=None) -> TradingState:
+    depth = OrderDepth()
+    depth.buy_orders = {9: 5, 10: 3}
+    depth.sell_orders = {12: -4, 11: -2}
+    one_sided = OrderDepth()
+    one_sided.sell_orders = {1100: -7}
+    return TradingState(
+        '{"k":1}',
+        1200,
+        listings if listings is not None else {"STARFRUIT": {"symbol": "STARFRUIT", "product": "STARFRUIT", "denomination": "SEASHELLS"}},
+        {"STARFRUIT": depth, "ORCHIDS": one_sided},
+        {"STARFRUIT": [Trade("STARFRUIT", 11, 2, "SUBMISSION", "Vinnie", 1100)]},
+        {"STARFRUIT": [Trade("STARFRUIT", 10, 1, "Raj", "", 1100)], "ORCHIDS": []},
+        {"STARFRUIT": 2},
+        Observation({"SOMETHING": 3}, {"ORCHIDS": ConversionObservation(1099.5, 1101.0, 1.5, 9.0, -3.0, 2500.0, 60.5)}),
+    )
+
+
+def fields(state: TradingState) -> list:
+    return [
+        state.traderData,
+        state.timestamp,
+        {k: vars(v) if not isinstance(v, dict) else v for k, v in state.listings.items()},
+        {s: (list(d.buy_orders.items()), list(d.sell_orders.items())) for s, d in state.order_depths.items()},
+        {k: [vars(t) for t in rows] for k, rows in state.own_trades.items()},
+        {k: [vars(t) for t in rows] for k, rows in state.market_trades.items()},
+        state.position,
+        state.observations.plainValueObservations,
+        {k: vars(o) for k, o in state.observations.conversionObservations.items()},
+    ]
+
+
+def test_round_trip_keeps_fields_book_order_and_types():
+    state = make_state()
+    decoded = state_codec.decode(state_codec.encode(state))
+    assert fields(decoded) == fields(state)
+    depth = decoded.order_depths["STARFRUIT"]
+    assert list(depth.buy_orders) == [10, 9]
+    assert list(depth.sell_orders) == [11, 12]
+    assert all(type(price) is int for price in depth.buy_orders)
+    assert depth.best_bid == 10 and depth.best_ask == 11
+
+
+def test_round_trip_with_an_empty_book_side():
+    decoded = state_codec.decode(state_codec.encode(make_state()))
+    depth = decoded.order_depths["ORCHIDS"]
+    assert dict(depth.buy_orders) == {}
+    assert depth.best_bid is None and depth.mid is None
+    assert depth.best_ask == 1100
+
+
+def test_round_trip_with_listing_objects():
+    state = make_state({"STARFRUIT": Listing("STARFRUIT", "STARFRUIT", "SEASHELLS")})
+    decoded = state_codec.decode(state_codec.encode(state))
+    assert isinstance(decoded.listings["STARFRUIT"], Listing)
+    assert vars(decoded.listings["STARFRUIT"]) == vars(state.listings["STARFRUIT"])
+
+
+def test_json_fallback_matches_orjson(monkeypatch):
+    state = make_state()
+    line = state_codec.encode(state)
+    monkeypatch.setattr(state_codec, "orjson", None)
+    assert json.loads(state_codec.encode(state)) == json.loads(line)
+    assert fields(state_codec.decode(line)) == fields(state)
+
+
+def test_unknown_version_is_rejected():
+    tree = state_codec.to_tree(make_state())
+    tree[0] = state_codec.VERSION + 1
+    with pytest.raises(ValueError):
+        state_codec.from_tree(tree)
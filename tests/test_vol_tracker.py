@@ -0,0 +1,56 @@
+import json
+import math
+
+import pytest
+
+from pricing import call_price
+from vol_tracker import TICKS_PER_YEAR, VolTracker
+
+T = 246 / 365
+
+
+def test_iv_moves_halfway_to_a_new_level_in_one_halflife():
+    vol = VolTracker(iv=0.15, iv_halflife=50)
+    for _ in range(50):
+        vol.update(10000, call_price(10000, T, 0, 0.25), T)
+        assert vol.last_iv == pytest.approx(0.25, abs=1e-6)
+    assert vol.iv == pytest.approx(0.2, abs=1e-6)
+    assert vol.fair(10000, T) == pytest.approx(call_price(10000, T, 0, vol.iv))
+
+
+def test_tick_without_implied_vol_leaves_iv_unchanged():
+    vol = VolTracker(iv=0.19)
+    # below intrinsic value: no volatility prices it
+    vol.update(10500, 400, T)
+    assert math.isnan(vol.last_iv)
+    assert vol.iv == 0.19 and vol.ticks == 1
+
+
+def test_realised_vol_is_an_ewma_of_squared_log_returns():
+    vol = VolTracker(iv=0.2, rv=0.1, rv_halflife=10)
+    alpha = 1 - 0.5 ** (1 / 10)
+    var = 0.1 ** 2 / TICKS_PER_YEAR
+    spots = [10000, 10010, 9990, 10005, 10005, 9980]
+    for i, spot in enumerate(spots):
+        vol.update(spot, call_price(spot, T, 0, 0.2), T)
+        if i:
+            ret = math.log(spot / spots[i - 1])
+            var += alpha * (ret * ret - var)
+    assert vol.var == pytest.approx(var, rel=1e-12)
+    assert vol.rv == pytest.approx(math.sqrt(var * TICKS_PER_YEAR), rel=1e-12)
+
+
+def test_dump_and_load_through_trader_data():
+    vol = VolTracker(iv=0.18, iv_halflife=20, rv_halflife=40)
+    for spot in (10000, 10020, 9995):
+        vol.update(spot, call_price(spot, T, 0, 0.21), T)
+    trader_data = json.dumps({"vol": vol.dump()})
+    restored = VolTracker.load(json.loads(trader_data)["vol"], iv_halflife=20, rv_halflife=40)
+    assert restored.dump() == vol.dump()
+    assert (restored.iv_alpha, restored.rv_alpha) == (vol.iv_alpha, vol.rv_alpha)
+    # the restored tracker carries on as the original does, up to the rounding dump() applies
+    for tracker in (vol, restored):
+        tracker.update(10030, call_price(10030, T, 0, 0.21), T)
+    assert restored.iv == pytest.approx(vol.iv, abs=1e-7)
+    assert restored.rv == pytest.approx(vol.rv, rel=1e-5)
+    assert restored.ticks == vol.ticks == 4
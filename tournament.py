@@ -0,0 +1,191 @@
+"""Rank every trader file in the repo on every day it can trade.
+
+Usage:
+    python tournament.py                      # every module defining Trader
+    python tournament.py Ayush/round1 stan_basket3.py -j 8
+
+A trader is replayed on the days of each round whose products it mentions;
+one that mentions products from several rounds gets those rounds overlaid
+(see backtester.combine_days). Results are cached in .tournament_cache.json
+keyed by (trader file hash, data hash), so a rerun only simulates files or
+days that changed.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import backtester
+import catalog
+
+CACHE_FILE = os.path.join(backtester.DATA_ROOT, ".tournament_cache.json")
+ENGINE_FILES = ["backtester.py", "batch.py", "catalog.py", "counterparty.py", "data_cache.py", "datamodel.py", "lazy_import.py", "logger.py", "matching.py", "pricing.py", "ring_buffer.py", "rls.py", "vol_tracker.py"]
+SKIP_DIRS = {"__MACOSX", "__pycache__", ".git", ".bottle_cache"}
+
+TRADER_CLASS = re.compile(r"^class Trader\b", re.MULTILINE)
+
+# (rounds, day index) -> DayData, filled in the parent before forking
+_DAYS: Dict[Tuple[Tuple[int, ...], int], backtester.DayData] = {}
+
+
+def discover(paths: Optional[List[str]] = None) -> List[str]:
+    """Relative paths of every .py file under paths that defines a Trader class."""
+    found = []
+    for path in paths or [backtester.DATA_ROOT]:
+        path = os.path.abspath(path)
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = []
+            for folder, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+                candidates += [os.path.join(folder, f) for f in sorted(files) if f.endswith(".py")]
+        for candidate in candidates:
+            with open(candidate, encoding="utf-8", errors="replace") as f:
+                if TRADER_CLASS.search(f.read()):
+                    found.append(os.path.relpath(candidate, backtester.DATA_ROOT))
+    return found
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def round_products() -> Dict[int, List[str]]:
+    """Products traded (or observed) in each round that has data."""
+    products = {}
+    for round_num in range(1, 5):
+        days = backtester.find_days(round_num)
+        if not days:
+            continue
+        products[round_num] = catalog.default().products(round_num, days[0])
+    return products
+
+
+def applicable_rounds(source: str, products: Dict[int, List[str]]) -> Tuple[int, ...]:
+    return tuple(r for r, names in sorted(products.items()) if any('"%s"' % p in source or "'%s'" % p in source for p in names))
+
+
+def day_count(rounds: Tuple[int, ...]) -> int:
+    return min(len(backtester.find_days(r)) for r in rounds)
+
+
+def data_hash(rounds: Tuple[int, ...], index: int, engine: str) -> str:
+    h = hashlib.sha1(engine.encode())
+    for r in rounds:
+        h.update(catalog.default().day_hash(r, backtester.find_days(r)[index]).encode())
+    return h.hexdigest()
+
+
+def _day(rounds: Tuple[int, ...], index: int) -> backtester.DayData:
+    key = (rounds, index)
+    if key not in _DAYS:
+        _DAYS[key] = backtester.load_days(list(rounds), [index] if len(rounds) > 1 else [backtester.find_days(rounds[0])[index]])[0]
+    return _DAYS[key]
+
+
+def _run_task(task):
+    key, path, rounds, index = task
+    try:
+        module = backtester.load_trader_module(os.path.join(backtester.DATA_ROOT, path))
+        result = backtester.Backtester(module.Trader(), _day(rounds, index)).run()
+    except Exception as e:
+        return key, {"day": "%s[%d]" % ("+".join(map(str, rounds)), index), "pnl": {}, "errors": 1, "failure": repr(e)}
+    return key, {"day": result.name, "pnl": result.pnl, "errors": result.errors}
+
+
+def load_cache() -> dict:
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict) -> None:
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE_FILE)
+
+
+def tournament(paths: Optional[List[str]] = None, processes: Optional[int] = None) -> Dict[str, List[dict]]:
+    """Run (or fetch from the cache) every trader on its applicable days."""
+    engine = "".join(file_hash(os.path.join(backtester.DATA_ROOT, f)) for f in ENGINE_FILES)
+    products = round_products()
+    cache = load_cache()
+    results: Dict[str, List[dict]] = {}
+    data_hashes = {}
+    todo = []
+
+    for path in discover(paths):
+        with open(os.path.join(backtester.DATA_ROOT, path), encoding="utf-8", errors="replace") as f:
+            rounds = applicable_rounds(f.read(), products)
+        results[path] = []
+        if not rounds:
+            continue
+        trader_hash = file_hash(os.path.join(backtester.DATA_ROOT, path))
+        for index in range(day_count(rounds)):
+            if (rounds, index) not in data_hashes:
+                data_hashes[rounds, index] = data_hash(rounds, index, engine)
+            key = "%s:%s" % (trader_hash, data_hashes[rounds, index])
+            if key in cache:
+                results[path].append(cache[key])
+            else:
+                todo.append((key, path, rounds, index))
+
+    if todo:
+        if "fork" in multiprocessing.get_all_start_methods():
+            for _, _, rounds, index in todo:
+                _day(rounds, index)
+            pool = multiprocessing.get_context("fork").Pool(processes)
+        else:
+            pool = multiprocessing.Pool(processes)
+        by_key = {task[0]: task[1] for task in todo}
+        with pool:
+            for done, (key, result) in enumerate(pool.imap_unordered(_run_task, todo), 1):
+                cache[key] = result
+                results[by_key[key]].append(result)
+                print("\r%d/%d simulated" % (done, len(todo)), end="", file=sys.stderr)
+        print(file=sys.stderr)
+        save_cache(cache)
+    return results
+
+
+def print_leaderboard(results: Dict[str, List[dict]]) -> None:
+    totals = []
+    all_products = set()
+    for path, days in results.items():
+        pnl: Dict[str, float] = {}
+        errors = 0
+        for day in days:
+            for product, value in day["pnl"].items():
+                pnl[product] = pnl.get(product, 0.0) + value
+            errors += day["errors"]
+        all_products.update(p for p, v in pnl.items() if v)
+        totals.append((sum(pnl.values()), path, pnl, len(days), errors))
+
+    products = sorted(all_products)
+    header = ["rank", "trader", "days"] + products + ["total", "errors"]
+    rows = []
+    totals.sort(key=lambda t: t[0], reverse=True)
+    for rank, (total, path, pnl, days, errors) in enumerate(totals, 1):
+        rows.append([str(rank), path, str(days)] + ["%.0f" % pnl.get(p, 0.0) for p in products] + ["%.0f" % total, str(errors)])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header)] if rows else [len(h) for h in header]
+    print("  ".join(h.ljust(w) if i == 1 else h.rjust(w) for i, (h, w) in enumerate(zip(header, widths))))
+    for row in rows:
+        print("  ".join(c.ljust(w) if i == 1 else c.rjust(w) for i, (c, w) in enumerate(zip(row, widths))))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    processes = None
+    if "-j" in args:
+        i = args.index("-j")
+        processes = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    print_leaderboard(tournament(args or None, processes))
@@ -1,121 +1,18 @@
-from typing import Dict, List
-from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
-from typing import Any
-import string
-import json
-import numpy as np
-import collections
-from collections import defaultdict
-import random
 import math
-import copy
-import numpy as np
-import statistics 
-
-class Logger:
-    def __init__(self) -> None:
-        self.logs = ""
-        self.max_log_length = 3750
-
-    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
-        self.logs += sep.join(map(str, objects)) + end
-
-    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
-        base_length = len(self.to_json([
-            self.compress_state(state, ""),
-            self.compress_orders(orders),
-            conversions,
-            "",
-            "",
-        ]))
-
-        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
-        max_item_length = (self.max_log_length - base_length) // 3
-
-        print(self.to_json([
-            self.compress_state(state, self.truncate(state.traderData, max_item_length)),
-            self.compress_orders(orders),
-            conversions,
-            self.truncate(trader_data, max_item_length),
-            self.truncate(self.logs, max_item_length),
-        ]))
-
-        self.logs = ""
-
-    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
-        return [
-            state.timestamp,
-            trader_data,
-            self.compress_listings(state.listings),
-            self.compress_order_depths(state.order_depths),
-            self.compress_trades(state.own_trades),
-            self.compress_trades(state.market_trades),
-            state.position,
-            self.compress_observations(state.observations),
-        ]
-
-    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[list[Any]]:
-        compressed = []
-        for listing in listings.values():
-            compressed.append([listing["symbol"], listing["product"], listing["denomination"]])
-
-        return compressed
-
-    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
-        compressed = {}
-        for symbol, order_depth in order_depths.items():
-            compressed[symbol] = [order_depth.buy_orders, order_depth.sell_orders]
-
-        return compressed
-
-    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
-        compressed = []
-        for arr in trades.values():
-            for trade in arr:
-                compressed.append([
-                    trade.symbol,
-                    trade.price,
-                    trade.quantity,
-                    trade.buyer,
-                    trade.seller,
-                    trade.timestamp,
-                ])
-
-        return compressed
-
-    def compress_observations(self, observations: Observation) -> list[Any]:
-        conversion_observations = {}
-        for product, observation in observations.conversionObservations.items():
-            conversion_observations[product] = [
-                observation.bidPrice,
-                observation.askPrice,
-                observation.transportFees,
-                observation.exportTariff,
-                observation.importTariff,
-                observation.sunlight,
-                observation.humidity,
-            ]
-
-        return [observations.plainValueObservations, conversion_observations]
-
-    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[list[Any]]:
-        compressed = []
-        for arr in orders.values():
-            for order in arr:
-                compressed.append([order.symbol, order.price, order.quantity])
-
-        return compressed
-
-    def to_json(self, value: Any) -> str:
-        return json.dumps(value, cls=ProsperityEncoder, separators=(",", ":"))
-
-    def truncate(self, value: str, max_length: int) -> str:
-        if len(value) <= max_length:
-            return value
-
-        return value[:max_length - 3] + "..."
-
-logger = Logger()
+from typing import Any, Dict, List
+from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
+
+# Helper modules of this repo; python bundle.py trader_final_r4.py inlines them into the file to upload
+from lazy_import import lazy
+from logger import DEBUG, SIGNAL, Logger, Sampling
+from pricing import call_price, call_price_array
+from ring_buffer import RingBuffer
+
+# numpy only loads once a path that needs it first touches it
+np = lazy("numpy")
+
+# Flush every 100th tick, coupon and orchid fills, and orchid conversions; the BS price goes out on those ticks only
+logger = Logger(sampling=Sampling(every=100, fills={"COCONUT_COUPON", "ORCHIDS"}, levels={"coupon": DEBUG, "orchids": SIGNAL}))
 
 class Trader:
     
@@ -123,11 +20,50 @@ class Trader:
     POSITION_LIMIT = {"AMETHYSTS": 20, "STARFRUIT": 20, "ORCHIDS": 100, "GIFT_BASKET": 60, "CHOCOLATE": 250, "STRAWBERRIES": 350, "ROSES": 60, "COCONUT": 300, "COCONUT_COUPON": 600}
 
     position = {"AMETHYSTS": 0, "STARFRUIT": 0, "ORCHIDS": 0, "CHOCOLATE": 0, "STRAWBERRIES": 0, "ROSES": 0, "GIFT_BASKET": 0, "COCONUT": 0, "COCONUT_COUPON": 0}
-    spread_cache = []
     spread_cache_size = 200
-    starfruit_cache = []
+    # Offline fit of the next STARFRUIT mid on the last starfruit_dim mids, oldest first, one coefficient each
+    starfruit_coeff = [0.18895127, 0.20771801, 0.26114406, 0.34171985]
+    starfruit_intercept = 2.3552758852292754
     starfruit_dim = 4
+    # RingBuffers of spread_cache_size and starfruit_dim, built by the first run() so overrides of the sizes (sweep.py) take effect
+    spread_cache = None
+    starfruit_cache = None
+    coupon_thres = 2.5
+    coconut_band = 50
     timestamp_curr = 0
+    # Per-tick signals precomputed by run_batch (local backtests only), looked up by signal()
+    signals = None
+    signal_ticks = None
+
+    def run_batch(self, batch):
+        signals = {}
+        products = set(batch.products)
+        if "STARFRUIT" in products:
+            # calc_next_price_starfruit over every window of the last starfruit_dim mids
+            mid = batch.mid("STARFRUIT")
+            coeff, intercept = self.starfruit_fit()
+            dim = len(coeff)
+            nxt_price = np.full(len(mid), intercept)
+            for i, c in enumerate(coeff):
+                nxt_price[dim - 1:] += mid[i:len(mid) - dim + 1 + i] * c
+            nxt_price[:dim - 1] = np.nan
+            signals["starfruit_next_price"] = np.round(nxt_price)
+        if "COCONUT" in products:
+            S, T, r, sigma, K = batch.mid("COCONUT"), 246/365, 0, 0.19, 10000
+            signals["coupon_bs_price"] = call_price_array(S, T, r, sigma, K)
+        signals["coconut_theo"] = 10000 + np.sin(2 * np.pi * batch.timestamps / 3400000 - np.pi * 0.1 + 2*np.pi * (3000000/3400000)) * 120
+        self.signals = signals
+        self.signal_ticks = {t: i for i, t in enumerate(batch.timestamps.tolist())}
+
+    def signal(self, name, timestamp):
+        # None when replaying tick by tick (as on the platform) or the tick has no value
+        if self.signals is None or name not in self.signals:
+            return None
+        i = self.signal_ticks.get(timestamp)
+        if i is None:
+            return None
+        value = float(self.signals[name][i])
+        return None if value != value else value
 
     def get_prices(self, state: TradingState, symbol: Symbol):
         buy_orders = list(state.order_depths[symbol].buy_orders.items())
@@ -136,9 +72,13 @@ class Trader:
         best_ask, best_ask_volume = sell_orders[0]
         return best_bid, best_ask, (best_bid + best_ask) / 2, best_bid_volume, best_ask_volume
 
+    def starfruit_fit(self):
+        if len(self.starfruit_coeff) != self.starfruit_dim:
+            raise ValueError("starfruit_coeff has %d coefficients for starfruit_dim %d" % (len(self.starfruit_coeff), self.starfruit_dim))
+        return self.starfruit_coeff, self.starfruit_intercept
+
     def calc_next_price_starfruit(self):
-        coeff = [0.18895127, 0.20771801, 0.26114406, 0.34171985]
-        intercept = 2.3552758852292754
+        coeff, intercept = self.starfruit_fit()
         nxt_price = intercept
         for i, val in enumerate(self.starfruit_cache):
             nxt_price += val * coeff[i]
@@ -244,16 +184,14 @@ class Trader:
         best_bid_roses, best_ask_roses, mid_price_roses, best_bid_volume_roses, best_ask_volume_roses = self.get_prices(state, "ROSES")
 
         spread = mid_price_basket - 4*mid_price_chocolate - 6*mid_price_strawberries - mid_price_roses
-        if len(self.spread_cache) == self.spread_cache_size:
-            self.spread_cache.pop(0)
         self.spread_cache.append(spread)
 
-        avg_spread = np.mean(np.array(self.spread_cache))
-        std_spread = np.std(np.array(self.spread_cache))
+        avg_spread = self.spread_cache.mean()
+        std_spread = self.spread_cache.std()
         curr_pos = self.position["GIFT_BASKET"]
 
         if (len(self.spread_cache) > 3):
-            spread_3 = np.mean(np.array(self.spread_cache[-3:]))
+            spread_3 = self.spread_cache.tail_mean(3)
             if (spread_3 < avg_spread - 2*std_spread):
                 gift_basket.append(Order("GIFT_BASKET", best_ask_basket, min(GIFT_BASKET_POS_LIMIT - curr_pos, -best_ask_volume_basket)))
             elif (spread_3 > avg_spread + 2*std_spread):
@@ -318,9 +256,7 @@ class Trader:
         return orders
     
     def black_scholes_price(self, S, T, r, sigma, K = 10000):
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        return S * statistics.NormalDist().cdf(d1) - K * np.exp(-r * T) * statistics.NormalDist().cdf(d2)
+        return call_price(S, T, r, sigma, K)
     
     def get_order_coupon(self, state: TradingState):
         order = []
@@ -333,11 +269,13 @@ class Trader:
             best_ask[prod], best_ask_volume[prod] = sell_orders[0]
             mid_price[prod] = (best_bid[prod] + best_ask[prod]) / 2
         r = 0
-        bs_price = self.black_scholes_price(mid_price["COCONUT"], 246/365, r, 0.19)
-        logger.print("BS Price: ", bs_price, "Mid Price: ", mid_price["COCONUT_COUPON"])
+        bs_price = self.signal("coupon_bs_price", state.timestamp)
+        if bs_price is None:
+            bs_price = self.black_scholes_price(mid_price["COCONUT"], 246/365, r, 0.19)
+        logger.print("BS Price: ", bs_price, "Mid Price: ", mid_price["COCONUT_COUPON"], level=DEBUG, channel="coupon")
         diff = mid_price["COCONUT_COUPON"] - bs_price
         curr_pos  = self.position["COCONUT_COUPON"]
-        thres = 2.5
+        thres = self.coupon_thres
         if diff > thres:
             vol = max(-best_bid_volume["COCONUT_COUPON"], -COUPON_POS_LIMIT - curr_pos)
             order.append(Order("COCONUT_COUPON", best_bid["COCONUT_COUPON"], vol))
@@ -347,7 +285,7 @@ class Trader:
 
         return order
     
-    def co_coconut(self, order_depth):
+    def co_coconut(self, order_depth, timestamp):
 
         orders = {'COCONUT' : [], 'COCONUT_COUPON': []}
         prods = ['COCONUT', 'COCONUT_COUPON']
@@ -360,14 +298,17 @@ class Trader:
             best_ask[prod], best_ask_volume[prod] = sell_orders[0]
             mid_price[prod] = (best_bid[prod] + best_ask[prod]) / 2
         
-        # theo_price = 10000 + np.sin(2 * np.pi * self.timestamp_curr / 4000000 + 2 * np.pi * 0.75) * 130
-        theo_price = 10000 + np.sin(2 * np.pi * self.timestamp_curr / 3400000 - np.pi * 0.1 + 2*np.pi * (3000000/3400000)) * 120
+        # theo_price = 10000 + np.sin(2 * np.pi * timestamp / 4000000 + 2 * np.pi * 0.75) * 130
+        theo_price = self.signal("coconut_theo", timestamp)
+        if theo_price is None:
+            # math, not numpy: this runs on the platform every tick, and must not load numpy on a cold start
+            theo_price = 10000 + math.sin(2 * math.pi * timestamp / 3400000 - math.pi * 0.1 + 2*math.pi * (3000000/3400000)) * 120
         curr_pos = self.position['COCONUT']
-        if theo_price - mid_price['COCONUT'] > 50:
+        if theo_price - mid_price['COCONUT'] > self.coconut_band:
             vol = min(100, self.POSITION_LIMIT['COCONUT'] - curr_pos)
             orders['COCONUT'].append(Order('COCONUT', best_ask['COCONUT'], vol))
 
-        if theo_price - mid_price['COCONUT'] < -50:
+        if theo_price - mid_price['COCONUT'] < -self.coconut_band:
             vol = max(-100, -self.POSITION_LIMIT['COCONUT'] - curr_pos)
             orders['COCONUT'].append(Order('COCONUT', best_bid['COCONUT'], vol))
 
@@ -382,20 +323,28 @@ class Trader:
         for key, val in state.position.items():
             self.position[key] = val
 
-        if len(self.starfruit_cache) == self.starfruit_dim:
-            self.starfruit_cache.pop(0)
+        if self.spread_cache is None:
+            # Kept on the class, like the rest of the trader's state
+            type(self).spread_cache = RingBuffer(self.spread_cache_size)
+            type(self).starfruit_cache = RingBuffer(self.starfruit_dim)
 
+        # The cache is kept up to date with run_batch's signals too, for ticks where they have no value
         best_bid_sf, best_bid_amount_sf = list(state.order_depths["STARFRUIT"].buy_orders.items())[0]
         best_ask_sf, best_ask_amount_sf = list(state.order_depths["STARFRUIT"].sell_orders.items())[0]
 
         self.starfruit_cache.append((best_bid_sf + best_ask_sf)/2)
 
+        next_price = self.signal("starfruit_next_price", state.timestamp)
+        if next_price is not None:
+            next_price = int(next_price)
+        elif len(self.starfruit_cache) == self.starfruit_dim:
+            next_price = self.calc_next_price_starfruit()
+
         INF = 1e9
         starfruit_lb = 1
         starfruit_ub = 10000
 
-        if len(self.starfruit_cache) == self.starfruit_dim:
-            next_price = self.calc_next_price_starfruit()
+        if next_price is not None:
             starfruit_lb = next_price-1
             starfruit_ub = next_price+1
             traderData = f"Next price: {next_price}"
@@ -410,30 +359,34 @@ class Trader:
         result["GIFT_BASKET"], result["CHOCOLATE"], result["STRAWBERRIES"], result["ROSES"] = self.get_orders_basket(state)
 
         self.timestamp_curr = state.timestamp
-        order_depth = state.order_depths[Symbol("ORCHIDS")]
-        buy_orders = list(order_depth.buy_orders.items())
-        sell_orders = list(order_depth.sell_orders.items())
-        best_ask, best_ask_amount = sell_orders[0]
-        best_bid, best_bid_amount = buy_orders[0]
-        undercut_buy = best_bid + 1
-        undercut_sell = best_ask - 1
-        ducks_price_selling = state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees
-        ducks_price_buying = state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees 
-        import_tariff = state.observations.conversionObservations["ORCHIDS"].importTariff
-        result["ORCHIDS"] += self.orders_mm_orchids(state.order_depths["ORCHIDS"], ducks_price_selling, ducks_price_buying, import_tariff)
-        curr_pos = self.position["ORCHIDS"]
-        if undercut_sell > state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos < 0:
-            # orders.append(Order("ORCHIDS", best_ask, -best_ask_amount))
-            conversions = -curr_pos  
-        curr_pos = self.position["ORCHIDS"]
-        if undercut_buy < state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos > 0:
-            # orders.append(Order("ORCHIDS", best_bid, -best_bid_amount))
-            conversions = -curr_pos
+        # ORCHIDS is only listed from round 2 on; replays of earlier rounds have no book or quote for it
+        if "ORCHIDS" in state.order_depths and "ORCHIDS" in state.observations.conversionObservations:
+            order_depth = state.order_depths[Symbol("ORCHIDS")]
+            buy_orders = list(order_depth.buy_orders.items())
+            sell_orders = list(order_depth.sell_orders.items())
+            best_ask, best_ask_amount = sell_orders[0]
+            best_bid, best_bid_amount = buy_orders[0]
+            undercut_buy = best_bid + 1
+            undercut_sell = best_ask - 1
+            ducks_price_selling = state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees
+            ducks_price_buying = state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees 
+            import_tariff = state.observations.conversionObservations["ORCHIDS"].importTariff
+            result["ORCHIDS"] += self.orders_mm_orchids(state.order_depths["ORCHIDS"], ducks_price_selling, ducks_price_buying, import_tariff)
+            curr_pos = self.position["ORCHIDS"]
+            if undercut_sell > state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos < 0:
+                # orders.append(Order("ORCHIDS", best_ask, -best_ask_amount))
+                conversions = -curr_pos  
+            curr_pos = self.position["ORCHIDS"]
+            if undercut_buy < state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos > 0:
+                # orders.append(Order("ORCHIDS", best_bid, -best_bid_amount))
+                conversions = -curr_pos
+            if conversions:
+                logger.print("ORCHIDS conversions: ", conversions, "Position: ", curr_pos, level=SIGNAL, channel="orchids")
         
         result["COCONUT_COUPON"] += self.get_order_coupon(state)
         
-        orders_coco = self.co_coconut(state.order_depths)
+        orders_coco = self.co_coconut(state.order_depths, state.timestamp)
         result["COCONUT"] += orders_coco['COCONUT']
 
         logger.flush(state, result, conversions, traderData)
-        return result, conversions, traderData
\ No newline at end of file
+        return result, conversions, traderData
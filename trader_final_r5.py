@@ -1,121 +1,45 @@
-from typing import Dict, List
-from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
-from typing import Any
-import string
 import json
-import numpy as np
-import collections
-from collections import defaultdict
-import random
-import math
-import copy
-import numpy as np
-import statistics 
-
-class Logger:
-    def __init__(self) -> None:
-        self.logs = ""
-        self.max_log_length = 3750
-
-    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
-        self.logs += sep.join(map(str, objects)) + end
-
-    def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
-        base_length = len(self.to_json([
-            self.compress_state(state, ""),
-            self.compress_orders(orders),
-            conversions,
-            "",
-            "",
-        ]))
-
-        # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
-        max_item_length = (self.max_log_length - base_length) // 3
-
-        print(self.to_json([
-            self.compress_state(state, self.truncate(state.traderData, max_item_length)),
-            self.compress_orders(orders),
-            conversions,
-            self.truncate(trader_data, max_item_length),
-            self.truncate(self.logs, max_item_length),
-        ]))
-
-        self.logs = ""
-
-    def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
-        return [
-            state.timestamp,
-            trader_data,
-            self.compress_listings(state.listings),
-            self.compress_order_depths(state.order_depths),
-            self.compress_trades(state.own_trades),
-            self.compress_trades(state.market_trades),
-            state.position,
-            self.compress_observations(state.observations),
-        ]
-
-    def compress_listings(self, listings: dict[Symbol, Listing]) -> list[list[Any]]:
-        compressed = []
-        for listing in listings.values():
-            compressed.append([listing["symbol"], listing["product"], listing["denomination"]])
-
-        return compressed
-
-    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
-        compressed = {}
-        for symbol, order_depth in order_depths.items():
-            compressed[symbol] = [order_depth.buy_orders, order_depth.sell_orders]
-
-        return compressed
-
-    def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
-        compressed = []
-        for arr in trades.values():
-            for trade in arr:
-                compressed.append([
-                    trade.symbol,
-                    trade.price,
-                    trade.quantity,
-                    trade.buyer,
-                    trade.seller,
-                    trade.timestamp,
-                ])
-
-        return compressed
-
-    def compress_observations(self, observations: Observation) -> list[Any]:
-        conversion_observations = {}
-        for product, observation in observations.conversionObservations.items():
-            conversion_observations[product] = [
-                observation.bidPrice,
-                observation.askPrice,
-                observation.transportFees,
-                observation.exportTariff,
-                observation.importTariff,
-                observation.sunlight,
-                observation.humidity,
-            ]
-
-        return [observations.plainValueObservations, conversion_observations]
-
-    def compress_orders(self, orders: dict[Symbol, list[Order]]) -> list[list[Any]]:
-        compressed = []
-        for arr in orders.values():
-            for order in arr:
-                compressed.append([order.symbol, order.price, order.quantity])
-
-        return compressed
-
-    def to_json(self, value: Any) -> str:
-        return json.dumps(value, cls=ProsperityEncoder, separators=(",", ":"))
-
-    def truncate(self, value: str, max_length: int) -> str:
-        if len(value) <= max_length:
-            return value
-
-        return value[:max_length - 3] + "..."
-
-logger = Logger()
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Dict, List
+from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
+
+# Helper modules of this repo; python bundle.py trader_final_r5.py inlines them into the file to upload
+from logger import DEBUG, SIGNAL, Logger, Sampling
+from pricing import call_price, implied_vol
+from rls import ARPredictor
+from vol_tracker import VolTracker
+
+# Flush every 100th tick, coupon and orchid fills, and orchid conversions; the BS price goes out on those ticks only
+logger = Logger(sampling=Sampling(every=100, fills={"COCONUT_COUPON", "ORCHIDS"}, levels={"coupon": DEBUG, "orchids": SIGNAL}))
+
+def top_of_book(depth: OrderDepth):
+    """(best_bid, best_bid_volume, best_ask, best_ask_volume) from the plain buy/sell dicts; None and 0 for an empty side."""
+    buy_orders, sell_orders = depth.buy_orders, depth.sell_orders
+    best_bid = max(buy_orders) if buy_orders else None
+    best_ask = min(sell_orders) if sell_orders else None
+    return best_bid, buy_orders.get(best_bid, 0), best_ask, sell_orders.get(best_ask, 0)
+
+
+def book_levels(depth: OrderDepth) -> tuple:
+    """(bid prices, cumulative bid size, ask prices, cumulative ask size), each best first.
+
+    Read from OrderDepth's cached levels; the platform's plain OrderDepth has none, so its sides are sorted here.
+    """
+    if hasattr(depth, "bid_depth"):
+        return depth.bid_prices, depth.bid_depth, depth.ask_prices, depth.ask_depth
+    bids = sorted(depth.buy_orders.items(), reverse=True)
+    asks = sorted(depth.sell_orders.items())
+    return ([price for price, _ in bids], list(accumulate(volume for _, volume in bids)),
+            [price for price, _ in asks], list(accumulate(-volume for _, volume in asks)))
+
+
+def volume_to(depth: List[int], enough: float) -> int:
+    """Size on one side, from its cumulative sizes best first, down to the level where it reaches enough; 0 for an empty side."""
+    if not depth:
+        return 0
+    return depth[min(bisect_left(depth, enough), len(depth) - 1)]
+
 
 class Trader:
     
@@ -124,27 +48,46 @@ class Trader:
     POSITION_LIMIT = {"AMETHYSTS": 20, "STARFRUIT": 20, "ORCHIDS": 100, "GIFT_BASKET": 60, "CHOCOLATE": 250, "STRAWBERRIES": 350, "ROSES": 60, "COCONUT": 300, "COCONUT_COUPON": 600}
 
     position = {"AMETHYSTS": 0, "STARFRUIT": 0, "ORCHIDS": 0, "CHOCOLATE": 0, "STRAWBERRIES": 0, "ROSES": 0, "GIFT_BASKET": 0, "COCONUT": 0, "COCONUT_COUPON": 0}
-    spread_cache = []
-    spread_cache_size = 200
-    starfruit_cache = []
-    starfruit_dim = 4
+    # AR(4) on the last four STARFRUIT mids, warm-started from lr.ipynb's fit and refitted every tick
+    starfruit_ar = ARPredictor([0.18895127, 0.20771801, 0.26114406, 0.34171985], 2.3552758852292754)
     cont_buy_basket_unfill = 0
     cont_sell_basket_unfill = 0
+    coupon_thres = 1
     timestamp_curr = 0
+    # Coupon implied vol and COCONUT realised vol, carried in traderData; days to expiry at timestamp 0
+    vol = VolTracker(iv=0.191)
+    coupon_days = 245
+    # The traderData run() returned last; state.traderData only needs parsing when it differs (a restarted process)
+    trader_data_out = ""
+    # Per-tick signals precomputed by run_batch (local backtests only), looked up by signal()
+    signals = None
+    signal_ticks = None
+
+    def run_batch(self, batch):
+        signals = {}
+        products = set(batch.products)
+        if {"GIFT_BASKET", "CHOCOLATE", "STRAWBERRIES", "ROSES"} <= products:
+            signals["basket_residual"] = batch.mid("GIFT_BASKET") - batch.mid("CHOCOLATE")*4 - batch.mid("STRAWBERRIES")*6 - batch.mid("ROSES") - 376
+        self.signals = signals
+        self.signal_ticks = {t: i for i, t in enumerate(batch.timestamps.tolist())}
+
+    def signal(self, name, timestamp):
+        # None when replaying tick by tick (as on the platform) or the tick has no value
+        if self.signals is None or name not in self.signals:
+            return None
+        i = self.signal_ticks.get(timestamp)
+        if i is None:
+            return None
+        value = float(self.signals[name][i])
+        return None if value != value else value
 
     def get_prices(self, state: TradingState, symbol: Symbol):
-        buy_orders = list(state.order_depths[symbol].buy_orders.items())
-        sell_orders = list(state.order_depths[symbol].sell_orders.items())
-        best_bid, best_bid_volume = buy_orders[0]
-        best_ask, best_ask_volume = sell_orders[0]
-        return best_bid, best_ask, (best_bid + best_ask) / 2, best_bid_volume, best_ask_volume
+        best_bid, best_bid_volume, best_ask, best_ask_volume = top_of_book(state.order_depths[symbol])
+        mid = (best_bid + best_ask) / 2 if best_bid is not None and best_ask is not None else None
+        return best_bid, best_ask, mid, best_bid_volume, best_ask_volume
 
     def calc_next_price_starfruit(self):
-        coeff = [0.18895127, 0.20771801, 0.26114406, 0.34171985]
-        intercept = 2.3552758852292754
-        nxt_price = intercept
-        for i, val in enumerate(self.starfruit_cache):
-            nxt_price += val * coeff[i]
+        nxt_price = self.starfruit_ar.predict()
         return int(round(nxt_price))
 
     def compute_orders_sf(self, order_depth, acc_bid, acc_ask):
@@ -246,48 +189,25 @@ class Trader:
         best_bid_strawberries, best_ask_strawberries, mid_price_strawberries, best_bid_volume_strawberries, best_ask_volume_strawberries = self.get_prices(state, "STRAWBERRIES")
         best_bid_roses, best_ask_roses, mid_price_roses, best_bid_volume_roses, best_ask_volume_roses = self.get_prices(state, "ROSES")
 
-        # spread = mid_price_basket - 4*mid_price_chocolate - 6*mid_price_strawberries - mid_price_roses
-        # if len(self.spread_cache) == self.spread_cache_size:
-        #     self.spread_cache.pop(0)
-        # self.spread_cache.append(spread)
-
-        # avg_spread = np.mean(np.array(self.spread_cache))
-        # std_spread = np.std(np.array(self.spread_cache))
-        # curr_pos = self.position["GIFT_BASKET"]
-
-        # if (len(self.spread_cache) > 3):
-        #     spread_3 = np.mean(np.array(self.spread_cache[-3:]))
-        #     if (spread_3 > avg_spread + 2*std_spread):
-        #         gift_basket.append(Order("GIFT_BASKET", best_ask_basket, min(GIFT_BASKET_POS_LIMIT - curr_pos, -best_ask_volume_basket)))
-        #     elif (spread_3 < avg_spread - 2*std_spread):
-        #         gift_basket.append(Order("GIFT_BASKET", best_bid_basket, max(-GIFT_BASKET_POS_LIMIT-curr_pos, -best_bid_volume_basket)))
         orders = {'CHOCOLATE' : [], 'STRAWBERRIES': [], 'ROSES' : [], 'GIFT_BASKET' : []}
         prods = ['CHOCOLATE', 'STRAWBERRIES', 'ROSES', 'GIFT_BASKET']
-        osell, obuy, best_sell, best_buy, worst_sell, worst_buy, mid_price, vol_buy, vol_sell = {}, {}, {}, {}, {}, {}, {}, {}, {}
+        best_sell, best_buy, worst_sell, worst_buy, mid_price, vol_buy, vol_sell = {}, {}, {}, {}, {}, {}, {}
 
         for p in prods:
-            osell[p] = collections.OrderedDict(sorted(state.order_depths[p].sell_orders.items()))
-            obuy[p] = collections.OrderedDict(sorted(state.order_depths[p].buy_orders.items(), reverse=True))
-
-            best_sell[p] = next(iter(osell[p]))
-            best_buy[p] = next(iter(obuy[p]))
-
-            worst_sell[p] = next(reversed(osell[p]))
-            worst_buy[p] = next(reversed(obuy[p]))
-
+            bid_prices, bid_depth, ask_prices, ask_depth = book_levels(state.order_depths[p])
+            # No spread to trade on while a side of any leg is empty
+            if not bid_prices or not ask_prices:
+                return gift_basket, chocolate, strawberries, roses
+            best_sell[p], best_buy[p] = ask_prices[0], bid_prices[0]
+            worst_sell[p], worst_buy[p] = ask_prices[-1], bid_prices[-1]
             mid_price[p] = (best_sell[p] + best_buy[p])/2
-            vol_buy[p], vol_sell[p] = 0, 0
-            for price, vol in obuy[p].items():
-                vol_buy[p] += vol 
-                if vol_buy[p] >= self.POSITION_LIMIT[p]/10:
-                    break
-            for price, vol in osell[p].items():
-                vol_sell[p] += -vol 
-                if vol_sell[p] >= self.POSITION_LIMIT[p]/10:
-                    break
-
-        res_buy = mid_price_basket - mid_price_chocolate*4 - mid_price_strawberries*6 - mid_price_roses - 376
-        res_sell = mid_price_basket - mid_price_chocolate*4 - mid_price_strawberries*6 - mid_price_roses - 376
+            # Volume on each side down to the level that covers a tenth of the limit
+            vol_buy[p], vol_sell[p] = volume_to(bid_depth, self.POSITION_LIMIT[p]/10), volume_to(ask_depth, self.POSITION_LIMIT[p]/10)
+
+        res_buy = self.signal("basket_residual", state.timestamp)
+        if res_buy is None:
+            res_buy = mid_price_basket - mid_price_chocolate*4 - mid_price_strawberries*6 - mid_price_roses - 376
+        res_sell = res_buy
 
         trade_at = self.basket_std*0.5
         close_at = self.basket_std*(-1000)
@@ -326,16 +246,13 @@ class Trader:
 
         if Symbol("ROSES") in state.market_trades and len(state.market_trades[Symbol("ROSES")]) > 0:
             trades = state.market_trades[Symbol("ROSES")]
-            buy_orders = list(state.order_depths[Symbol("ROSES")].buy_orders.items())
-            sell_orders = list(state.order_depths[Symbol("ROSES")].sell_orders.items())
-            best_buy, best_buy_volume = buy_orders[0]
-            best_sell, best_sell_volume = sell_orders[0]
+            best_buy, best_buy_volume, best_sell, best_sell_volume = top_of_book(state.order_depths[Symbol("ROSES")])
             limit = self.POSITION_LIMIT["ROSES"]
             curr_pos = self.position["ROSES"]
             for trade in trades:
-                if trade.seller == "Vinnie" and trade.timestamp == state.timestamp - 100:
+                if trade.seller == "Vinnie" and trade.timestamp == state.timestamp - 100 and best_buy is not None:
                     roses.append(Order(Symbol("ROSES"), best_buy , max(-best_buy_volume, -limit - curr_pos)))
-                elif trade.buyer == "Vinnie" and trade.timestamp == state.timestamp - 100:
+                elif trade.buyer == "Vinnie" and trade.timestamp == state.timestamp - 100 and best_sell is not None:
                     roses.append(Order(Symbol("ROSES"), best_sell , min(-best_sell_volume, limit - curr_pos)))
 
         return gift_basket, chocolate, strawberries, roses
@@ -397,26 +314,26 @@ class Trader:
         return orders
     
     def black_scholes_price(self, S, T, r, sigma, K = 10000):
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        return S * statistics.NormalDist().cdf(d1) - K * np.exp(-r * T) * statistics.NormalDist().cdf(d2)
+        return call_price(S, T, r, sigma, K)
     
     def get_order_coupon(self, state: TradingState):
         order = []
         COUPON_POS_LIMIT = 600
         mid_price, best_bid, best_bid_volume, best_ask, best_ask_volume = {}, {}, {}, {}, {}
         for prod in ["COCONUT", "COCONUT_COUPON"]:
-            buy_orders = list(state.order_depths[prod].buy_orders.items())
-            sell_orders = list(state.order_depths[prod].sell_orders.items())
-            best_bid[prod], best_bid_volume[prod] = buy_orders[0]
-            best_ask[prod], best_ask_volume[prod] = sell_orders[0]
+            best_bid[prod], best_bid_volume[prod], best_ask[prod], best_ask_volume[prod] = top_of_book(state.order_depths[prod])
+            # Neither a fair value nor a price to trade at while a side is empty
+            if best_bid[prod] is None or best_ask[prod] is None:
+                return order
             mid_price[prod] = (best_bid[prod] + best_ask[prod]) / 2
         r = 0.01
-        bs_price = self.black_scholes_price(mid_price["COCONUT"], 245/365, r, 0.191)
-        logger.print("BS Price: ", bs_price, "Mid Price: ", mid_price["COCONUT_COUPON"])
+        T = (self.coupon_days - state.timestamp / 1000000) / 365
+        self.vol.update(mid_price["COCONUT"], mid_price["COCONUT_COUPON"], T, r)
+        bs_price = self.vol.fair(mid_price["COCONUT"], T, r)
+        logger.print("BS Price: ", bs_price, "Mid Price: ", mid_price["COCONUT_COUPON"], "IV: ", self.vol.iv, "RV: ", self.vol.rv, level=DEBUG, channel="coupon")
         diff = mid_price["COCONUT_COUPON"] - bs_price
         curr_pos  = self.position["COCONUT_COUPON"]
-        thres = 1
+        thres = self.coupon_thres
         if diff > thres:
             vol = max(-best_bid_volume["COCONUT_COUPON"], -COUPON_POS_LIMIT - curr_pos)
             order.append(Order("COCONUT_COUPON", best_bid["COCONUT_COUPON"], vol))
@@ -430,16 +347,13 @@ class Trader:
         orders = []
         if Symbol("COCONUT") in state.market_trades and len(state.market_trades[Symbol("COCONUT")]) > 0:
             trades = state.market_trades[Symbol("COCONUT")]
-            buy_orders = list(state.order_depths[Symbol("COCONUT")].buy_orders.items())
-            sell_orders = list(state.order_depths[Symbol("COCONUT")].sell_orders.items())
-            best_buy, best_buy_volume = buy_orders[0]
-            best_sell, best_sell_volume = sell_orders[0]
+            best_buy, best_buy_volume, best_sell, best_sell_volume = top_of_book(state.order_depths[Symbol("COCONUT")])
             limit = self.POSITION_LIMIT["COCONUT"]
             curr_pos = self.position["COCONUT"]
             for trade in trades:
-                if trade.seller == "Raj" and trade.timestamp == state.timestamp - 100:
+                if trade.seller == "Raj" and trade.timestamp == state.timestamp - 100 and best_buy is not None:
                     orders.append(Order(Symbol("COCONUT"), best_buy , max(-best_buy_volume, -limit - curr_pos)))
-                elif trade.buyer == "Raj" and trade.timestamp == state.timestamp - 100:
+                elif trade.buyer == "Raj" and trade.timestamp == state.timestamp - 100 and best_sell is not None:
                     orders.append(Order(Symbol("COCONUT"), best_sell , min(-best_sell_volume, limit - curr_pos)))
 
         return orders
@@ -447,29 +361,33 @@ class Trader:
     def run(self, state: TradingState):
         result = {'AMETHYSTS': [], 'STARFRUIT': [], 'ORCHIDS': [], 'GIFT_BASKET': [], 'CHOCOLATE': [], 'STRAWBERRIES': [], 'ROSES': [], 'COCONUT': [], 'COCONUT_COUPON': []}
         
-        traderData = ""
+        traderData = {}
         conversions = 0
+        if state.traderData.startswith("{") and state.traderData != self.trader_data_out:
+            saved = json.loads(state.traderData)
+            self.vol.load_state(saved["vol"])
+            self.starfruit_ar.load_state(saved["starfruit"])
 
         for key, val in state.position.items():
             self.position[key] = val
 
-        if len(self.starfruit_cache) == self.starfruit_dim:
-            self.starfruit_cache.pop(0)
-
+        next_price = None
         best_bid_sf, best_bid_amount_sf = list(state.order_depths["STARFRUIT"].buy_orders.items())[0]
         best_ask_sf, best_ask_amount_sf = list(state.order_depths["STARFRUIT"].sell_orders.items())[0]
 
-        self.starfruit_cache.append((best_bid_sf + best_ask_sf)/2)
+        self.starfruit_ar.update((best_bid_sf + best_ask_sf)/2)
+
+        if len(self.starfruit_ar.window) == self.starfruit_ar.k:
+            next_price = self.calc_next_price_starfruit()
 
         INF = 1e9
         starfruit_lb = 1
         starfruit_ub = 10000
 
-        if len(self.starfruit_cache) == self.starfruit_dim:
-            next_price = self.calc_next_price_starfruit()
+        if next_price is not None:
             starfruit_lb = next_price-1
             starfruit_ub = next_price+1
-            traderData = f"Next price: {next_price}"
+            traderData["next_price"] = next_price
         
         result["STARFRUIT"] += self.compute_orders_sf(state.order_depths["STARFRUIT"], starfruit_lb, starfruit_ub)
 
@@ -481,29 +399,37 @@ class Trader:
         result["GIFT_BASKET"], result["CHOCOLATE"], result["STRAWBERRIES"], result["ROSES"] = self.get_orders_basket(state)
 
         self.timestamp_curr = state.timestamp
-        order_depth = state.order_depths[Symbol("ORCHIDS")]
-        buy_orders = list(order_depth.buy_orders.items())
-        sell_orders = list(order_depth.sell_orders.items())
-        best_ask, best_ask_amount = sell_orders[0]
-        best_bid, best_bid_amount = buy_orders[0]
-        undercut_buy = best_bid + 1
-        undercut_sell = best_ask - 1
-        ducks_price_selling = state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees
-        ducks_price_buying = state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees 
-        import_tariff = state.observations.conversionObservations["ORCHIDS"].importTariff
-        result["ORCHIDS"] += self.orders_mm_orchids(state.order_depths["ORCHIDS"], ducks_price_selling, ducks_price_buying, import_tariff)
-        curr_pos = self.position["ORCHIDS"]
-        if undercut_sell > state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos < 0:
-            # orders.append(Order("ORCHIDS", best_ask, -best_ask_amount))
-            conversions = -curr_pos  
-        curr_pos = self.position["ORCHIDS"]
-        if undercut_buy < state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos > 0:
-            # orders.append(Order("ORCHIDS", best_bid, -best_bid_amount))
-            conversions = -curr_pos
+        # ORCHIDS is only listed from round 2 on; replays of earlier rounds have no book or quote for it
+        if "ORCHIDS" in state.order_depths and "ORCHIDS" in state.observations.conversionObservations:
+            order_depth = state.order_depths[Symbol("ORCHIDS")]
+            buy_orders = list(order_depth.buy_orders.items())
+            sell_orders = list(order_depth.sell_orders.items())
+            best_ask, best_ask_amount = sell_orders[0]
+            best_bid, best_bid_amount = buy_orders[0]
+            undercut_buy = best_bid + 1
+            undercut_sell = best_ask - 1
+            ducks_price_selling = state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees
+            ducks_price_buying = state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees 
+            import_tariff = state.observations.conversionObservations["ORCHIDS"].importTariff
+            result["ORCHIDS"] += self.orders_mm_orchids(state.order_depths["ORCHIDS"], ducks_price_selling, ducks_price_buying, import_tariff)
+            curr_pos = self.position["ORCHIDS"]
+            if undercut_sell > state.observations.conversionObservations["ORCHIDS"].askPrice + state.observations.conversionObservations["ORCHIDS"].importTariff + state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos < 0:
+                # orders.append(Order("ORCHIDS", best_ask, -best_ask_amount))
+                conversions = -curr_pos  
+            curr_pos = self.position["ORCHIDS"]
+            if undercut_buy < state.observations.conversionObservations["ORCHIDS"].bidPrice - state.observations.conversionObservations["ORCHIDS"].exportTariff - state.observations.conversionObservations["ORCHIDS"].transportFees and curr_pos > 0:
+                # orders.append(Order("ORCHIDS", best_bid, -best_bid_amount))
+                conversions = -curr_pos
+            if conversions:
+                logger.print("ORCHIDS conversions: ", conversions, "Position: ", curr_pos, level=SIGNAL, channel="orchids")
         
         result["COCONUT_COUPON"] += self.get_order_coupon(state)
         
         result["COCONUT"] += self.co_coconut(state)
 
+        traderData["vol"] = self.vol.dump()
+        traderData["starfruit"] = self.starfruit_ar.dump()
+        traderData = self.trader_data_out = json.dumps(traderData, separators=(",", ":"))
+
         logger.flush(state, result, conversions, traderData)
-        return result, conversions, traderData
\ No newline at end of file
+        return result, conversions, traderData
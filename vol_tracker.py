@@ -0,0 +1,76 @@
+"""Running implied and realised volatility for the COCONUT_COUPON strategy, updated once per tick.
+
+get_order_coupon priced the coupon with a fixed sigma (0.191) fitted offline.
+VolTracker instead follows the coupon's own implied vol and COCONUT's realised
+vol through the day, each as an exponentially weighted average, in O(1) per
+tick with no history kept:
+
+    from vol_tracker import VolTracker
+    vol = VolTracker(iv=0.191)                             # starting guesses
+    vol.update(coconut_mid, coupon_mid, T, r)              # once per tick
+    fair = vol.fair(coconut_mid, T, r)                     # call_price at the tracked implied vol
+    vol.iv, vol.rv                                         # both annualised
+
+The implied vol solve starts from the tracked value, so it usually takes one
+or two Newton steps. Ticks with no implied vol (a coupon mid outside the
+no-arbitrage bounds) leave it unchanged. Realised vol is the square root of
+an EWMA of squared tick log returns, annualised with ticks_per_year.
+
+dump() is [iv, realised variance per tick, last spot, ticks seen], for traderData:
+
+    traderData = json.dumps({"vol": vol.dump()})
+    vol = VolTracker.load(json.loads(state.traderData)["vol"])
+"""
+import math
+from typing import Optional
+
+from pricing import call_price, implied_vol
+
+# 10000 ticks a day, 365 days a year, the basis of get_order_coupon's T = days / 365
+TICKS_PER_YEAR = 10000 * 365
+
+
+class VolTracker:
+
+    def __init__(self, iv: float = 0.191, rv: Optional[float] = None, iv_halflife: float = 500, rv_halflife: float = 2000,
+                 ticks_per_year: float = TICKS_PER_YEAR, K: float = 10000) -> None:
+        self.iv = iv
+        # Realised variance per tick; starts at the implied vol's when not given
+        self.var = (iv if rv is None else rv) ** 2 / ticks_per_year
+        self.iv_alpha = 1 - 0.5 ** (1 / iv_halflife)
+        self.rv_alpha = 1 - 0.5 ** (1 / rv_halflife)
+        self.ticks_per_year = ticks_per_year
+        self.K = K
+        self.spot: Optional[float] = None
+        self.ticks = 0
+        # The last tick's own implied vol, before smoothing (NaN when it had none)
+        self.last_iv = math.nan
+
+    @property
+    def rv(self) -> float:
+        return math.sqrt(self.var * self.ticks_per_year)
+
+    def update(self, spot: float, option_price: float, T: float, r: float = 0.0) -> None:
+        if self.spot is not None and spot > 0 and self.spot > 0:
+            ret = math.log(spot / self.spot)
+            self.var += self.rv_alpha * (ret * ret - self.var)
+        self.spot = spot
+        self.ticks += 1
+        iv = self.last_iv = implied_vol(option_price, spot, T, r, self.K, guess=self.iv)
+        if iv == iv:
+            self.iv += self.iv_alpha * (iv - self.iv)
+
+    def fair(self, spot: float, T: float, r: float = 0.0) -> float:
+        return call_price(spot, T, r, self.iv, self.K)
+
+    def dump(self, digits: int = 8) -> list:
+        return [round(self.iv, digits), float("%.6g" % self.var), self.spot, self.ticks]
+
+    def load_state(self, data: list) -> "VolTracker":
+        """Take the running values from dump(), keeping this tracker's settings."""
+        self.iv, self.var, self.spot, self.ticks = data
+        return self
+
+    @classmethod
+    def load(cls, data: list, **settings) -> "VolTracker":
+        return cls(**settings).load_state(data)